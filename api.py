@@ -0,0 +1,363 @@
+# api.py
+"""Asynchronous HTTP API for PDF PowerHub
+
+Run with ``python api.py`` (or ``uvicorn api:app``). Single-file endpoints
+take the PDF as the raw request body; merge takes multipart form data with
+one ``files`` field per PDF, in order.
+
+    POST /convert?to=word|images|embedded|text
+                                        (all take &pages=1-3,7,10-; text also
+                                         takes &engine=pymupdf|pdfminer; images
+                                         takes &format=png|jpeg|webp, &dpi=,
+                                         &quality= and &effort=Fast|Balanced|Smallest)
+    POST /split?start=3&end=7
+    POST /compress?level=Medium         (or ?target_size_mb=2)
+    POST /merge
+    GET  /health
+    GET  /metrics                       (Prometheus text format)
+"""
+import os
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from config.app_config import AppConfig
+from utils.input_file import InputFile
+from utils.metrics import Metrics
+from services.pdf_converter import PDFConverterService
+from services.text_extractor import TextExtractor
+from services.pdf_splitter import PDFSplitterService
+from services.pdf_merger import PDFMergerService
+from services.pdf_compressor import PDFCompressorService
+
+CONVERSION_TYPES = {
+    "word": "PDF to Word (.docx)",
+    "images": "PDF to Images",
+    "png": "PDF to Images",  # Older name for to=images
+    "embedded": "Extract Embedded Images",
+    "text": "PDF to Text"
+}
+
+class APIError(Exception):
+    """Error that maps to an HTTP status and a JSON message"""
+    
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+class RequestSpool:
+    """Collects a streamed request body in memory, spilling to a temp file when large"""
+    
+    def __init__(self, name, settings):
+        self.name = name
+        self.settings = settings
+        self.size = 0
+        self._chunks = []
+        self._file = None
+        self._path = None
+        self._input = None
+    
+    def write(self, chunk):
+        """Append a chunk, enforcing the upload limit"""
+        self.size += len(chunk)
+        if self.size > self.settings["max_upload_bytes"]:
+            raise APIError(413, f"Upload exceeds {self.settings['max_upload_bytes']} bytes")
+        
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+        
+        self._chunks.append(chunk)
+        if self.size > self.settings["spool_max_bytes"]:
+            fd, self._path = tempfile.mkstemp(suffix='.pdf')
+            self._file = os.fdopen(fd, 'wb')
+            self._file.writelines(self._chunks)
+            self._chunks = []
+    
+    def as_input(self):
+        """Get the collected body as a service input (memory-mapped if spilled)"""
+        if self._file is not None:
+            self._file.close()
+            self._input = InputFile.from_path(self._path)
+            self._input.name = self.name
+        else:
+            self._input = InputFile.from_bytes(b"".join(self._chunks), self.name)
+            self._chunks = []
+        return self._input
+    
+    def close(self):
+        """Release the body and remove the spill file, if any"""
+        if self._input is not None:
+            self._input.close()
+        if self._file is not None:
+            self._file.close()
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass  # Ignore cleanup errors
+
+class PowerHubAPI:
+    """Routes HTTP requests to the PDF services
+    
+    Service calls run on a thread pool so the event loop keeps accepting and
+    streaming other requests; the services move their CPU-heavy work onto
+    process pools themselves. A semaphore caps how many service calls run at
+    once, and further requests wait for a free slot.
+    """
+    
+    def __init__(self, settings=None):
+        self.settings = settings or AppConfig.API_SETTINGS
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings["max_concurrent_jobs"], thread_name_prefix="pdf-api"
+        )
+        self._slots = asyncio.Semaphore(self.settings["max_concurrent_jobs"])
+    
+    def routes(self):
+        return [
+            Route("/health", self.health, methods=["GET"]),
+            Route("/metrics", self.metrics, methods=["GET"]),
+            Route("/convert", self.convert, methods=["POST"]),
+            Route("/split", self.split, methods=["POST"]),
+            Route("/compress", self.compress, methods=["POST"]),
+            Route("/merge", self.merge, methods=["POST"])
+        ]
+    
+    async def health(self, request):
+        return JSONResponse({"status": "ok"})
+    
+    async def metrics(self, request):
+        """Per-operation latency, phase, size and memory statistics for a Prometheus scraper"""
+        return PlainTextResponse(
+            Metrics.get_shared().to_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+    
+    async def convert(self, request):
+        """Convert the body PDF to Word, images or text, or extract its embedded images"""
+        to = request.query_params.get("to", "")
+        if to not in CONVERSION_TYPES:
+            raise APIError(400, f"'to' must be one of: {', '.join(CONVERSION_TYPES)}")
+        engine = request.query_params.get("engine") or None
+        if engine is not None and engine not in TextExtractor.ENGINES:
+            raise APIError(400, f"'engine' must be one of: {', '.join(TextExtractor.ENGINES)}")
+        image_options = {"format": request.query_params.get("format"), "effort": request.query_params.get("effort")}
+        for name in ("dpi", "quality"):
+            image_options[name] = self._int_param(request, name, None)
+        image_options = {key: value for key, value in image_options.items() if value is not None}
+        pages = request.query_params.get("pages") or None
+        
+        async with self._spooled_body(request) as input_file:
+            result = await self._run(
+                PDFConverterService, "convert", input_file, CONVERSION_TYPES[to], engine, pages, image_options
+            )
+        return self._stream(result["data"], result["filename"], result["mime_type"])
+    
+    async def split(self, request):
+        """Extract a page range from the body PDF"""
+        start_page = self._int_param(request, "start", 1)
+        end_page = self._int_param(request, "end", start_page)
+        
+        async with self._spooled_body(request) as input_file:
+            page_count = await self._run(PDFSplitterService, "get_page_count", input_file)
+            if not 1 <= start_page <= end_page <= page_count:
+                raise APIError(400, f"Page range must lie within 1-{page_count}")
+            data = await self._run(PDFSplitterService, "split_pdf", input_file, start_page, end_page)
+        
+        stem = InputFile.output_stem(input_file.name)
+        return self._stream(data, f"{stem}_pages_{start_page}-{end_page}.pdf", "application/pdf")
+    
+    async def compress(self, request):
+        """Compress the body PDF by level or down to a target size"""
+        target_size_mb = request.query_params.get("target_size_mb")
+        level = request.query_params.get("level", "Medium")
+        if target_size_mb is None and level not in AppConfig.COMPRESSION_LEVELS:
+            raise APIError(400, f"'level' must be one of: {', '.join(AppConfig.COMPRESSION_LEVELS)}")
+        
+        async with self._spooled_body(request) as input_file:
+            if target_size_mb is not None:
+                target_bytes = int(self._float_param(request, "target_size_mb") * 1024 * 1024)
+                result = await self._run(PDFCompressorService, "compress_to_target_size", input_file, target_bytes)
+            else:
+                result = await self._run(PDFCompressorService, "compress_pdf_with_report", input_file, level)
+        
+        stem = InputFile.output_stem(input_file.name)
+        return self._stream(result["data"], f"{stem}_compressed.pdf", "application/pdf")
+    
+    async def merge(self, request):
+        """Merge the PDFs uploaded as multipart ``files`` fields, in order"""
+        # The form parser spools every file before we see it, so bound the whole body first
+        limit = self.settings["max_merge_bytes"]
+        self._check_length(request, limit)
+        request = self._limit_body(request, limit)
+        
+        spools = []
+        try:
+            async with request.form(max_files=self.settings["max_merge_files"]) as form:
+                for upload in form.getlist("files"):
+                    spool = RequestSpool(upload.filename or f"document_{len(spools) + 1}.pdf", self.settings)
+                    spools.append(spool)
+                    while chunk := await upload.read(self.settings["chunk_bytes"]):
+                        spool.write(chunk)
+            
+            if len(spools) < 2:
+                raise APIError(400, "Upload at least 2 PDF files as 'files' fields")
+            input_files = [spool.as_input() for spool in spools]
+            output = tempfile.SpooledTemporaryFile(max_size=self.settings["spool_max_bytes"])
+            try:
+                report = await self._run(PDFMergerService, "merge_pdfs_to_file", input_files, output)
+            except BaseException:
+                output.close()
+                raise
+        finally:
+            for spool in spools:
+                spool.close()
+        
+        response = self._stream_file(output, "merged_document.pdf", "application/pdf")
+        response.headers["X-Dedup-Bytes-Saved"] = str(report["bytes_saved"])
+        return response
+    
+    @asynccontextmanager
+    async def _spooled_body(self, request):
+        """Stream the request body into a spool and yield it as a service input"""
+        self._check_length(request, self.settings["max_upload_bytes"])
+        
+        name = request.query_params.get("filename", "document.pdf")
+        spool = RequestSpool(os.path.basename(name), self.settings)
+        try:
+            async for chunk in request.stream():
+                spool.write(chunk)
+            if spool.size == 0:
+                raise APIError(400, "Request body must be a PDF file")
+            yield spool.as_input()
+        finally:
+            spool.close()
+    
+    @staticmethod
+    def _check_length(request, limit):
+        """Reject a malformed Content-Length (400) or one over ``limit`` (413)"""
+        declared = request.headers.get("content-length")
+        if declared is None:
+            return
+        try:
+            length = int(declared)
+        except ValueError:
+            raise APIError(400, "Content-Length must be an integer")
+        if length < 0:
+            raise APIError(400, "Content-Length must be an integer")
+        if length > limit:
+            raise APIError(413, f"Upload exceeds {limit} bytes")
+    
+    @staticmethod
+    def _limit_body(request, limit):
+        """Wrap a request so reading more than ``limit`` body bytes raises a 413
+        
+        Catches chunked bodies and bodies longer than their Content-Length.
+        """
+        received = 0
+        
+        async def receive():
+            nonlocal received
+            message = await request.receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise APIError(413, f"Upload exceeds {limit} bytes")
+            return message
+        
+        return Request(request.scope, receive)
+    
+    async def _run(self, service_class, method, *args):
+        """Run a service call on the executor, holding one concurrency slot"""
+        def call():
+            service = service_class()
+            try:
+                return getattr(service, method)(*args)
+            finally:
+                service.document_cache.clear()
+        
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._executor, call)
+            except ValueError as e:
+                raise APIError(400, str(e))
+            except Exception as e:
+                raise APIError(422, f"Could not process PDF: {e}")
+    
+    def _stream(self, data, filename, mime_type):
+        """Stream a result back in fixed-size chunks"""
+        chunk_bytes = self.settings["chunk_bytes"]
+        view = memoryview(data)
+        
+        async def chunks():
+            for offset in range(0, len(view), chunk_bytes):
+                yield bytes(view[offset:offset + chunk_bytes])
+        
+        return StreamingResponse(
+            chunks(),
+            media_type=mime_type,
+            headers={
+                "Content-Length": str(len(view)),
+                "Content-Disposition": f'attachment; filename="{filename}"'
+            }
+        )
+    
+    def _stream_file(self, file, filename, mime_type):
+        """Stream a result file back in fixed-size chunks, closing it afterwards"""
+        chunk_bytes = self.settings["chunk_bytes"]
+        size = file.tell()
+        file.seek(0)
+        
+        async def chunks():
+            try:
+                while chunk := file.read(chunk_bytes):
+                    yield chunk
+            finally:
+                file.close()
+        
+        return StreamingResponse(
+            chunks(),
+            media_type=mime_type,
+            headers={
+                "Content-Length": str(size),
+                "Content-Disposition": f'attachment; filename="{filename}"'
+            }
+        )
+    
+    @staticmethod
+    def _int_param(request, name, default):
+        value = request.query_params.get(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise APIError(400, f"'{name}' must be an integer")
+    
+    @staticmethod
+    def _float_param(request, name):
+        try:
+            return float(request.query_params[name])
+        except ValueError:
+            raise APIError(400, f"'{name}' must be a number")
+
+async def _api_error(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=exc.status_code)
+
+def create_app(settings=None):
+    """Build the Starlette application"""
+    api = PowerHubAPI(settings)
+    return Starlette(routes=api.routes(), exception_handlers={APIError: _api_error})
+
+app = create_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    settings = AppConfig.API_SETTINGS
+    uvicorn.run(app, host=settings["host"], port=settings["port"])
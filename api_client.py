@@ -0,0 +1,211 @@
+# api_client.py
+"""Minimal streaming client for the PDF PowerHub HTTP API (standard library only)
+
+Examples:
+    python api_client.py --local convert report.pdf --to text -o report.txt
+    python api_client.py --url http://127.0.0.1:8600 compress report.pdf -o small.pdf --level High
+    python api_client.py --local merge a.pdf b.pdf -o merged.pdf
+
+``--local`` starts the API in-process on a free port, so no separate server
+is needed.
+"""
+import os
+import sys
+import uuid
+import json
+import socket
+import argparse
+import threading
+import http.client
+from contextlib import contextmanager
+from urllib.parse import urlencode, urlsplit
+
+CHUNK_BYTES = 256 * 1024
+
+class APIClientError(Exception):
+    """Error response from the API"""
+    
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+class PowerHubClient:
+    """Uploads PDFs straight from disk and writes results to disk in chunks"""
+    
+    def __init__(self, base_url, timeout=600):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+    
+    def health(self):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request("GET", "/health")
+            response = connection.getresponse()
+            return json.loads(response.read())
+        finally:
+            connection.close()
+    
+    def convert(self, pdf_path, to, output_path, image_options=None, pages=None):
+        """Convert a PDF to word, images, embedded (its embedded images) or text
+        
+        ``image_options`` may set ``format``, ``dpi``, ``quality`` and
+        ``effort`` for image conversion. ``pages`` selects pages with an
+        expression such as ``1-3,7,10-``.
+        """
+        params = {"to": to, **{key: value for key, value in (image_options or {}).items() if value is not None}}
+        if pages:
+            params["pages"] = pages
+        return self._post_file("/convert", pdf_path, params, output_path)
+    
+    def split(self, pdf_path, start_page, end_page, output_path):
+        """Extract pages ``start_page``-``end_page`` (1-based, inclusive)"""
+        return self._post_file("/split", pdf_path, {"start": start_page, "end": end_page}, output_path)
+    
+    def compress(self, pdf_path, output_path, level="Medium", target_size_mb=None):
+        """Compress a PDF by level, or down to ``target_size_mb``"""
+        params = {"target_size_mb": target_size_mb} if target_size_mb else {"level": level}
+        return self._post_file("/compress", pdf_path, params, output_path)
+    
+    def merge(self, pdf_paths, output_path):
+        """Merge PDFs in order, streaming them as multipart form data"""
+        boundary = uuid.uuid4().hex
+        
+        def body():
+            for path in pdf_paths:
+                yield (
+                    f"--{boundary}\r\n"
+                    f'Content-Disposition: form-data; name="files"; filename="{os.path.basename(path)}"\r\n'
+                    "Content-Type: application/pdf\r\n\r\n"
+                ).encode("utf-8")
+                with open(path, 'rb') as f:
+                    while chunk := f.read(CHUNK_BYTES):
+                        yield chunk
+                yield b"\r\n"
+            yield f"--{boundary}--\r\n".encode("utf-8")
+        
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        return self._post("/merge", body(), headers, output_path, encode_chunked=True)
+    
+    def _post_file(self, path, pdf_path, params, output_path):
+        """POST a PDF file as the raw request body"""
+        params = dict(params, filename=os.path.basename(pdf_path))
+        with open(pdf_path, 'rb') as f:
+            headers = {
+                "Content-Type": "application/pdf",
+                "Content-Length": str(os.fstat(f.fileno()).st_size)
+            }
+            return self._post(f"{path}?{urlencode(params)}", f, headers, output_path)
+    
+    def _post(self, path, body, headers, output_path, encode_chunked=False):
+        """Send a request and stream a successful response to ``output_path``"""
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request("POST", path, body=body, headers=headers, encode_chunked=encode_chunked)
+            response = connection.getresponse()
+            if response.status != 200:
+                payload = response.read()
+                try:
+                    message = json.loads(payload)["error"]
+                except (ValueError, KeyError):
+                    message = payload.decode("utf-8", "replace")
+                raise APIClientError(response.status, message)
+            
+            written = 0
+            with open(output_path, 'wb') as f:
+                while chunk := response.read(CHUNK_BYTES):
+                    f.write(chunk)
+                    written += len(chunk)
+            return written
+        finally:
+            connection.close()
+
+@contextmanager
+def local_server(settings=None):
+    """Run the API in a background thread on a free local port; yields its base URL"""
+    import uvicorn
+    from api import create_app
+    
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    
+    config = uvicorn.Config(create_app(settings), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("API server failed to start")
+            thread.join(0.05)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+def build_parser():
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(description="Drive the PDF PowerHub HTTP API")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running API")
+    target.add_argument("--local", action="store_true", help="Start the API in-process for this call")
+    subparsers = parser.add_subparsers(dest="operation", required=True)
+    
+    convert = subparsers.add_parser("convert")
+    convert.add_argument("input")
+    convert.add_argument("--to", choices=["word", "images", "png", "embedded", "text"], required=True)
+    convert.add_argument("-o", "--output", required=True)
+    convert.add_argument("--image-format", choices=["png", "jpeg", "webp"], default=None)
+    convert.add_argument("--dpi", type=int, default=None)
+    convert.add_argument("--quality", type=int, default=None)
+    convert.add_argument("--effort", choices=["Fast", "Balanced", "Smallest"], default=None)
+    convert.add_argument("--pages", default=None, help="Pages to convert, such as 1-3,7,10-")
+    
+    compress = subparsers.add_parser("compress")
+    compress.add_argument("input")
+    compress.add_argument("-o", "--output", required=True)
+    compress.add_argument("--level", default="Medium")
+    compress.add_argument("--target-size", type=float, default=None, help="Target size in MB")
+    
+    split = subparsers.add_parser("split")
+    split.add_argument("input")
+    split.add_argument("--pages", required=True, help="Page range such as 3-7")
+    split.add_argument("-o", "--output", required=True)
+    
+    merge = subparsers.add_parser("merge")
+    merge.add_argument("inputs", nargs="+")
+    merge.add_argument("-o", "--output", required=True)
+    
+    return parser
+
+def run(client, args):
+    """Run one parsed command against a client; returns bytes written"""
+    if args.operation == "convert":
+        image_options = {"format": args.image_format, "dpi": args.dpi, "quality": args.quality, "effort": args.effort}
+        return client.convert(args.input, args.to, args.output, image_options, args.pages)
+    if args.operation == "compress":
+        return client.compress(args.input, args.output, args.level, args.target_size)
+    if args.operation == "split":
+        start, _, end = args.pages.partition("-")
+        return client.split(args.input, int(start), int(end or start), args.output)
+    return client.merge(args.inputs, args.output)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.local:
+            with local_server() as url:
+                written = run(PowerHubClient(url), args)
+        else:
+            written = run(PowerHubClient(args.url), args)
+    except APIClientError as e:
+        print(e, file=sys.stderr)
+        return 1
+    
+    print(f"Wrote {written} bytes to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# benchmarks/bench_image_export.py
+"""Benchmark page image export: throughput and archive size per format and effort
+
+Examples:
+    python benchmarks/bench_image_export.py
+    python benchmarks/bench_image_export.py --pages 4 --dpi 150 --documents scanned
+
+Pages from the seeded benchmark corpus (text-heavy, image-heavy, scanned)
+are exported with every format and effort, plus a "before" row that
+repeats the previous pipeline: PyMuPDF's own PNG encoder, RGB only. Everything runs inline on one core, so the pages/s column
+compares encoders rather than pools.
+"""
+import os
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from benchmarks.corpus import build_corpus
+from config.app_config import AppConfig
+from services.rasterizer import PageRasterizer
+from utils.pdf_buffer import PDFBuffer
+
+DOCUMENTS = ["text_heavy", "image_heavy", "scanned"]
+
+def run_before(path, page_count, dpi):
+    """Export the way the previous pipeline did; returns (seconds, archive bytes)"""
+    started = time.perf_counter()
+    with tempfile.TemporaryFile() as output:
+        doc = fitz.open(path)
+        try:
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as zip_file:
+                for page_num in range(page_count):
+                    png_bytes = doc.load_page(page_num).get_pixmap(dpi=dpi).tobytes("png")
+                    zip_file.writestr(f"page_{page_num + 1}.png", png_bytes)
+        finally:
+            doc.close()
+        return time.perf_counter() - started, output.tell()
+
+def run(buffer, page_count, options):
+    """Export with PageRasterizer; returns (seconds, archive bytes)"""
+    settings = dict(AppConfig.RASTER_SETTINGS, parallel_min_pages=float("inf"))
+    rasterizer = PageRasterizer(settings, options)
+    started = time.perf_counter()
+    archive = rasterizer.render_to_zip(buffer, range(page_count))
+    return time.perf_counter() - started, len(archive)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark page image export formats")
+    parser.add_argument("--pages", type=int, default=6, help="Pages exported per document (at most)")
+    parser.add_argument("--dpi", type=int, default=AppConfig.RASTER_SETTINGS["dpi"])
+    parser.add_argument("--quality", type=int, default=AppConfig.RASTER_SETTINGS["quality"], help="JPEG/WebP quality")
+    parser.add_argument("--documents", nargs="+", choices=DOCUMENTS, default=DOCUMENTS)
+    args = parser.parse_args(argv)
+    
+    print(f"{args.dpi} DPI, quality {args.quality}, {os.cpu_count()} CPU core(s)")
+    for name, path in build_corpus(names=args.documents).items():
+        with PDFBuffer(path) as buffer:
+            doc = fitz.open(path)
+            page_count = min(args.pages, doc.page_count)
+            doc.close()
+            
+            print(f"\n{name} ({page_count} pages)")
+            print(f"  {'export':32} {'pages/s':>8} {'archive MB':>11} {'vs before':>10}")
+            seconds, size = run_before(path, page_count, args.dpi)
+            before_size = size
+            print(f"  {'before: PyMuPDF PNG':32} {page_count / seconds:8.2f} {size / 1024 / 1024:11.2f} {1:10.2f}")
+            for image_format in AppConfig.IMAGE_FORMATS:
+                for effort in AppConfig.IMAGE_EFFORTS:
+                    options = {"format": image_format, "effort": effort, "dpi": args.dpi, "quality": args.quality}
+                    seconds, size = run(buffer, page_count, options)
+                    label = f"{image_format} {effort}"
+                    print(f"  {label:32} {page_count / seconds:8.2f} {size / 1024 / 1024:11.2f} {size / before_size:10.2f}")
+            options = {"format": "png", "effort": "Balanced", "dpi": args.dpi, "reduce_channels": False}
+            seconds, size = run(buffer, page_count, options)
+            print(f"  {'png Balanced, RGB only':32} {page_count / seconds:8.2f} {size / 1024 / 1024:11.2f} {size / before_size:10.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# benchmarks/bench_startup.py
+"""Measure the Streamlit app's cold start, per-rerun and first-visit costs
+
+Example:
+    python benchmarks/bench_startup.py --reruns 20
+
+Each run starts a fresh interpreter and drives main.py with Streamlit's
+AppTest, so nothing is imported before it is measured. It reports how long
+the first Home page run takes (imports and setup included), the median
+cost of a rerun, which PDF backends the Home page loaded (ideally none),
+and how long the first visit to each page takes, which is where a page's
+backends are now imported.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKENDS = ("fitz", "pymupdf", "pdf2docx", "pdfminer", "PyPDF2", "PIL")
+
+def _loaded_backends():
+    return [name for name in BACKENDS if name in sys.modules]
+
+def _timed_run(app):
+    started = time.perf_counter()
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return time.perf_counter() - started
+
+def measure(reruns):
+    """Drive the app in this process (which must be fresh) and return the timings"""
+    sys.path.insert(0, ROOT)
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    from config.app_config import AppConfig
+    streamlit_import = time.perf_counter() - started
+    
+    app = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=120)
+    results = {
+        "streamlit_import_s": streamlit_import,
+        "cold_start_s": _timed_run(app),
+        "home_backends": _loaded_backends(),
+        "rerun_s": statistics.median(_timed_run(app) for _ in range(reruns)),
+        "pages": {}
+    }
+    for label in list(AppConfig.OPERATIONS.values())[1:]:
+        app.sidebar.radio[0].set_value(label)
+        first = _timed_run(app)
+        results["pages"][label] = {
+            "first_visit_s": first,
+            "rerun_s": statistics.median(_timed_run(app) for _ in range(reruns)),
+            "backends": _loaded_backends()
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Streamlit startup and rerun cost")
+    parser.add_argument("--reruns", type=int, default=10, help="Reruns per page; the median is reported")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.measure:
+        print(json.dumps(measure(args.reruns)))
+        return 0
+    
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", "--reruns", str(args.reruns)],
+        check=True, capture_output=True, text=True, cwd=ROOT
+    ).stdout
+    total = time.perf_counter() - started
+    results = json.loads(output.strip().splitlines()[-1])
+    
+    print(f"Streamlit import:               {results['streamlit_import_s'] * 1000:8.0f} ms")
+    print(f"Cold start (first Home run):    {results['cold_start_s'] * 1000:8.0f} ms")
+    print(f"Home rerun (median):            {results['rerun_s'] * 1000:8.1f} ms")
+    print(f"Backends loaded by Home:        {', '.join(results['home_backends']) or 'none'}")
+    print(f"{'page':20} {'first visit ms':>15} {'rerun ms':>10}  backends loaded so far")
+    for label, page in results["pages"].items():
+        print(f"{label:20} {page['first_visit_s'] * 1000:15.0f} {page['rerun_s'] * 1000:10.1f}  {', '.join(page['backends']) or 'none'}")
+    print(f"Total benchmark time: {total:.1f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# benchmarks/bench_word_conversion.py
+"""Benchmark PDF to Word conversion: one worker vs. many, and a page range
+
+Examples:
+    python benchmarks/bench_word_conversion.py
+    python benchmarks/bench_word_conversion.py --pages 120 --workers 8
+
+A synthetic text-and-table document is generated, so results are
+comparable between machines. The parallel speedup needs several cores;
+on a single core the process pool only adds start-up time.
+"""
+import os
+import sys
+import time
+import argparse
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from services.word_converter import WordConverter
+from utils.pdf_buffer import PDFBuffer
+from utils.worker_pool import WorkerPool
+
+def make_document(page_count):
+    """Build a PDF of paragraphs and a small ruled table on every page"""
+    doc = fitz.open()
+    for number in range(1, page_count + 1):
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Section {number}", fontsize=16)
+        for line in range(24):
+            page.insert_text((72, 100 + line * 16), f"Clause {number}.{line + 1}: the parties agree to the terms set out below.")
+        for row in range(5):
+            y = 520 + row * 20
+            page.draw_line((72, y), (523, y))
+            for column in range(3):
+                page.insert_text((80 + column * 150, y + 14), f"R{row + 1}C{column + 1}")
+        page.draw_line((72, 620), (523, 620))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def run(buffer, page_indexes, workers):
+    """Convert once and return the elapsed seconds"""
+    settings = dict(WordConverter().settings, max_workers=workers)
+    started = time.perf_counter()
+    WordConverter(settings).convert(buffer, page_indexes, BytesIO())
+    return time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PDF to Word conversion")
+    parser.add_argument("--pages", type=int, default=48, help="Pages in the synthetic document")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel workers (default: one per core)")
+    parser.add_argument("--range-pages", type=int, default=5, help="Pages in the page-range run")
+    args = parser.parse_args(argv)
+    
+    workers = WorkerPool.resolve_workers(args.workers)
+    with PDFBuffer(make_document(args.pages)) as buffer:
+        all_pages = list(range(args.pages))
+        single = run(buffer, all_pages, 1)
+        parallel = run(buffer, all_pages, workers)
+        ranged = run(buffer, all_pages[:args.range_pages], 1)
+    
+    print(f"{args.pages} pages, {os.cpu_count()} CPU core(s)")
+    print(f"  1 worker:            {single:7.2f}s")
+    print(f"  {workers} worker(s):         {parallel:7.2f}s  ({single / parallel:.2f}x)")
+    print(f"  {args.range_pages} pages, 1 worker:  {ranged:7.2f}s  ({single / ranged:.1f}x faster than all pages)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
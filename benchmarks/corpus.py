@@ -0,0 +1,113 @@
+# benchmarks/corpus.py
+"""Deterministic synthetic PDF corpus for the benchmark suite
+
+Every document is generated from a fixed seed, so two machines (or two
+runs) benchmark exactly the same content. Generated files are cached in
+the corpus directory under ``CORPUS_VERSION``; bump it whenever a
+generator changes so stale files are never compared against a baseline.
+"""
+import os
+import random
+import tempfile
+import fitz  # PyMuPDF
+
+CORPUS_VERSION = 1
+
+WORDS = (
+    "agreement party clause liability payment invoice termination notice term "
+    "schedule delivery service warranty breach remedy confidential data the of "
+    "and to in for shall may with by any such other under this each"
+).split()
+
+def _paragraph(rnd, words):
+    return " ".join(rnd.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def _photo_jpeg(rnd, width, height):
+    """A photo-like RGB JPEG: seeded random colors, smoothly scaled up"""
+    tile_width, tile_height = max(1, width // 24), max(1, height // 24)
+    samples = bytes(rnd.randrange(256) for _ in range(tile_width * tile_height * 3))
+    tile = fitz.Pixmap(fitz.csRGB, tile_width, tile_height, samples, 0)
+    return fitz.Pixmap(tile, width, height, None).tobytes("jpeg", jpg_quality=90)
+
+def text_heavy(rnd):
+    """60 dense pages of body text"""
+    doc = fitz.open()
+    for number in range(60):
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Chapter {number + 1}", fontsize=16)
+        text = "\n\n".join(_paragraph(rnd, 60) for _ in range(6))
+        page.insert_textbox(fitz.Rect(72, 80, 523, 780), text, fontsize=10)
+    return doc
+
+def image_heavy(rnd):
+    """12 pages, each with two large photo-like images"""
+    doc = fitz.open()
+    for _ in range(12):
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(36, 36, 559, 400), stream=_photo_jpeg(rnd, 1200, 820))
+        page.insert_image(fitz.Rect(36, 420, 559, 806), stream=_photo_jpeg(rnd, 1200, 880))
+    return doc
+
+def scanned(rnd):
+    """8 pages that are only a grayscale 150 DPI image of text, with no text layer"""
+    doc = fitz.open()
+    for _ in range(8):
+        source = fitz.open()
+        source_page = source.new_page()
+        source_page.insert_textbox(fitz.Rect(72, 72, 523, 780), "\n\n".join(_paragraph(rnd, 50) for _ in range(7)), fontsize=11)
+        scan = source_page.get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+        source.close()
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=scan)
+    return doc
+
+def many_small_pages(rnd):
+    """500 small pages with a line of text each"""
+    doc = fitz.open()
+    for number in range(500):
+        page = doc.new_page(width=200, height=200)
+        page.insert_text((20, 100), f"Card {number + 1}: {rnd.choice(WORDS)}", fontsize=12)
+    return doc
+
+def huge_single_page(rnd):
+    """One 2000 x 2000 pt page of vector drawing and text"""
+    doc = fitz.open()
+    page = doc.new_page(width=2000, height=2000)
+    shape = page.new_shape()
+    for _ in range(4000):
+        x, y = rnd.uniform(0, 2000), rnd.uniform(0, 2000)
+        shape.draw_line((x, y), (x + rnd.uniform(-80, 80), y + rnd.uniform(-80, 80)))
+        shape.finish(color=(rnd.random(), rnd.random(), rnd.random()))
+    shape.commit()
+    for row in range(120):
+        page.insert_text((20, 16 + row * 16.5), _paragraph(rnd, 40), fontsize=9)
+    return doc
+
+GENERATORS = {
+    "text_heavy": text_heavy,
+    "image_heavy": image_heavy,
+    "scanned": scanned,
+    "many_small_pages": many_small_pages,
+    "huge_single_page": huge_single_page
+}
+
+def default_corpus_dir():
+    return os.path.join(tempfile.gettempdir(), "pdf_powerhub_bench_corpus", f"v{CORPUS_VERSION}")
+
+def build_corpus(corpus_dir=None, names=None):
+    """Generate (or reuse) the corpus; returns {name: path}"""
+    corpus_dir = corpus_dir or default_corpus_dir()
+    os.makedirs(corpus_dir, exist_ok=True)
+    paths = {}
+    for name in names or GENERATORS:
+        path = os.path.join(corpus_dir, f"{name}.pdf")
+        if not os.path.exists(path):
+            # Seeded by position in GENERATORS, so a subset generates the same files
+            doc = GENERATORS[name](random.Random(1000 + list(GENERATORS).index(name)))
+            doc.set_metadata({})
+            temp_path = f"{path}.tmp"
+            doc.save(temp_path, garbage=3, deflate=True, no_new_id=True)
+            doc.close()
+            os.replace(temp_path, path)
+        paths[name] = path
+    return paths
@@ -0,0 +1,245 @@
+# benchmarks/run_suite.py
+"""Run every service operation against the synthetic corpus and check for regressions
+
+Examples:
+    python benchmarks/run_suite.py --update-baseline      # record benchmarks/baseline.json
+    python benchmarks/run_suite.py                        # compare against it
+    python benchmarks/run_suite.py --only "compress_*" --threshold 0.1
+
+Each case runs in a fresh process so peak RSS belongs to that case alone.
+Wall time, CPU time (including worker processes), peak RSS and output size
+are recorded; the median of ``--repeat`` runs is kept. Results are written
+as JSON, and the run fails (exit code 1) when any metric is worse than the
+baseline by more than ``--threshold``. Baselines are machine-specific:
+record one on the machine that compares against it.
+"""
+import os
+import sys
+import json
+import time
+import fnmatch
+import platform
+import argparse
+import tempfile
+import resource
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import CORPUS_VERSION, GENERATORS, build_corpus
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+METRICS = ("wall_s", "cpu_s", "peak_rss_mb", "output_bytes")
+# Slowdowns smaller than this are scheduling noise, whatever the percentage
+TIME_NOISE_SECONDS = 0.1
+
+def _convert(conversion_type, text_engine=None, pages=None):
+    def run(path, paths):
+        from services.pdf_converter import PDFConverterService
+        return len(PDFConverterService().convert(path, conversion_type, text_engine, pages)["data"])
+    return run
+
+def _compress(level):
+    def run(path, paths):
+        from services.pdf_compressor import PDFCompressorService
+        return len(PDFCompressorService().compress_pdf(path, level))
+    return run
+
+def _compress_to_half(path, paths):
+    from services.pdf_compressor import PDFCompressorService
+    return len(PDFCompressorService().compress_to_target_size(path, os.path.getsize(path) // 2)["data"])
+
+def _split_burst(path, paths):
+    from services.pdf_splitter import PDFSplitterService
+    from utils.page_ranges import PageRanges
+    service = PDFSplitterService()
+    return len(service.split_into_parts(path, PageRanges.burst(service.get_page_count(path))))
+
+def _split_by_size(path, paths):
+    from services.pdf_splitter import PDFSplitterService
+    return len(PDFSplitterService().split_by_size(path, 1024 * 1024))
+
+def _merge(path, paths):
+    from services.pdf_merger import PDFMergerService
+    with tempfile.TemporaryFile() as output:
+        PDFMergerService().merge_pdfs_to_file(list(paths.values()), output)
+        return output.tell()
+
+def _index_and_search(path, paths):
+    from services.pdf_search import PDFSearchService
+    from utils.search_index import SearchIndex
+    with tempfile.TemporaryDirectory() as index_dir:
+        service = PDFSearchService(index=SearchIndex(index_dir))
+        service.index_document(path)
+        for query in ("termination notice", "liability", "confidential data", "warr*", "card 42"):
+            for _ in range(20):
+                service.search(query)
+        return service.get_stats()["disk_bytes"]
+
+ALL = list(GENERATORS)
+# operation -> (function, corpus documents it runs on; "corpus" means all of them at once)
+OPERATIONS = {
+    "convert_word": (_convert("PDF to Word (.docx)"), ["text_heavy", "scanned", "huge_single_page"]),
+    "convert_png": (_convert("PDF to Images"), ALL),
+    "convert_embedded": (_convert("Extract Embedded Images"), ["image_heavy", "scanned"]),
+    "convert_text": (_convert("PDF to Text", "pymupdf"), ALL),
+    "convert_text_pdfminer": (_convert("PDF to Text", "pdfminer"), ["text_heavy", "huge_single_page"]),
+    # A 3-page selection should cost a fraction of the whole document
+    "convert_word_3_pages": (_convert("PDF to Word (.docx)", pages="2-4"), ["text_heavy"]),
+    "convert_png_3_pages": (_convert("PDF to Images", pages="2-4"), ["text_heavy", "many_small_pages"]),
+    "convert_text_pdfminer_3_pages": (_convert("PDF to Text", "pdfminer", "2-4"), ["text_heavy"]),
+    "split_burst": (_split_burst, ["text_heavy", "image_heavy", "many_small_pages"]),
+    "split_by_size": (_split_by_size, ["image_heavy", "scanned"]),
+    "compress_medium": (_compress("Medium"), ALL),
+    "compress_high": (_compress("High"), ["image_heavy", "scanned"]),
+    "compress_target_size": (_compress_to_half, ["image_heavy"]),
+    "merge": (_merge, ["corpus"]),
+    "search": (_index_and_search, ["text_heavy", "many_small_pages"])
+}
+
+def _cpu_seconds(usage):
+    return usage.ru_utime + usage.ru_stime
+
+def _own_peak_rss(usage):
+    """Peak RSS of this process in bytes
+    
+    Linux carries ru_maxrss over from the parent across fork and exec, so
+    the per-process high-water mark is read from /proc where it exists.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+def _measure(operation, document, paths):
+    """Run one case in this (fresh) process and return its metrics"""
+    from config.app_config import AppConfig
+    # Measure the work itself, not the result cache
+    AppConfig.CACHE_SETTINGS.update(memory_max_bytes=0, disk_max_bytes=0)
+    
+    func, _ = OPERATIONS[operation]
+    path = paths.get(document)
+    own_before = resource.getrusage(resource.RUSAGE_SELF)
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    output_bytes = func(path, paths)
+    wall = time.perf_counter() - started
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    
+    children_peak = children.ru_maxrss if sys.platform == "darwin" else children.ru_maxrss * 1024
+    return {
+        "wall_s": wall,
+        "cpu_s": _cpu_seconds(own) - _cpu_seconds(own_before) + _cpu_seconds(children) - _cpu_seconds(children_before),
+        "peak_rss_mb": max(_own_peak_rss(own), children_peak) / (1024 * 1024),
+        "output_bytes": output_bytes
+    }
+
+def run_case(operation, document, paths, repeat):
+    """Run a case ``repeat`` times, each in a new process; keep the medians"""
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(_measure, operation, document, paths).result())
+    return {metric: statistics.median(run[metric] for run in runs) for metric in METRICS}
+
+def select_cases(patterns):
+    """List (operation, document) cases matching any of the ``operation/document`` patterns"""
+    cases = [(operation, document) for operation, (_, documents) in OPERATIONS.items() for document in documents]
+    if not patterns:
+        return cases
+    return [
+        case for case in cases
+        if any(fnmatch.fnmatch(f"{case[0]}/{case[1]}", pattern) or fnmatch.fnmatch(case[0], pattern) for pattern in patterns)
+    ]
+
+def compare(results, baseline, threshold):
+    """List regressions as (case, metric, baseline value, current value)"""
+    regressions = []
+    for case, metrics in results["results"].items():
+        previous = baseline["results"].get(case)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            before, after = previous[metric], metrics[metric]
+            if metric in ("wall_s", "cpu_s") and after - before < TIME_NOISE_SECONDS:
+                continue
+            if after > before * (1 + threshold):
+                regressions.append((case, metric, before, after))
+    return regressions
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark PDF PowerHub services on a synthetic corpus")
+    parser.add_argument("--only", action="append", help="Run cases matching operation or operation/document (glob; repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median is kept")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write this run's results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results to --baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown or growth per metric (0.25 = 25%%)")
+    parser.add_argument("--corpus-dir", default=None, help="Where the generated corpus is cached")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    cases = select_cases(args.only)
+    if not cases:
+        print("No benchmark cases match --only", file=sys.stderr)
+        return 2
+    
+    print(f"Generating corpus v{CORPUS_VERSION}...")
+    paths = build_corpus(args.corpus_dir)
+    
+    results = {
+        "meta": {
+            "corpus_version": CORPUS_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        },
+        "results": {}
+    }
+    print(f"{'case':45} {'wall s':>8} {'cpu s':>8} {'rss MB':>8} {'output':>12}")
+    for operation, document in cases:
+        metrics = run_case(operation, document, paths, args.repeat)
+        results["results"][f"{operation}/{document}"] = metrics
+        print(
+            f"{operation + '/' + document:45} {metrics['wall_s']:8.2f} {metrics['cpu_s']:8.2f} "
+            f"{metrics['peak_rss_mb']:8.1f} {metrics['output_bytes']:12,}"
+        )
+    
+    target = args.baseline if args.update_baseline else args.output
+    with open(target, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {target}")
+    if args.update_baseline:
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --update-baseline")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["meta"]["corpus_version"] != CORPUS_VERSION:
+        print(f"Baseline uses corpus v{baseline['meta']['corpus_version']}; record a new one with --update-baseline", file=sys.stderr)
+        return 2
+    
+    regressions = compare(results, baseline, args.threshold)
+    for case, metric, before, after in regressions:
+        print(f"REGRESSION {case} {metric}: {before:,.3f} -> {after:,.3f} (+{(after / before - 1) * 100:.0f}%)")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+# cli.py
+"""Headless batch entry point for PDF PowerHub
+
+Examples:
+    python cli.py --workers 8 compress ./inbox -o ./out --level High
+    python cli.py compress ./inbox -o ./out --target-size 2
+    python cli.py convert ./inbox -o ./out --to text
+    python cli.py convert ./inbox -o ./out --to images --image-format webp --dpi 150
+    python cli.py convert report.pdf -o ./out --to text --pages 1-3,10-
+    python cli.py split report.pdf -o ./out --pages 3-7
+    python cli.py merge a.pdf b.pdf c.pdf -o merged.pdf
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from config.app_config import AppConfig
+from utils.input_file import InputFile
+from utils.page_ranges import PageRanges
+from utils.worker_pool import WorkerPool
+
+MANIFEST_NAME = ".pdf-powerhub-batch.json"  # Per output directory: output name -> settings it was made with
+
+CONVERSION_TYPES = {
+    "word": "PDF to Word (.docx)",
+    "images": "PDF to Images",
+    "png": "PDF to Images",  # Older name for --to images
+    "embedded": "Extract Embedded Images",
+    "text": "PDF to Text"
+}
+
+def _init_batch_worker():
+    """Configure a batch worker process
+    
+    The batch pool already keeps every core busy, so services run their
+    inner work inline instead of starting nested pools, and results are not
+    cached because outputs on disk already serve as the cache.
+    """
+    AppConfig.RASTER_SETTINGS["parallel_min_pages"] = float("inf")
+    AppConfig.COMPRESSOR_SETTINGS["parallel_min_images"] = float("inf")
+    AppConfig.WORD_SETTINGS["parallel_min_pages"] = float("inf")
+    AppConfig.TEXT_SETTINGS["parallel_min_pages"] = dict.fromkeys(AppConfig.TEXT_SETTINGS["parallel_min_pages"], float("inf"))
+    AppConfig.SPLIT_SETTINGS["parallel_min_parts"] = float("inf")
+    AppConfig.CACHE_SETTINGS["memory_max_bytes"] = 0
+    AppConfig.CACHE_SETTINGS["disk_max_bytes"] = 0
+
+def _selection_suffix(job):
+    """File-name suffix the converter adds for a --pages selection, or None if it cannot be resolved"""
+    if not job.get("pages"):
+        return ""
+    import fitz  # PyMuPDF; page counts are only needed to resolve --pages
+    try:
+        with fitz.open(job["input"]) as doc:
+            page_count = doc.page_count
+        label = PageRanges.describe_selection(PageRanges.parse(job["pages"], page_count), page_count)
+    except Exception:
+        return None  # The job itself reports why
+    return f"_{label}" if label else ""
+
+def _split_range(job):
+    """Resolve a split job's --pages against its document's page count; returns (start, end)"""
+    import fitz  # PyMuPDF; open-ended ranges such as 3- need the page count
+    with fitz.open(job["input"]) as doc:
+        page_count = doc.page_count
+    (start, end), = PageRanges.parse(job["pages"], page_count)
+    return start, end
+
+def _expected_outputs(job):
+    """List the output paths a job may produce, for the up-to-date check"""
+    operation = job["operation"]
+    if operation == "merge":
+        return [job["output"]]
+    
+    stem = os.path.join(job["output_dir"], InputFile.output_stem(os.path.basename(job["input"])))
+    if operation == "convert":
+        suffix = _selection_suffix(job)
+        if suffix is None:
+            return []
+        stem += suffix
+        if CONVERSION_TYPES[job["to"]] == "PDF to Images":
+            image_format = job["image_options"].get("format") or AppConfig.RASTER_SETTINGS["format"]
+            return [f"{stem}.{AppConfig.IMAGE_FORMATS[image_format]['extension']}", f"{stem}_images.zip"]
+        return {
+            "word": [f"{stem}.docx"],
+            "embedded": [f"{stem}_embedded_images.zip"],
+            "text": [f"{stem}.txt"]
+        }[job["to"]]
+    if operation == "compress":
+        return [f"{stem}_compressed.pdf"]
+    try:
+        start, end = _split_range(job)
+    except Exception:
+        return []  # The job itself reports why
+    return [f"{stem}_pages_{start}-{end}.pdf"]
+
+def _job_settings(job):
+    """Get the options that shape a job's output but not its file name"""
+    return {key: job[key] for key in ("engine", "image_options", "level", "target_size") if key in job}
+
+def _load_manifest(manifests, output_dir):
+    """Get the settings recorded for the outputs in a directory, loading them once per run"""
+    if output_dir not in manifests:
+        try:
+            with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+                manifests[output_dir] = json.load(f)
+        except (OSError, ValueError):
+            manifests[output_dir] = {}
+    return manifests[output_dir]
+
+def _save_manifests(manifests, dirty):
+    """Write the manifests of the directories that gained outputs"""
+    for output_dir in dirty:
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifests[output_dir], f, indent=2, sort_keys=True)
+
+def _is_up_to_date(job, manifests):
+    """Check whether an output exists, is newer than every input and was made with the job's settings"""
+    newest_input = max(os.path.getmtime(path) for path in job["inputs"])
+    settings = _job_settings(job)
+    for path in _expected_outputs(job):
+        if not os.path.exists(path) or os.path.getmtime(path) < newest_input:
+            continue
+        output_dir, name = os.path.split(path)
+        if not settings or _load_manifest(manifests, output_dir).get(name) == settings:
+            return True
+    return False
+
+def _run_job(job):
+    """Run one job and write its output (runs in a worker process)"""
+    from services.pdf_converter import PDFConverterService
+    from services.pdf_splitter import PDFSplitterService
+    from services.pdf_merger import PDFMergerService
+    from services.pdf_compressor import PDFCompressorService
+    
+    operation = job["operation"]
+    if operation == "convert":
+        result = PDFConverterService().convert(
+            job["input"], CONVERSION_TYPES[job["to"]], job["engine"], job["pages"], job["image_options"]
+        )
+        data, output = result["data"], os.path.join(job["output_dir"], result["filename"])
+    elif operation == "compress":
+        service = PDFCompressorService()
+        if job["target_size"]:
+            data = service.compress_to_target_size(job["input"], job["target_size"])["data"]
+        else:
+            data = service.compress_pdf(job["input"], job["level"])
+        output = _expected_outputs(job)[0]
+    elif operation == "split":
+        data = PDFSplitterService().split_pdf(job["input"], *_split_range(job))
+        output = _expected_outputs(job)[0]
+    else:
+        output = job["output"]  # Merged straight into the file below
+    
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    temp_output = f"{output}.part"
+    with open(temp_output, 'wb') as f:
+        if operation == "merge":
+            PDFMergerService().merge_pdfs_to_file(job["inputs"], f)
+        else:
+            f.write(data)
+    os.replace(temp_output, output)
+    return output
+
+def _run_job_safely(job):
+    """Run a job, returning (job, output, error) instead of raising"""
+    try:
+        return job, _run_job(job), None
+    except Exception as e:
+        return job, None, f"{type(e).__name__}: {e}"
+
+def find_pdfs(paths):
+    """Expand files and directory trees into (pdf_path, relative_dir) pairs"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        found.append((os.path.join(root, name), os.path.relpath(root, path)))
+        else:
+            found.append((path, "."))
+    return found
+
+def build_jobs(args):
+    """Turn parsed arguments into a list of job dicts"""
+    if args.operation == "merge":
+        inputs = [path for path, _ in find_pdfs(args.inputs)]
+        return [{"operation": "merge", "inputs": inputs, "output": args.output}]
+    
+    jobs = []
+    for path, relative_dir in find_pdfs(args.inputs):
+        job = {
+            "operation": args.operation,
+            "input": path,
+            "inputs": [path],
+            "output_dir": os.path.normpath(os.path.join(args.output, relative_dir))
+        }
+        if args.operation == "convert":
+            job["to"] = args.to
+            job["engine"] = args.engine
+            job["pages"] = args.pages
+            job["image_options"] = {
+                key: value for key, value in (
+                    ("format", args.image_format), ("dpi", args.dpi), ("quality", args.quality), ("effort", args.effort)
+                ) if value is not None
+            }
+        elif args.operation == "compress":
+            job["level"] = args.level
+            job["target_size"] = int(args.target_size * 1024 * 1024) if args.target_size else None
+        elif args.operation == "split":
+            job["pages"] = args.pages  # Resolved per document, as 3- depends on its length
+        jobs.append(job)
+    return jobs
+
+def run_jobs(jobs, workers=None, force=False):
+    """Run jobs across a process pool and return a summary dict"""
+    manifests, dirty = {}, set()
+    pending = [job for job in jobs if force or not _is_up_to_date(job, manifests)]
+    summary = {
+        "total": len(jobs),
+        "skipped": len(jobs) - len(pending),
+        "done": 0,
+        "failed": 0,
+        "input_bytes": 0
+    }
+    
+    started = time.perf_counter()
+    if pending:
+        workers = min(WorkerPool.resolve_workers(workers), len(pending))
+        try:
+            with WorkerPool.create(workers, _init_batch_worker) as executor:
+                tasks = ((job,) for job in pending)
+                for job, output, error in WorkerPool.imap_unordered(executor, _run_job_safely, tasks, workers * 2):
+                    if error:
+                        summary["failed"] += 1
+                        print(f"FAILED  {', '.join(job['inputs'])}: {error}", file=sys.stderr)
+                        continue
+                    summary["done"] += 1
+                    summary["input_bytes"] += sum(os.path.getsize(path) for path in job["inputs"])
+                    print(f"ok      {output}")
+                    if _job_settings(job):
+                        output_dir, name = os.path.split(output)
+                        _load_manifest(manifests, output_dir)[name] = _job_settings(job)
+                        dirty.add(output_dir)
+        finally:
+            _save_manifests(manifests, dirty)  # Keep the record of finished outputs if the run is interrupted
+    
+    summary["elapsed"] = time.perf_counter() - started
+    return summary
+
+def print_summary(summary):
+    """Print throughput for a batch run"""
+    elapsed = max(summary["elapsed"], 1e-9)
+    megabytes = summary["input_bytes"] / (1024 * 1024)
+    print(
+        f"\n{summary['done']} done, {summary['skipped']} up to date, {summary['failed']} failed "
+        f"of {summary['total']} in {summary['elapsed']:.2f}s"
+    )
+    print(f"Throughput: {summary['done'] / elapsed:.2f} files/s, {megabytes / elapsed:.2f} MB/s")
+
+def build_parser():
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(description="Batch-process PDFs without the Streamlit UI")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU core)")
+    parser.add_argument("--force", action="store_true", help="Reprocess files whose outputs are up to date")
+    subparsers = parser.add_subparsers(dest="operation", required=True)
+    
+    convert = subparsers.add_parser("convert", help="Convert PDFs to Word, images or text, or extract their embedded images")
+    convert.add_argument("inputs", nargs="+", help="PDF files or directories")
+    convert.add_argument("-o", "--output", required=True, help="Output directory")
+    convert.add_argument("--to", choices=list(CONVERSION_TYPES), required=True)
+    convert.add_argument("--engine", choices=["pymupdf", "pdfminer"], default=None,
+                         help="Text engine for --to text (default from TEXT_SETTINGS)")
+    convert.add_argument("--pages", default=None, help="Pages to convert, such as 1-3,7,10- (default: all)")
+    convert.add_argument("--image-format", choices=list(AppConfig.IMAGE_FORMATS), default=None,
+                         help="Image format for --to images (default from RASTER_SETTINGS)")
+    convert.add_argument("--dpi", type=int, default=None, help="Resolution for --to images")
+    convert.add_argument("--quality", type=int, default=None, help="JPEG/WebP quality (1-100)")
+    convert.add_argument("--effort", choices=AppConfig.IMAGE_EFFORTS, default=None,
+                         help="Compression effort for --to images")
+    
+    compress = subparsers.add_parser("compress", help="Compress PDFs")
+    compress.add_argument("inputs", nargs="+", help="PDF files or directories")
+    compress.add_argument("-o", "--output", required=True, help="Output directory")
+    compress.add_argument("--level", choices=list(AppConfig.COMPRESSION_LEVELS), default="Medium")
+    compress.add_argument("--target-size", type=float, default=None, help="Target size in MB (overrides --level)")
+    
+    split = subparsers.add_parser("split", help="Extract a page range from PDFs")
+    split.add_argument("inputs", nargs="+", help="PDF files or directories")
+    split.add_argument("-o", "--output", required=True, help="Output directory")
+    split.add_argument("--pages", required=True, help="Page range such as 3-7, or 3- for the rest")
+    
+    merge = subparsers.add_parser("merge", help="Merge PDFs into one file")
+    merge.add_argument("inputs", nargs="+", help="PDF files or directories, in order")
+    merge.add_argument("-o", "--output", required=True, help="Output PDF path")
+    
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "pages", None):
+        # Check the syntax up front; page numbers are checked against each document
+        try:
+            ranges = PageRanges.parse(args.pages, sys.maxsize)
+        except ValueError:
+            parser.error(f"invalid --pages '{args.pages}': use ranges such as 1-3,7,10-")
+        if args.operation == "split" and len(ranges) != 1:
+            parser.error("split --pages takes a single range, such as 3-7 or 3-")
+    
+    jobs = build_jobs(args)
+    if not jobs or (args.operation == "merge" and len(jobs[0]["inputs"]) < 2):
+        print("No PDF files to process.", file=sys.stderr)
+        return 1
+    
+    summary = run_jobs(jobs, args.workers, args.force)
+    print_summary(summary)
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,3 @@
-import streamlit as st
-
 class AppConfig:
     """Application configuration and constants"""
     
@@ -13,7 +11,9 @@ class AppConfig:
         "convert": "Convert PDF", 
         "split": "Split PDF",
         "merge": "Merge PDFs",
-        "compress": "Compress PDF"
+        "compress": "Compress PDF",
+        "search": "Search PDFs",
+        "metrics": "Performance"
     }
     
     # File type configurations
@@ -30,9 +30,152 @@ class AppConfig:
         "High": {"quality": 50, "dpi": 96}
     }
     
+    # Target-size compression search space
+    TARGET_SIZE_SETTINGS = {
+        "dpi_steps": [None, 300, 200, 150, 120, 96, 72],  # None = keep resolution
+        "max_quality": 90,
+        "quality_floor": 50,  # Drop DPI before going below this quality
+        "min_quality": 20,
+        "quality_tolerance": 4,
+        "max_iterations": 40,
+        "max_writes": 3
+    }
+    
+    # Image recompression worker settings
+    COMPRESSOR_SETTINGS = {
+        "max_workers": None,  # None = one worker per CPU core
+        "parallel_min_images": 4,
+        "min_image_bytes": 2048  # Smaller images are not worth re-encoding
+    }
+    
+    # Page rasterization settings (PDF to Images)
+    RASTER_SETTINGS = {
+        "dpi": 200,
+        "max_dpi": 600,
+        "format": "png",  # Key of IMAGE_FORMATS
+        "quality": 85,  # JPEG/WebP quality
+        "effort": "Balanced",  # Key of IMAGE_EFFORTS
+        "reduce_channels": True,  # Encode gray pages as 1 channel, black-and-white PNGs as 1 bit
+        "max_workers": None,  # None = one worker per CPU core
+        "pages_per_task": 4,
+        "parallel_min_pages": 8,
+        "spool_max_bytes": 64 * 1024 * 1024
+    }
+    
+    # Page image export formats
+    IMAGE_FORMATS = {
+        "png": {"label": "PNG (lossless)", "extension": "png", "mime_type": "image/png", "lossy": False},
+        "jpeg": {"label": "JPEG", "extension": "jpg", "mime_type": "image/jpeg", "lossy": True},
+        "webp": {"label": "WebP", "extension": "webp", "mime_type": "image/webp", "lossy": True}
+    }
+    
+    # Encoder effort: PNG zlib level, JPEG Huffman optimization/progressive, WebP method
+    IMAGE_EFFORTS = ["Fast", "Balanced", "Smallest"]
+    
+    # Embedded image extraction
+    IMAGE_EXTRACT_SETTINGS = {
+        "min_side_px": 8,  # Skip smaller images (spacers, rules, tiling patterns)
+        "spool_max_bytes": 64 * 1024 * 1024
+    }
+    
+    # Page thumbnails (visual page picking)
+    THUMBNAIL_SETTINGS = {
+        "dpi": 24,
+        "max_side_px": 320,  # Oversized pages are scaled down further
+        "jpeg_quality": 70,
+        "columns": 6,
+        "rows": 4,  # Thumbnails shown per grid page = columns * rows
+        "max_workers": 2,
+        "cache_max_bytes": 64 * 1024 * 1024,
+        "poll_interval": 0.3
+    }
+    
+    # PDF to Word settings
+    WORD_SETTINGS = {
+        "max_workers": None,  # None = one worker per CPU core
+        "pages_per_task": 4,  # Pages parsed together share header/footer detection
+        "parallel_min_pages": 8
+    }
+    
+    # Text extraction settings
+    TEXT_SETTINGS = {
+        "engine": "pymupdf",  # "pymupdf" (fast) or "pdfminer" (layout analysis)
+        "max_workers": None,  # None = one worker per CPU core
+        "pages_per_task": 16,
+        # Process pools cost a fixed start-up time, which PyMuPDF only earns
+        # back on long documents
+        "parallel_min_pages": {"pymupdf": 500, "pdfminer": 16},
+        "preview_max_chars": 100_000  # Text shown in the on-page preview
+    }
+    
+    # Full-text search index
+    SEARCH_SETTINGS = {
+        "index_dir": None,  # None = a private temp dir per session; a path shares one index
+        "max_segments": 8,  # Segments are merged into one past this count
+        "max_hits": 20,
+        "snippet_chars": 160
+    }
+    
+    # Multi-part split settings (ranges, every N pages, burst)
+    SPLIT_SETTINGS = {
+        "max_workers": None,  # None = one worker per CPU core
+        "parts_per_task": 8,
+        "parallel_min_parts": 16,
+        "default_max_part_mb": 9.0,  # Default limit for the max part size mode
+        "spool_max_bytes": 64 * 1024 * 1024
+    }
+    
+    # Merge engine settings
+    MERGE_SETTINGS = {
+        "flush_bytes": 32 * 1024 * 1024,  # Input merged between saves of the work file
+        "deduplicate": True,  # Store streams repeated across inputs once
+        "spool_max_bytes": 64 * 1024 * 1024
+    }
+    
+    # Input buffering (streams larger than this are spilled to a memory-mapped temp file)
+    IO_SETTINGS = {
+        "spill_threshold_bytes": 64 * 1024 * 1024
+    }
+    
+    # Result cache settings (set disk_max_bytes to 0 to keep results in memory only)
+    CACHE_SETTINGS = {
+        "memory_max_bytes": 256 * 1024 * 1024,
+        "disk_max_bytes": 1024 * 1024 * 1024,
+        "disk_dir": None  # None = a private temp dir, removed when the process exits
+    }
+    
+    # Performance metrics (latency percentiles cover each operation's last window_size runs)
+    METRICS_SETTINGS = {
+        "window_size": 500,
+        "export_path": None,  # Also write Prometheus text here after every run, e.g. for a textfile collector
+        "max_history": 100  # Operations kept in each session's history
+    }
+    
+    # Background jobs (long conversions and compressions run off the script thread)
+    JOB_SETTINGS = {
+        "max_workers": 2,  # Jobs fan out to process pools themselves
+        "max_finished_jobs": 32,
+        "retention_seconds": 60 * 60,
+        "poll_interval": 0.5
+    }
+    
+    # HTTP API (api.py)
+    API_SETTINGS = {
+        "host": "127.0.0.1",
+        "port": 8600,
+        "max_concurrent_jobs": 4,
+        "max_upload_bytes": 512 * 1024 * 1024,
+        "max_merge_files": 50,
+        "max_merge_bytes": 1024 * 1024 * 1024,  # Whole multipart body, checked before it is parsed
+        "spool_max_bytes": 16 * 1024 * 1024,  # Larger bodies spill to a temp file
+        "chunk_bytes": 256 * 1024
+    }
+    
     @classmethod
     def setup_page(cls):
         """Configure Streamlit page settings"""
+        import streamlit as st  # Imported here so headless entry points don't load Streamlit
+        
         st.set_page_config(
             page_title=cls.APP_TITLE,
             page_icon=cls.APP_ICON,
@@ -1,20 +1,38 @@
+import time
 import streamlit as st
 from config.app_config import AppConfig
 from ui.layout import UILayout
-from services.pdf_converter import PDFConverterService
-from services.pdf_splitter import PDFSplitterService
-from services.pdf_merger import PDFMergerService
-from services.pdf_compressor import PDFCompressorService
+from services.registry import ServiceRegistry
+from utils.session_manager import SessionManager
+from utils.input_file import InputFile
+from utils.job_queue import Job, JobQueue
+from utils.page_ranges import PageRanges
+from utils.metrics import Metrics, size_of
+
+def _run_service_job(service_name, method, *args, progress_callback=None):
+    """Run a service method on a job thread with its own document cache
+    
+    The session's cache evicts handles when the user navigates away, so a
+    background job must not share it.
+    """
+    service = ServiceRegistry.load(service_name)()
+    try:
+        return getattr(service, method)(*args, progress_callback=progress_callback)
+    finally:
+        service.document_cache.clear()
 
 class PDFController:
-    """Main controller for handling PDF operations"""
+    """Main controller for handling PDF operations
+    
+    One controller lives for the whole session (see
+    SessionManager.get_controller). Services come from a ServiceRegistry,
+    so a page imports only the PDF libraries its operation needs.
+    """
     
     def __init__(self):
         self.ui = UILayout()
-        self.converter_service = PDFConverterService()
-        self.splitter_service = PDFSplitterService()
-        self.merger_service = PDFMergerService()
-        self.compressor_service = PDFCompressorService()
+        self.document_cache = SessionManager.get_document_cache()
+        self.services = ServiceRegistry(self.document_cache)
     
     def handle_operation(self, operation):
         """Route operations to appropriate handlers"""
@@ -23,17 +41,22 @@ class PDFController:
             AppConfig.OPERATIONS["convert"]: self._handle_convert,
             AppConfig.OPERATIONS["split"]: self._handle_split,
             AppConfig.OPERATIONS["merge"]: self._handle_merge,
-            AppConfig.OPERATIONS["compress"]: self._handle_compress
+            AppConfig.OPERATIONS["compress"]: self._handle_compress,
+            AppConfig.OPERATIONS["search"]: self._handle_search,
+            AppConfig.OPERATIONS["metrics"]: self._handle_metrics
         }
         
         handler = operation_map.get(operation)
         if handler:
-            handler()
+            page = next(key for key, label in AppConfig.OPERATIONS.items() if label == operation)
+            with Metrics.get_shared().track(f"page_{page}", kind="page"):
+                handler()
         else:
             st.error(f"Unknown operation: {operation}")
     
     def _handle_home(self):
         """Handle home page display"""
+        self.document_cache.clear()
         self.ui.render_home_page()
     
     def _handle_convert(self):
@@ -44,22 +67,84 @@ class PDFController:
             "Upload a PDF file", 
             AppConfig.SUPPORTED_FORMATS["pdf"]
         )
+        self.document_cache.retain(uploaded_file)
         
         if uploaded_file is not None:
             conversion_type = st.selectbox(
                 "Choose conversion type:",
-                ["PDF to Word (.docx)", "PDF to PNG Images", "PDF to Text"]
+                ["PDF to Word (.docx)", "PDF to Images", "Extract Embedded Images", "PDF to Text"]
             )
             
+            text_engine = None
+            image_options = None
+            page_expression = st.text_input(
+                "Pages (optional)",
+                placeholder="All pages, or e.g. 1-3,7,10-",
+                help="Only the selected pages are read and converted"
+            )
+            if conversion_type == "PDF to Text":
+                from services.text_extractor import TextExtractor  # Loads pdfminer; only needed here
+                engines = list(TextExtractor.ENGINES)
+                text_engine = st.selectbox(
+                    "Text engine:",
+                    engines,
+                    index=engines.index(AppConfig.TEXT_SETTINGS["engine"]),
+                    format_func=TextExtractor.ENGINES.get,
+                    help="Layout analysis is much slower but can order text better on multi-column pages and tables"
+                )
+            if conversion_type == "PDF to Images":
+                image_options = self._render_image_options()
+            
             if st.button("Convert File", type="primary"):
-                with st.spinner("Converting your file..."):
-                    try:
-                        result = self.converter_service.convert(
-                            uploaded_file, conversion_type
-                        )
-                        self._handle_conversion_result(result, uploaded_file.name)
-                    except Exception as e:
-                        st.error(f"Conversion failed: {str(e)}")
+                try:
+                    page_ranges = None
+                    if page_expression.strip():
+                        page_count = self.services.get("splitter").get_page_count(uploaded_file)
+                        page_ranges = PageRanges.parse(page_expression, page_count)
+                    self._submit_job(
+                        "convert", uploaded_file, f"Converting {uploaded_file.name}",
+                        "converter", "convert", conversion_type, text_engine, page_ranges, image_options
+                    )
+                except ValueError as e:
+                    st.error(str(e))
+            
+            job = self._poll_job("convert", uploaded_file)
+            if job is not None:
+                if job.state == Job.FAILED:
+                    st.error(f"Conversion failed: {job.error}")
+                else:
+                    self._handle_conversion_result(job.result, uploaded_file.name)
+    
+    @staticmethod
+    def _render_image_options():
+        """Render the image export controls and return the chosen options"""
+        settings = AppConfig.RASTER_SETTINGS
+        formats = list(AppConfig.IMAGE_FORMATS)
+        col1, col2 = st.columns(2)
+        with col1:
+            image_format = st.selectbox(
+                "Image format:",
+                formats,
+                index=formats.index(settings["format"]),
+                format_func=lambda key: AppConfig.IMAGE_FORMATS[key]["label"]
+            )
+            dpi = st.select_slider(
+                "Resolution (DPI):",
+                options=sorted({72, 96, 150, 200, 300, settings["max_dpi"], settings["dpi"]}),
+                value=settings["dpi"],
+                help="Pixel count grows with the square of the DPI"
+            )
+        with col2:
+            effort = st.select_slider(
+                "Compression effort:",
+                options=AppConfig.IMAGE_EFFORTS,
+                value=settings["effort"],
+                help="More effort gives smaller files but encodes more slowly"
+            )
+            quality = settings["quality"]
+            if AppConfig.IMAGE_FORMATS[image_format]["lossy"]:
+                quality = st.slider("Quality:", min_value=10, max_value=100, value=settings["quality"])
+        return {"dpi": dpi, "format": image_format, "quality": quality, "effort": effort}
     
     def _handle_split(self):
         """Handle PDF splitting operations"""
@@ -69,28 +154,174 @@ class PDFController:
             "Upload a PDF file to split",
             AppConfig.SUPPORTED_FORMATS["pdf"]
         )
+        self.document_cache.retain(uploaded_file)
         
         if uploaded_file is not None:
-            total_pages = self.splitter_service.get_page_count(uploaded_file)
+            total_pages = self.services.get("splitter").get_page_count(uploaded_file)
             st.info(f"Total pages in PDF: {total_pages}")
             
-            col1, col2 = st.columns(2)
-            with col1:
-                start_page = st.number_input("Start page", min_value=1, max_value=total_pages, value=1)
-            with col2:
-                end_page = st.number_input("End page", min_value=start_page, max_value=total_pages, value=total_pages)
+            split_mode = st.radio(
+                "Split mode:",
+                ["Single range", "Pick from thumbnails", "Multiple ranges", "Every N pages", "One file per page", "Max part size"],
+                horizontal=True
+            )
+            
+            if split_mode == "Single range":
+                self._handle_single_range_split(uploaded_file, total_pages)
+                return
+            if split_mode == "Pick from thumbnails":
+                self._handle_thumbnail_split(uploaded_file, total_pages)
+                return
+            
+            if split_mode == "Multiple ranges":
+                expression = st.text_input(
+                    "Page ranges",
+                    value=f"1-{total_pages}",
+                    help="Comma-separated pages and ranges, e.g. 1-3,7,10- (a trailing dash runs to the last page)"
+                )
+            elif split_mode == "Every N pages":
+                pages_per_part = st.number_input("Pages per part", min_value=1, max_value=total_pages, value=1)
+            elif split_mode == "Max part size":
+                max_part_mb = st.number_input(
+                    "Maximum part size (MB)",
+                    min_value=0.1,
+                    value=float(AppConfig.SPLIT_SETTINGS["default_max_part_mb"]),
+                    step=0.5,
+                    help="Each part stays under this size; a single page larger than the limit becomes its own part"
+                )
             
             if st.button("Split PDF", type="primary"):
-                try:
-                    result = self.splitter_service.split_pdf(uploaded_file, start_page, end_page)
-                    st.success(f"PDF split successfully! Pages {start_page}-{end_page}")
-                    
-                    filename = f"{uploaded_file.name.replace('.pdf', '')}_pages_{start_page}-{end_page}.pdf"
-                    self.ui.render_download_button(
-                        "Download Split PDF", result, filename, "application/pdf"
+                if split_mode == "Max part size":
+                    self._submit_job(
+                        "split", uploaded_file, f"Splitting {uploaded_file.name}",
+                        "splitter", "split_by_size", int(max_part_mb * 1024 * 1024),
+                        metadata={"max_part_mb": max_part_mb}
                     )
-                except Exception as e:
-                    st.error(f"Split failed: {str(e)}")
+                else:
+                    try:
+                        if split_mode == "Multiple ranges":
+                            ranges = PageRanges.parse(expression, total_pages)
+                        elif split_mode == "Every N pages":
+                            ranges = PageRanges.every(int(pages_per_part), total_pages)
+                        else:
+                            ranges = PageRanges.burst(total_pages)
+                        self._submit_job(
+                            "split", uploaded_file, f"Splitting {uploaded_file.name}",
+                            "splitter", "split_into_parts", ranges,
+                            metadata={"parts": len(ranges)}
+                        )
+                    except ValueError as e:
+                        st.error(str(e))
+            
+            self._render_split_parts(uploaded_file)
+    
+    def _render_split_parts(self, uploaded_file):
+        """Show progress of a multi-part split job, then offer its ZIP"""
+        job = self._poll_job("split", uploaded_file)
+        if job is None:
+            return
+        if job.state == Job.FAILED:
+            st.error(f"Split failed: {job.error}")
+            return
+        
+        if "parts" in job.metadata:
+            st.success(f"PDF split into {job.metadata['parts']} files!")
+        else:
+            st.success(f"PDF split into parts of at most {job.metadata['max_part_mb']:g} MB!")
+        filename = f"{InputFile.output_stem(uploaded_file.name)}_parts.zip"
+        self.ui.render_download_button(
+            "Download Parts (ZIP)", job.result, filename, "application/zip"
+        )
+    
+    def _handle_single_range_split(self, uploaded_file, total_pages):
+        """Extract one page range into a single PDF"""
+        col1, col2 = st.columns(2)
+        with col1:
+            start_page = st.number_input("Start page", min_value=1, max_value=total_pages, value=1)
+        with col2:
+            end_page = st.number_input("End page", min_value=start_page, max_value=total_pages, value=total_pages)
+        
+        if st.button("Split PDF", type="primary"):
+            try:
+                started = time.perf_counter()
+                result = self.services.get("splitter").split_pdf(uploaded_file, start_page, end_page)
+                SessionManager.add_to_history(
+                    "split", f"{uploaded_file.name}, pages {start_page}-{end_page}",
+                    time.perf_counter() - started, size_of(uploaded_file), len(result)
+                )
+                st.success(f"PDF split successfully! Pages {start_page}-{end_page}")
+                
+                filename = f"{InputFile.output_stem(uploaded_file.name)}_pages_{start_page}-{end_page}.pdf"
+                self.ui.render_download_button(
+                    "Download Split PDF", result, filename, "application/pdf"
+                )
+            except Exception as e:
+                st.error(f"Split failed: {str(e)}")
+    
+    def _handle_thumbnail_split(self, uploaded_file, total_pages):
+        """Pick pages on a paginated thumbnail grid; each run of consecutive pages becomes a part
+        
+        Only the grid page on screen is rendered (at low DPI, in the
+        background); the page polls until its thumbnails are ready and then
+        prefetches the next grid page.
+        """
+        from services.thumbnail_renderer import ThumbnailRenderer  # Loads PyMuPDF; only needed here
+        settings = AppConfig.THUMBNAIL_SETTINGS
+        content_hash = self.document_cache.get_entry(uploaded_file).content_hash
+        selection = SessionManager.get_page_selection(content_hash)
+        key_prefix = f"thumb_{content_hash[:16]}"
+        
+        per_grid = settings["columns"] * settings["rows"]
+        grid_count = -(-total_pages // per_grid)
+        grid_page = 1
+        if grid_count > 1:
+            grid_page = st.number_input(f"Thumbnail page (of {grid_count})", min_value=1, max_value=grid_count, value=1)
+        first = (grid_page - 1) * per_grid
+        shown = range(first, min(first + per_grid, total_pages))
+        
+        renderer = ThumbnailRenderer.get_shared()
+        tiles = renderer.get_tiles(uploaded_file, content_hash, shown)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button(
+                "Select shown pages", on_click=self._set_page_selection,
+                args=(selection, key_prefix, [page_num + 1 for page_num in shown], True)
+            )
+        with col2:
+            st.button(
+                "Clear selection", on_click=self._set_page_selection,
+                args=(selection, key_prefix, list(selection), False)
+            )
+        self.ui.render_thumbnail_grid(tiles, selection, settings["columns"], key_prefix)
+        
+        if selection:
+            ranges = PageRanges.from_pages(selection)
+            st.info(f"{len(selection)} page(s) selected: {PageRanges.to_expression(ranges)}")
+            if st.button("Split PDF", type="primary"):
+                self._submit_job(
+                    "split", uploaded_file, f"Splitting {uploaded_file.name}",
+                    "splitter", "split_into_parts", ranges,
+                    metadata={"parts": len(ranges)}
+                )
+        self._render_split_parts(uploaded_file)
+        
+        if any(tile is None for tile in tiles.values()):
+            with Metrics.idle():
+                time.sleep(settings["poll_interval"])
+            st.rerun()
+        if grid_page < grid_count:
+            renderer.get_tiles(uploaded_file, content_hash, range(shown.stop, min(shown.stop + per_grid, total_pages)))
+    
+    @staticmethod
+    def _set_page_selection(selection, key_prefix, pages, selected):
+        """Select or deselect pages, keeping their grid checkboxes in step"""
+        for page in pages:
+            if selected:
+                selection.add(page)
+            else:
+                selection.discard(page)
+            st.session_state[f"{key_prefix}_{page}"] = selected
     
     def _handle_merge(self):
         """Handle PDF merging operations"""
@@ -102,6 +333,7 @@ class PDFController:
             multiple=True,
             help_text="You can upload multiple files at once"
         )
+        self.document_cache.retain(uploaded_files)
         
         if uploaded_files:
             st.info(f"{len(uploaded_files)} PDF files uploaded")
@@ -114,8 +346,15 @@ class PDFController:
                 if st.button("Merge PDFs", type="primary"):
                     try:
                         with st.spinner("Merging PDFs..."):
-                            result = self.merger_service.merge_pdfs(uploaded_files)
+                            started = time.perf_counter()
+                            merge = self.services.get("merger").merge_pdfs_with_report(uploaded_files)
+                            result = merge["data"]
+                            SessionManager.add_to_history(
+                                "merge", f"{len(uploaded_files)} files",
+                                time.perf_counter() - started, size_of(uploaded_files), len(result)
+                            )
                             st.success(f"{len(uploaded_files)} PDFs merged successfully!")
+                            self.ui.render_merge_report(merge["report"])
                             
                             self.ui.render_download_button(
                                 "Download Merged PDF", result, "merged_document.pdf", "application/pdf"
@@ -133,41 +372,176 @@ class PDFController:
             "Upload a PDF file to compress",
             AppConfig.SUPPORTED_FORMATS["pdf"]
         )
+        self.document_cache.retain(uploaded_file)
         
         if uploaded_file is not None:
             original_size = len(uploaded_file.getvalue()) / 1024
             st.info(f"Original file size: {original_size:.2f} KB")
             
-            compression_level = st.select_slider(
-                "Compression Level:",
-                options=list(AppConfig.COMPRESSION_LEVELS.keys()),
-                value="Medium",
-                help="Higher compression = smaller file size but potentially lower quality"
+            compression_mode = st.radio(
+                "Compression mode:",
+                ["Compression level", "Target size"],
+                horizontal=True
             )
             
+            if compression_mode == "Target size":
+                target_mb = st.number_input(
+                    "Target size (MB)",
+                    min_value=0.1,
+                    value=2.0,
+                    step=0.5,
+                    help="Quality and resolution are lowered step by step until the file fits"
+                )
+            else:
+                compression_level = st.select_slider(
+                    "Compression Level:",
+                    options=list(AppConfig.COMPRESSION_LEVELS.keys()),
+                    value="Medium",
+                    help="Higher compression = smaller file size but potentially lower quality"
+                )
+            
             if st.button("Compress PDF", type="primary"):
-                with st.spinner("Compressing PDF..."):
-                    try:
-                        result = self.compressor_service.compress_pdf(uploaded_file, compression_level)
-                        compressed_size = len(result) / 1024
-                        reduction = ((original_size - compressed_size) / original_size) * 100
-                        
-                        st.success("PDF compressed successfully!")
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Original Size", f"{original_size:.2f} KB")
-                        with col2:
-                            st.metric("New Size", f"{compressed_size:.2f} KB")
-                        with col3:
-                            st.metric("Reduction", f"{reduction:.1f}%")
-                        
-                        filename = f"{uploaded_file.name.replace('.pdf', '')}_compressed.pdf"
-                        self.ui.render_download_button(
-                            "Download Compressed PDF", result, filename, "application/pdf"
-                        )
-                    except Exception as e:
-                        st.error(f"Compression failed: {str(e)}")
+                label = f"Compressing {uploaded_file.name}"
+                if compression_mode == "Target size":
+                    self._submit_job(
+                        "compress", uploaded_file, label, "compressor",
+                        "compress_to_target_size", int(target_mb * 1024 * 1024),
+                        metadata={"mode": compression_mode}
+                    )
+                else:
+                    self._submit_job(
+                        "compress", uploaded_file, label, "compressor",
+                        "compress_pdf_with_report", compression_level,
+                        metadata={"mode": compression_mode}
+                    )
+            
+            job = self._poll_job("compress", uploaded_file)
+            if job is not None:
+                if job.state == Job.FAILED:
+                    st.error(f"Compression failed: {job.error}")
+                else:
+                    self._handle_compression_result(job.result, job.metadata["mode"], uploaded_file, original_size)
+    
+    def _handle_compression_result(self, compression, compression_mode, uploaded_file, original_size):
+        """Handle the result of PDF compression"""
+        result = compression["data"]
+        compressed_size = len(result) / 1024
+        reduction = ((original_size - compressed_size) / original_size) * 100
+        
+        st.success("PDF compressed successfully!")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Original Size", f"{original_size:.2f} KB")
+        with col2:
+            st.metric("New Size", f"{compressed_size:.2f} KB")
+        with col3:
+            st.metric("Reduction", f"{reduction:.1f}%")
+        
+        if compression_mode == "Target size":
+            self.ui.render_target_size_report(compression["report"])
+        else:
+            self.ui.render_compression_report(compression["report"])
+        
+        filename = f"{InputFile.output_stem(uploaded_file.name)}_compressed.pdf"
+        self.ui.render_download_button(
+            "Download Compressed PDF", result, filename, "application/pdf"
+        )
+    
+    def _handle_search(self):
+        """Handle full-text search across indexed PDFs"""
+        st.header("🔎 Search PDFs")
+        
+        uploaded_files = self.ui.render_file_uploader(
+            "Upload PDF files to add to the search index",
+            AppConfig.SUPPORTED_FORMATS["pdf"],
+            multiple=True,
+            help_text="Indexed documents are visible only in this session"
+        )
+        self.document_cache.retain(uploaded_files)
+        
+        new_files = [file for file in uploaded_files or [] if not self.services.get("search").is_indexed(file)]
+        if new_files and st.button(f"Index {len(new_files)} new PDF(s)", type="primary"):
+            progress_bar = self.ui.render_progress_bar(0.0, "Indexing...")
+            for done, file in enumerate(new_files, 1):
+                try:
+                    self.services.get("search").index_document(file)
+                except Exception as e:
+                    st.error(f"Could not index {file.name}: {str(e)}")
+                progress_bar.progress(done / len(new_files))
+            st.success(f"Indexed {len(new_files)} PDF(s)")
+        
+        query = st.text_input("Search", placeholder="e.g. termination clause, indemn*")
+        if query:
+            started = time.perf_counter()
+            hits = self.services.get("search").search(query)
+            self.ui.render_search_results(hits, (time.perf_counter() - started) * 1000)
+        
+        stats = self.services.get("search").get_stats()
+        self.ui.render_search_index(stats, self.services.get("search").list_documents())
+        if stats["documents"] and st.button("Clear search index"):
+            self.services.get("search").clear_index()
+            st.rerun()
+    
+    def _handle_metrics(self):
+        """Show per-operation latency, phase and size statistics and this session's history"""
+        st.header("📈 Performance")
+        metrics = Metrics.get_shared()
+        
+        self.ui.render_metrics(metrics.snapshot())
+        self.ui.render_history(SessionManager.get_history())
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            self.ui.render_download_button(
+                "Download Prometheus Metrics", metrics.to_prometheus().encode('utf-8'), "metrics.prom", "text/plain"
+            )
+        with col2:
+            if st.button("Reset metrics"):
+                metrics.reset()
+                st.rerun()
+    
+    def _submit_job(self, job_key, uploaded_file, label, service_name, method, *args, metadata=None):
+        """Queue a service call (``service_name`` as in ServiceRegistry) in the background and track it for this page"""
+        job = JobQueue.get_shared().submit(
+            label, _run_service_job, service_name, method, uploaded_file, *args, metadata=metadata
+        )
+        content_hash = self.document_cache.get_entry(uploaded_file).content_hash
+        SessionManager.track_job(job_key, job.id, content_hash)
+    
+    def _poll_job(self, job_key, uploaded_file):
+        """Show progress for this page's job; returns it once it has finished
+        
+        While the job runs, the page re-runs itself every ``poll_interval``
+        seconds to refresh the progress bar. Jobs submitted for a different
+        upload are ignored.
+        """
+        tracked = SessionManager.get_tracked_job(job_key)
+        if tracked is None:
+            return None
+        if tracked["content_hash"] != self.document_cache.get_entry(uploaded_file).content_hash:
+            return None
+        
+        job = JobQueue.get_shared().get(tracked["job_id"])
+        if job is None:
+            SessionManager.forget_job(job_key)  # Pruned after its retention time
+            return None
+        
+        if job.is_active:
+            self.ui.render_progress_bar(job.progress, f"{job.label}: {job.message} ({job.elapsed():.0f}s)")
+            if job.partial is not None:
+                self.ui.render_text_preview(job.partial, AppConfig.TEXT_SETTINGS["preview_max_chars"], expanded=True)
+            with Metrics.idle():
+                time.sleep(AppConfig.JOB_SETTINGS["poll_interval"])
+            st.rerun()
+        
+        if not tracked.get("recorded"):
+            tracked["recorded"] = True
+            SessionManager.add_to_history(
+                job_key, job.label if job.state == Job.DONE else f"{job.label}: {job.error}",
+                job.elapsed(), size_of(uploaded_file), size_of(job.result) if job.state == Job.DONE else None
+            )
+        return job
     
     def _handle_conversion_result(self, result, original_filename):
         """Handle the result of PDF conversion"""
@@ -181,8 +555,7 @@ class PDFController:
             )
         elif result["type"] == "text_preview":
             st.success(result["message"])
-            with st.expander("View Extracted Text"):
-                st.text_area("Content:", value=result["text"], height=300, disabled=True)
+            self.ui.render_text_preview([result["text"]], AppConfig.TEXT_SETTINGS["preview_max_chars"])
             self.ui.render_download_button(
                 result["button_label"],
                 result["data"],
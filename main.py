@@ -1,7 +1,6 @@
 # main.py
 import streamlit as st
 from config.app_config import AppConfig
-from ui.layout import UILayout
 from controllers.pdf_controller import PDFController
 from utils.session_manager import SessionManager
 
@@ -12,11 +11,9 @@ def main():
     # Initialize session manager
     SessionManager.initialize()
     
-    # Initialize UI layout
-    ui = UILayout()
-    
-    # Initialize PDF controller
-    pdf_controller = PDFController()
+    # Reuse this session's PDF controller and its UI layout
+    pdf_controller = SessionManager.get_controller(PDFController)
+    ui = pdf_controller.ui
     
     # Render main UI
     ui.render_header()
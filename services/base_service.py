@@ -1,10 +1,18 @@
 import tempfile
 import os
 from abc import ABC, abstractmethod
+from utils.result_cache import ResultCache
+from utils.document_cache import DocumentCache
+from utils.pdf_buffer import PDFBuffer
+from utils.input_file import InputFile
+from utils.metrics import Metrics
 
 class BaseService(ABC):
     """Base service class with common functionality"""
     
+    def __init__(self, document_cache=None):
+        self.document_cache = document_cache or DocumentCache()
+    
     def create_temp_file(self, suffix=''):
         """Create a temporary file and return its path"""
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
@@ -18,9 +26,37 @@ class BaseService(ABC):
         except Exception:
             pass  # Ignore cleanup errors
     
-    def write_uploaded_file_to_temp(self, uploaded_file, suffix=''):
-        """Write uploaded file to temporary location"""
-        temp_path = self.create_temp_file(suffix)
-        with open(temp_path, 'wb') as f:
-            f.write(uploaded_file.getvalue())
-        return temp_path
+    def as_input(self, source):
+        """Accept an upload, a file path or PDF bytes as a service input"""
+        return InputFile.wrap(source)
+    
+    def open_buffer(self, source):
+        """Get a zero-copy PDFBuffer over an upload, bytes or a path"""
+        return PDFBuffer(source)
+    
+    @staticmethod
+    def track_progress(items, total, progress_callback, message):
+        """Yield items, reporting ``progress_callback(done, total, message)`` after each one
+        
+        ``message`` may use ``{done}`` and ``{total}`` placeholders.
+        """
+        if progress_callback is None:
+            yield from items
+            return
+        for done, item in enumerate(items, 1):
+            yield item
+            progress_callback(done, total, message.format(done=done, total=total))
+    
+    def cached_result(self, operation, inputs, params, compute):
+        """Return a cached result for these inputs and parameters, computing it on a miss"""
+        cache = ResultCache.get_shared()
+        with Metrics.phase("read"):
+            key = cache.make_key(operation, inputs, params)
+        found, value = cache.get(key)
+        if found:
+            Metrics.annotate(cache_hit=True)
+            return value
+        
+        value = compute()
+        cache.put(key, value)
+        return value
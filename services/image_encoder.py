@@ -0,0 +1,171 @@
+import io
+import struct
+import fitz  # PyMuPDF
+from PIL import Image
+
+class ImageEncoder:
+    """Encodes decoded images for PDF embedding and keeps the smallest candidate
+    
+    Candidates are JPEG at the requested quality, Flate with PNG predictors
+    and, for images with at most 256 colors, a palette (Indexed) Flate stream.
+    Each candidate carries everything needed to rewrite the image dictionary.
+    """
+    
+    @staticmethod
+    def decode(image_bytes):
+        """Decode image bytes to an 8-bit GRAY/RGB pixmap without alpha
+        
+        Returns None for colorspaces we leave untouched (CMYK and friends).
+        """
+        pix = fitz.Pixmap(image_bytes)
+        if pix.n - pix.alpha >= 4:
+            return None
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)  # Transparency lives in the image's SMask
+        return pix
+    
+    @staticmethod
+    def downsample(pix, scale):
+        """Resample a pixmap by ``scale`` (only ever shrinks)"""
+        if scale >= 1:
+            return pix
+        width = max(1, round(pix.width * scale))
+        height = max(1, round(pix.height * scale))
+        return fitz.Pixmap(pix, width, height, None)
+    
+    @classmethod
+    def encode_smallest(cls, pix, quality, original_length=None, lossless=None):
+        """Encode every candidate and return the smallest, or None if the original wins
+        
+        ``lossless`` may carry candidates from ``encode_lossless`` computed
+        earlier; they do not depend on quality, so callers that try several
+        qualities only pay for the JPEG encode each time.
+        """
+        if lossless is None:
+            lossless = cls.encode_lossless(pix)
+        candidates = [cls.encode_jpeg(pix, quality)] + lossless
+        
+        best = min(candidates, key=lambda candidate: len(candidate["data"]))
+        if original_length is not None and len(best["data"]) >= original_length:
+            return None
+        return best
+    
+    @classmethod
+    def encode_lossless(cls, pix):
+        """Encode the quality-independent candidates (Flate and, if it applies, palette)"""
+        candidates = [cls.encode_flate(pix)]
+        palette = cls.encode_palette(pix)
+        if palette is not None:
+            candidates.append(palette)
+        return candidates
+    
+    @staticmethod
+    def encode_jpeg(pix, quality):
+        """Encode a pixmap as a DCTDecode stream"""
+        return {
+            "encoding": "jpeg",
+            "data": pix.tobytes("jpeg", jpg_quality=quality),
+            "width": pix.width,
+            "height": pix.height,
+            "filter": "/DCTDecode",
+            "decode_parms": "null",
+            "colorspace": "/DeviceGray" if pix.n == 1 else "/DeviceRGB",
+            "bits": 8
+        }
+    
+    @classmethod
+    def encode_flate(cls, pix):
+        """Encode a pixmap as a lossless Flate stream with PNG predictors"""
+        colors = pix.n
+        return {
+            "encoding": "flate",
+            "data": cls._png_idat(pix.tobytes("png")),
+            "width": pix.width,
+            "height": pix.height,
+            "filter": "/FlateDecode",
+            "decode_parms": f"<</Predictor 15/Colors {colors}/BitsPerComponent 8/Columns {pix.width}>>",
+            "colorspace": "/DeviceGray" if colors == 1 else "/DeviceRGB",
+            "bits": 8
+        }
+    
+    @classmethod
+    def encode_palette(cls, pix):
+        """Encode a pixmap with at most 256 colors as an Indexed Flate stream"""
+        mode = "L" if pix.n == 1 else "RGB"
+        image = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+        colors = image.getcolors(256)
+        if colors is None:
+            return None
+        if mode == "L":
+            if len(colors) > 16:
+                return None  # 8-bit gray is already one byte per pixel
+            image = image.convert("RGB")
+        
+        count = len(colors)
+        bits = 1 if count <= 2 else 2 if count <= 4 else 4 if count <= 16 else 8
+        paletted = image.convert("P", palette=Image.Palette.ADAPTIVE, colors=count)
+        palette = bytes(paletted.getpalette()[:count * 3])
+        
+        buffer = io.BytesIO()
+        paletted.save(buffer, format="PNG", bits=bits, optimize=False)
+        return {
+            "encoding": "palette",
+            "data": cls._png_idat(buffer.getvalue()),
+            "width": pix.width,
+            "height": pix.height,
+            "filter": "/FlateDecode",
+            "decode_parms": f"<</Predictor 15/Colors 1/BitsPerComponent {bits}/Columns {pix.width}>>",
+            "colorspace": f"[/Indexed /DeviceRGB {count - 1} <{palette.hex()}>]",
+            "bits": bits
+        }
+    
+    @classmethod
+    def write(cls, doc, xref, encoded):
+        """Replace an image stream and update its dictionary to match the new encoding
+        
+        A soft mask is resampled to the new size in the same pass, so the
+        image and its /SMask never disagree on dimensions.
+        """
+        resized = (
+            doc.xref_get_key(xref, "Width")[1] != str(encoded["width"])
+            or doc.xref_get_key(xref, "Height")[1] != str(encoded["height"])
+        )
+        doc.update_stream(xref, encoded["data"], compress=False)
+        doc.xref_set_key(xref, "Filter", encoded["filter"])
+        doc.xref_set_key(xref, "DecodeParms", encoded["decode_parms"])
+        doc.xref_set_key(xref, "Decode", "null")
+        doc.xref_set_key(xref, "Width", str(encoded["width"]))
+        doc.xref_set_key(xref, "Height", str(encoded["height"]))
+        doc.xref_set_key(xref, "BitsPerComponent", str(encoded["bits"]))
+        doc.xref_set_key(xref, "ColorSpace", encoded["colorspace"])
+        if resized:
+            cls._resample_smask(doc, xref, encoded["width"], encoded["height"])
+    
+    @classmethod
+    def _resample_smask(cls, doc, xref, width, height):
+        """Resample an image's soft mask to ``width`` x ``height`` and rewrite it as Flate"""
+        kind, value = doc.xref_get_key(xref, "SMask")
+        if kind != "xref":
+            return
+        
+        smask = int(value.split()[0])
+        mask = fitz.Pixmap(doc, smask)
+        if (mask.width, mask.height) == (width, height):
+            return  # Shared with an image that was already resampled to this size
+        if mask.n != 1:
+            mask = fitz.Pixmap(fitz.csGRAY, mask)
+        cls.write(doc, smask, cls.encode_flate(fitz.Pixmap(mask, width, height, None)))
+    
+    @staticmethod
+    def _png_idat(png_bytes):
+        """Extract the zlib data from a non-interlaced PNG (already predictor-filtered)"""
+        position = 8  # Skip the PNG signature
+        chunks = []
+        while position < len(png_bytes):
+            length, chunk_type = struct.unpack(">I4s", png_bytes[position:position + 8])
+            if chunk_type == b"IDAT":
+                chunks.append(png_bytes[position + 8:position + 8 + length])
+            elif chunk_type == b"IEND":
+                break
+            position += 12 + length
+        return b"".join(chunks)
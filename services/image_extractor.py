@@ -0,0 +1,143 @@
+import fitz  # PyMuPDF
+import zlib
+import struct
+import hashlib
+import zipfile
+import tempfile
+from config.app_config import AppConfig
+
+class ImageExtractor:
+    """Copies the images embedded in a PDF out without re-rendering any page
+    
+    JPEG and JPEG 2000 streams are already complete image files and are
+    copied byte for byte, unless a soft mask has to be added. Gray and RGB Flate streams with PNG predictors
+    (as ImageEncoder writes them) are already PNG image data and only get a
+    PNG header. Other images are decoded and written as PNG, with their soft
+    mask as the alpha channel. An image drawn on several pages, or
+    stored twice under different xrefs, is written once. Inline images are
+    not extracted, and an image that cannot be decoded is skipped rather
+    than failing the whole export.
+    """
+    
+    # Filters whose streams are complete image files, and their extensions
+    PASSTHROUGH_FILTERS = {"DCTDecode": "jpg", "JPXDecode": "jp2"}
+    
+    # Bit depths PNG allows per color type (0 = gray, 2 = RGB)
+    PNG_BIT_DEPTHS = {0: (1, 2, 4, 8, 16), 2: (8, 16)}
+    
+    def __init__(self, settings=None):
+        self.settings = settings or AppConfig.IMAGE_EXTRACT_SETTINGS
+    
+    def iter_images(self, buffer, page_indexes, progress_callback=None):
+        """Yield (page_num, number_on_page, extension, image_bytes) for each distinct image
+        
+        ``extension`` and ``image_bytes`` are None for an image that could not
+        be decoded.
+        """
+        doc = fitz.open(stream=buffer.view, filetype="pdf")
+        try:
+            seen_xrefs = set()
+            seen_digests = set()
+            for done, page_num in enumerate(page_indexes, 1):
+                number = 0
+                for xref, smask, width, height, bits, _, _, _, image_filter, _ in doc.get_page_images(page_num, full=True):
+                    if xref in seen_xrefs:
+                        continue
+                    seen_xrefs.add(xref)
+                    if min(width, height) < self.settings["min_side_px"]:
+                        continue
+                    
+                    # Compare raw streams, so duplicates are dropped before anything is decoded
+                    raw = doc.xref_stream_raw(xref)
+                    digest = hashlib.blake2b(raw, digest_size=20)
+                    if smask:
+                        digest.update(doc.xref_stream_raw(smask))
+                    digest = digest.digest()
+                    if digest in seen_digests:
+                        continue
+                    seen_digests.add(digest)
+                    
+                    number += 1
+                    try:
+                        exported = self._export(doc, xref, smask, image_filter, raw, width, height, bits)
+                    except Exception:
+                        exported = (None, None)  # Damaged or unsupported stream; keep the rest
+                    yield (page_num, number) + exported
+                if progress_callback is not None:
+                    progress_callback(done, len(page_indexes), f"Scanned page {done} of {len(page_indexes)}")
+        finally:
+            doc.close()
+    
+    def _export(self, doc, xref, smask, image_filter, raw, width, height, bits):
+        """Get (extension, bytes): the stream itself if it is an image file, else a PNG"""
+        extension = self.PASSTHROUGH_FILTERS.get(image_filter)
+        if extension and not smask:
+            return extension, raw
+        if image_filter == "FlateDecode" and not smask:
+            png_bytes = self._wrap_png_data(doc, xref, raw, width, height, bits)
+            if png_bytes is not None:
+                return "png", png_bytes
+        
+        pix = fitz.Pixmap(doc, xref)
+        if pix.colorspace is not None and pix.colorspace.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)  # PNG holds only gray and RGB
+        if smask:
+            mask = fitz.Pixmap(doc, smask)
+            if mask.n != 1:
+                mask = fitz.Pixmap(fitz.csGRAY, mask)
+            if (mask.width, mask.height) != (pix.width, pix.height):
+                mask = fitz.Pixmap(mask, pix.width, pix.height, None)  # A mask may differ in size
+            pix = fitz.Pixmap(pix, mask)
+        return "png", pix.tobytes("png")
+    
+    @classmethod
+    def _wrap_png_data(cls, doc, xref, raw, width, height, bits):
+        """Wrap a Flate stream with PNG predictors in a PNG file, or None if it does not qualify
+        
+        With predictors 10-15 every row starts with its PNG filter byte, so
+        the stream is exactly what a PNG's IDAT chunk holds.
+        """
+        def value(name, default=None):
+            kind, text = doc.xref_get_key(xref, name)
+            if kind == "null":
+                return default
+            return int(text) if kind == "int" else text
+        
+        color_type = {"/DeviceGray": 0, "/DeviceRGB": 2}.get(value("ColorSpace"))
+        if color_type is None or value("Decode") or value("Mask"):
+            return None
+        colors = 1 if color_type == 0 else 3
+        if (value("DecodeParms/Predictor", 1) not in range(10, 16)
+                or value("DecodeParms/Colors", 1) != colors
+                or value("DecodeParms/BitsPerComponent", 8) != bits
+                or value("DecodeParms/Columns", 1) != width
+                or bits not in cls.PNG_BIT_DEPTHS[color_type]):
+            return None
+        
+        def chunk(kind, body):
+            return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+        header = struct.pack(">IIBBBBB", width, height, bits, color_type, 0, 0, 0)
+        return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", raw) + chunk(b"IEND", b"")
+    
+    def extract_to_zip(self, buffer, page_indexes, progress_callback=None):
+        """Write each distinct image into a ZIP as it is found
+        
+        Returns (zip_bytes, image_count, skipped_count). Entries are stored,
+        not deflated, as the images are already compressed. The ZIP is
+        assembled in a spooled temp file, so the finished archive is held in
+        memory once.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=self.settings["spool_max_bytes"])
+        try:
+            count = skipped = 0
+            with zipfile.ZipFile(spool, 'w', zipfile.ZIP_STORED) as zip_file:
+                for page_num, number, extension, image_bytes in self.iter_images(buffer, page_indexes, progress_callback):
+                    if image_bytes is None:
+                        skipped += 1
+                        continue
+                    zip_file.writestr(f"page_{page_num + 1}_image_{number}.{extension}", image_bytes)
+                    count += 1
+            spool.seek(0)
+            return spool.read(), count, skipped
+        finally:
+            spool.close()
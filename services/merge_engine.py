@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import fitz  # PyMuPDF
+from PyPDF2 import PdfReader, PdfWriter
+from config.app_config import AppConfig
+from utils.pdf_buffer import PDFBuffer
+from utils.metrics import Metrics
+from services.stream_deduplicator import StreamDeduplicator
+
+class MergeEngine:
+    """Appends PDFs one at a time into a merged document on disk
+    
+    The PyMuPDF path inserts each input, then every ``flush_bytes`` of input
+    saves the work file incrementally and reopens it, so pages already
+    merged are read back from disk on demand instead of accumulating in
+    memory. Each input is released as soon as it has been inserted, which
+    keeps peak memory near the largest input (or ``flush_bytes``) rather
+    than the sum of all inputs. Inputs PyMuPDF cannot handle fall back to
+    PyPDF2, which holds the whole merge in memory.
+    
+    With ``deduplicate`` enabled, streams repeated across inputs (shared
+    fonts, logos, ICC profiles) are stored once; see StreamDeduplicator.
+    """
+    
+    def __init__(self, settings=None):
+        self.settings = settings or AppConfig.MERGE_SETTINGS
+    
+    def merge(self, sources, output):
+        """Merge ``sources`` (uploads, paths or bytes) into the binary file ``output``
+        
+        Returns a report dict with the engine used, the page count and, for
+        the PyMuPDF path, how many duplicate streams (and bytes) were dropped.
+        """
+        work_dir = tempfile.mkdtemp(prefix="pdf_merge_")
+        merged_path = os.path.join(work_dir, "merged.pdf")
+        try:
+            try:
+                report = self._merge_pymupdf(sources, work_dir, merged_path)
+            except Exception:
+                report = self._merge_pypdf(sources, merged_path)
+            
+            with open(merged_path, 'rb') as merged:
+                shutil.copyfileobj(merged, output, 1024 * 1024)
+            return report
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def _merge_pymupdf(self, sources, work_dir, merged_path):
+        """Incrementally insert every source with PyMuPDF"""
+        work_path = os.path.join(work_dir, "work.pdf")
+        deduplicator = StreamDeduplicator() if self.settings["deduplicate"] else None
+        merged = fitz.open()
+        saved = False
+        pending_bytes = 0
+        
+        try:
+            for index, source in enumerate(sources):
+                with PDFBuffer(source) as buffer:
+                    document = fitz.open(stream=buffer.view, filetype="pdf")
+                    try:
+                        first_xref = merged.xref_length()
+                        merged.insert_pdf(document)
+                    finally:
+                        document.close()
+                    pending_bytes += buffer.size
+                
+                if deduplicator is not None:
+                    deduplicator.deduplicate(merged, first_xref)
+                
+                is_last = index == len(sources) - 1
+                if pending_bytes >= self.settings["flush_bytes"] or is_last:
+                    if saved:
+                        merged.saveIncr()
+                    else:
+                        merged.save(work_path)
+                        saved = True
+                    merged.close()
+                    merged = fitz.open(work_path)
+                    pending_bytes = 0
+            
+            # Rewrite once without the superseded objects of the incremental
+            # saves and the duplicates that are no longer referenced
+            report = {"engine": "pymupdf", "page_count": len(merged), "duplicates_removed": 0, "bytes_saved": 0}
+            if deduplicator is not None:
+                report.update(deduplicator.get_report())
+            with Metrics.phase("serialize"):
+                merged.save(merged_path, garbage=1)
+            return report
+        finally:
+            merged.close()
+    
+    def _merge_pypdf(self, sources, merged_path):
+        """Merge every source with PyPDF2 (no deduplication)"""
+        writer = PdfWriter()
+        buffers = []
+        try:
+            for source in sources:
+                buffer = PDFBuffer(source)
+                buffers.append(buffer)  # Pages stay backed by their reader until written
+                writer.append(PdfReader(buffer.open_stream()))
+            
+            with open(merged_path, 'wb') as f:
+                writer.write(f)
+            return {"engine": "pypdf2", "page_count": len(writer.pages), "duplicates_removed": 0, "bytes_saved": 0}
+        finally:
+            writer.close()
+            for buffer in buffers:
+                buffer.close()
@@ -0,0 +1,109 @@
+from services.stream_deduplicator import find_references
+
+class PageSizeIndex:
+    """Estimates the bytes each page adds to a part without writing anything
+    
+    Every page maps to the set of objects it reaches (its page object,
+    content streams, fonts, images and other resources, including those
+    inherited from the page tree). Object sizes come from their serialized
+    dictionaries and raw (still encoded) stream data, which is what
+    ``insert_pdf`` copies. A part's cost is the size of the union of its
+    pages' objects, so a font shared by many pages is counted once per part.
+    """
+    
+    # Per-object cost of the cross-reference entry and "N 0 obj ... endobj"
+    OBJECT_OVERHEAD = 40
+    # Header, trailer, catalog and page tree of a new part
+    PART_OVERHEAD = 1024
+    
+    def __init__(self, doc):
+        self.doc = doc
+        self._page_xrefs = {doc.page_xref(number) for number in range(len(doc))}
+        self._sizes = {}
+        self._references = {}
+    
+    def page_objects(self, page_number):
+        """Xrefs of every object reached from page ``page_number`` (0-based)"""
+        page_xref = self.doc.page_xref(page_number)
+        objects = set()
+        pending = [page_xref] + self._inherited_references(page_xref)
+        while pending:
+            xref = pending.pop()
+            if xref in objects:
+                continue
+            objects.add(xref)
+            for reference in self._get_references(xref, skip_parent=xref == page_xref):
+                # Links and annotations can point at other pages; those are
+                # not copied with this one
+                if reference not in objects and reference not in self._page_xrefs:
+                    pending.append(reference)
+        return objects
+    
+    def object_size(self, xref):
+        """Approximate serialized size of one object"""
+        size = self._sizes.get(xref)
+        if size is None:
+            size = len(self.doc.xref_object(xref)) + self.OBJECT_OVERHEAD
+            if self.doc.xref_is_stream(xref):
+                size += len(self.doc.xref_stream_raw(xref) or b"")
+            self._sizes[xref] = size
+        return size
+    
+    def plan_parts(self, max_part_bytes):
+        """Cut the document into consecutive (start, end) ranges in one greedy pass
+        
+        Each part takes pages until the next one would push its estimated
+        size over ``max_part_bytes``. A page that is too large on its own
+        becomes a part by itself. Returns 1-based, inclusive ranges.
+        """
+        page_count = len(self.doc)
+        ranges = []
+        part_start = 0
+        part_objects = set()
+        part_bytes = self.PART_OVERHEAD
+        
+        for number in range(page_count):
+            objects = self.page_objects(number)
+            added = sum(self.object_size(xref) for xref in objects - part_objects)
+            if part_objects and part_bytes + added > max_part_bytes:
+                ranges.append((part_start + 1, number))
+                part_start = number
+                part_objects = set()
+                part_bytes = self.PART_OVERHEAD
+                added = sum(self.object_size(xref) for xref in objects)
+            part_objects |= objects
+            part_bytes += added
+        
+        if page_count:
+            ranges.append((part_start + 1, page_count))
+        return ranges
+    
+    def _get_references(self, xref, skip_parent=False):
+        """Xrefs referenced by an object's dictionary (parsed once per object)"""
+        references = self._references.get(xref)
+        if references is None:
+            text = self.doc.xref_object(xref, compressed=True)
+            references = find_references(text)
+            self._references[xref] = references
+        if skip_parent:
+            parent = self._parent(xref)
+            return [reference for reference in references if reference != parent]
+        return references
+    
+    def _parent(self, xref):
+        kind, value = self.doc.xref_get_key(xref, "Parent")
+        return int(value.split()[0]) if kind == "xref" else None
+    
+    def _inherited_references(self, page_xref):
+        """Resources a page inherits from its ancestors in the page tree"""
+        if self.doc.xref_get_key(page_xref, "Resources")[0] != "null":
+            return []
+        xref = self._parent(page_xref)
+        while xref is not None:
+            kind, value = self.doc.xref_get_key(xref, "Resources")
+            if kind == "xref":
+                return [int(value.split()[0])]
+            if kind == "dict":
+                return find_references(value)
+            xref = self._parent(xref)
+        return []
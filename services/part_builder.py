@@ -0,0 +1,76 @@
+import fitz  # PyMuPDF
+import zipfile
+import tempfile
+from config.app_config import AppConfig
+from utils.worker_pool import WorkerPool
+
+# Source document opened once per worker process
+_worker_doc = None
+
+def _init_worker(pdf_path):
+    """Open the source PDF once in each worker process"""
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+def _build_part(doc, start, end):
+    """Copy pages ``start``-``end`` (1-based, inclusive) into a new PDF
+    
+    ``insert_pdf`` copies only the objects the selected pages reach, and
+    copies each of them once per part, so a font or image shared by every
+    page of the part is stored once in it.
+    """
+    part = fitz.open()
+    try:
+        part.insert_pdf(doc, from_page=start - 1, to_page=end - 1)
+        return part.tobytes(garbage=1)
+    finally:
+        part.close()
+
+def _build_batch(ranges):
+    """Build a batch of parts inside a worker process"""
+    return [(index, _build_part(_worker_doc, start, end)) for index, start, end in ranges]
+
+class PartBuilder:
+    """Builds one PDF per page range from a single parse and streams them into a ZIP"""
+    
+    def __init__(self, settings=None):
+        self.settings = settings or AppConfig.SPLIT_SETTINGS
+    
+    def iter_parts(self, doc, buffer, ranges):
+        """Yield (index, pdf_bytes) as parts finish building
+        
+        A few parts are built inline from the already-parsed ``doc``; many
+        parts are spread over a process pool whose workers each open the
+        buffer's file path once, so the source is never pickled to them.
+        """
+        tasks = [(index, start, end) for index, (start, end) in enumerate(ranges)]
+        
+        if len(tasks) < self.settings["parallel_min_parts"]:
+            for index, start, end in tasks:
+                yield index, _build_part(doc, start, end)
+            return
+        
+        workers = WorkerPool.resolve_workers(self.settings["max_workers"])
+        batches = WorkerPool.chunk(tasks, self.settings["parts_per_task"])
+        
+        with WorkerPool.create(workers, _init_worker, (buffer.path(),)) as executor:
+            for built in WorkerPool.imap_unordered(executor, _build_batch, ((batch,) for batch in batches), workers * 2):
+                yield from built
+    
+    def build_zip(self, doc, buffer, ranges, names, progress_callback=None):
+        """Build every part and write each into a ZIP as soon as it is ready
+        
+        The ZIP is assembled in a spooled temp file and returned as bytes, so
+        the finished archive is held in memory once.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=self.settings["spool_max_bytes"])
+        try:
+            with zipfile.ZipFile(spool, 'w') as zip_file:
+                for done, (index, pdf_bytes) in enumerate(self.iter_parts(doc, buffer, ranges), 1):
+                    zip_file.writestr(names[index], pdf_bytes)
+                    if progress_callback is not None:
+                        progress_callback(done, len(ranges), f"Built part {done} of {len(ranges)}")
+            spool.seek(0)
+            return spool.read()
+        finally:
+            spool.close()
@@ -1,50 +1,351 @@
-import fitz  # PyMuPDF
+import math
+import time
 from config.app_config import AppConfig
 from services.base_service import BaseService
+from services.image_encoder import ImageEncoder
+from utils.worker_pool import WorkerPool
+from utils.metrics import Metrics, instrumented
+
+def _recompress_image(xref, image_bytes, quality, scale, original_length):
+    """Decode, downsample and adaptively re-encode one image (runs in a worker process)"""
+    pix = ImageEncoder.decode(image_bytes)
+    if pix is None:
+        return xref, None
+    
+    original_pixels = pix.width * pix.height
+    pix = ImageEncoder.downsample(pix, scale)
+    return xref, {
+        "encoded": ImageEncoder.encode_smallest(pix, quality, original_length),
+        "original_length": original_length,
+        "original_pixels": original_pixels,
+        "pixels": pix.width * pix.height
+    }
 
 class PDFCompressorService(BaseService):
     """Service for PDF compression operations"""
     
-    def compress_pdf(self, uploaded_file, compression_level):
+    def __init__(self, document_cache=None, settings=None):
+        super().__init__(document_cache)
+        self.settings = settings or AppConfig.COMPRESSOR_SETTINGS
+    
+    def compress_pdf(self, uploaded_file, compression_level, progress_callback=None):
         """Compress PDF file"""
-        temp_input = self.write_uploaded_file_to_temp(uploaded_file, '.pdf')
-        temp_output = self.create_temp_file('.pdf')
+        return self.compress_pdf_with_report(uploaded_file, compression_level, progress_callback)["data"]
+    
+    @instrumented("compress")
+    def compress_pdf_with_report(self, uploaded_file, compression_level, progress_callback=None):
+        """Compress PDF file and report what the image pass removed
+        
+        ``progress_callback(done, total, message)`` is called as images finish.
+        """
+        uploaded_file = self.as_input(uploaded_file)
+        params = {
+            "compression_level": compression_level,
+            "settings": AppConfig.COMPRESSION_LEVELS[compression_level],
+            "compressor": self.settings
+        }
+        return self.cached_result(
+            "compress", [uploaded_file], params,
+            lambda: self._compress(uploaded_file, compression_level, progress_callback)
+        )
+    
+    def _compress(self, uploaded_file, compression_level, progress_callback=None):
+        """Downsample and recompress images, then rewrite the PDF"""
+        # Get compression settings
+        settings = AppConfig.COMPRESSION_LEVELS[compression_level]
+        quality = settings["quality"]
+        target_dpi = settings["dpi"]
+        
+        # Reuse the session's parsed handle; we modify it, so take ownership
+        doc = self.document_cache.checkout_fitz_document(uploaded_file)
+        
+        report = {
+            "level": compression_level,
+            "target_dpi": target_dpi,
+            "images": 0,
+            "images_downsampled": 0,
+            "pixels_before": 0,
+            "pixels_after": 0,
+            "image_bytes_before": 0,
+            "image_bytes_after": 0,
+            "encodings": {"original": 0, "jpeg": 0, "flate": 0, "palette": 0}
+        }
         
         try:
-            # Get compression settings
-            settings = AppConfig.COMPRESSION_LEVELS[compression_level]
-            quality = settings["quality"]
-            
-            # Open PDF with PyMuPDF
-            doc = fitz.open(temp_input)
-            
-            # Compress images in PDF
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                image_list = page.get_images()
-                
-                for img_index, img in enumerate(image_list):
-                    xref = img[0]
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    
-                    # Save compressed image back to PDF
-                    pix = fitz.Pixmap(image_bytes)
-                    if pix.n - pix.alpha < 4:  # GRAY or RGB
-                        compressed_img = pix.tobytes("jpeg", jpg_quality=quality)
-                        doc._updateStream(xref, compressed_img)
-                    pix = None
+            # Recompress each distinct image once, then write the new streams back
+            placements = self._collect_image_placements(doc)
+            for xref, image in self._recompress_images(doc, placements, quality, target_dpi, progress_callback):
+                if image is None:
+                    continue
+                
+                report["images"] += 1
+                report["image_bytes_before"] += image["original_length"]
+                report["pixels_before"] += image["original_pixels"]
+                
+                encoded = image["encoded"]
+                if encoded is None:
+                    # Every candidate was larger than the stream we already have
+                    report["encodings"]["original"] += 1
+                    report["image_bytes_after"] += image["original_length"]
+                    report["pixels_after"] += image["original_pixels"]
+                    continue
+                
+                report["encodings"][encoded["encoding"]] += 1
+                report["image_bytes_after"] += len(encoded["data"])
+                report["pixels_after"] += image["pixels"]
+                if image["pixels"] < image["original_pixels"]:
+                    report["images_downsampled"] += 1
+                
+                ImageEncoder.write(doc, xref, encoded)
             
-            # Save compressed PDF
-            doc.save(temp_output, garbage=4, deflate=True)
+            # Save compressed PDF straight to memory
+            with Metrics.phase("serialize"):
+                compressed_data = doc.tobytes(garbage=4, deflate=True)
+        finally:
+            doc.close()
+        
+        # Never hand back a file that is larger than the upload; its images are then untouched
+        report["kept_original"] = len(compressed_data) >= self.document_cache.get_buffer(uploaded_file).size
+        if report["kept_original"]:
+            compressed_data = uploaded_file.getvalue()
+            report.update({
+                "images_downsampled": 0,
+                "pixels_after": report["pixels_before"],
+                "image_bytes_after": report["image_bytes_before"],
+                "encodings": dict(dict.fromkeys(report["encodings"], 0), original=report["images"])
+            })
+        report["pixels_removed"] = report["pixels_before"] - report["pixels_after"]
+        report["bytes_saved"] = report["image_bytes_before"] - report["image_bytes_after"]
+        
+        return {"data": compressed_data, "report": report}
+    
+    @instrumented("compress_target")
+    def compress_to_target_size(self, uploaded_file, target_bytes, progress_callback=None):
+        """Compress PDF file until it fits in ``target_bytes``, searching quality and DPI
+        
+        ``progress_callback(done, total, message)`` is called per search step.
+        """
+        uploaded_file = self.as_input(uploaded_file)
+        params = {
+            "target_bytes": int(target_bytes),
+            "settings": AppConfig.TARGET_SIZE_SETTINGS,
+            "compressor": self.settings
+        }
+        return self.cached_result(
+            "compress_target", [uploaded_file], params,
+            lambda: self._compress_to_target(uploaded_file, int(target_bytes), progress_callback)
+        )
+    
+    def _compress_to_target(self, uploaded_file, target_bytes, progress_callback=None):
+        """Search encode settings against a size estimate, then write the PDF once"""
+        started = time.perf_counter()
+        settings = AppConfig.TARGET_SIZE_SETTINGS
+        original_size = self.document_cache.get_buffer(uploaded_file).size
+        report = {
+            "target_bytes": target_bytes,
+            "iterations": 0,
+            "writes": 0,
+            "dpi": None,
+            "quality": None,
+            "reached_target": original_size <= target_bytes,
+            "kept_original": True
+        }
+        
+        if report["reached_target"]:
+            report["elapsed"] = time.perf_counter() - started
+            return {"data": uploaded_file.getvalue(), "report": report}
+        
+        # Decode every eligible image exactly once; search steps only re-encode
+        doc = self.document_cache.checkout_fitz_document(uploaded_file)
+        images = {}
+        for xref, length, dpi in self._eligible_images(doc, self._collect_image_placements(doc)):
+            pix = ImageEncoder.decode(doc.extract_image(xref)["image"])
+            if pix is not None:
+                images[xref] = {"pix": pix, "length": length, "dpi": dpi}
+        base_size = original_size - sum(image["length"] for image in images.values())
+        variants = {}
+        
+        def estimate(dpi, quality):
+            """Encode every image for one setting and estimate the output size"""
+            report["iterations"] += 1
+            if progress_callback is not None:
+                progress_callback(
+                    report["iterations"], settings["max_iterations"],
+                    f"Trying {dpi or 'original'} DPI at quality {quality}"
+                )
+            choices = {}
+            size = base_size
+            for xref, image in images.items():
+                key = (xref, dpi)
+                if key not in variants:
+                    pix = ImageEncoder.downsample(image["pix"], self._scale_for(image["dpi"], dpi))
+                    variants[key] = {"pix": pix, "lossless": ImageEncoder.encode_lossless(pix)}
+                variant = variants[key]
+                encoded = ImageEncoder.encode_smallest(
+                    variant["pix"], quality, image["length"], variant["lossless"]
+                )
+                choices[xref] = encoded
+                size += image["length"] if encoded is None else len(encoded["data"])
+            return size, choices
+        
+        budget = target_bytes
+        best_data = None
+        try:
+            while report["writes"] < settings["max_writes"]:
+                dpi, quality, choices = self._search_target_setting(estimate, budget, settings, report)
+                
+                for xref, encoded in choices.items():
+                    if encoded is not None:
+                        ImageEncoder.write(doc, xref, encoded)
+                with Metrics.phase("serialize"):
+                    data = doc.tobytes(garbage=4, deflate=True)
+                report["writes"] += 1
+                
+                if len(data) < (original_size if best_data is None else len(best_data)):
+                    best_data = data
+                    report.update({"dpi": dpi, "quality": quality, "kept_original": False})
+                if len(data) <= target_bytes or report["iterations"] >= settings["max_iterations"]:
+                    break
+                
+                # The estimate missed; shrink the budget by the overshoot and start
+                # again from the untouched source so xrefs still line up
+                budget -= len(data) - target_bytes
+                doc.close()
+                doc = self.document_cache.checkout_fitz_document(uploaded_file)
+        finally:
             doc.close()
+        
+        if best_data is None:
+            best_data = uploaded_file.getvalue()
+        report["reached_target"] = len(best_data) <= target_bytes
+        report["elapsed"] = time.perf_counter() - started
+        return {"data": best_data, "report": report}
+    
+    def _search_target_setting(self, estimate, budget, settings, report):
+        """Find the highest-quality (dpi, quality) whose estimated size fits the budget
+        
+        DPI steps are tried from sharpest to smallest, binary-searching JPEG
+        quality down to ``quality_floor`` at each; only if nothing fits is the
+        quality allowed down to ``min_quality`` at the smallest DPI.
+        """
+        dpi_steps = settings["dpi_steps"]
+        passes = [(dpi, settings["quality_floor"]) for dpi in dpi_steps]
+        passes.append((dpi_steps[-1], settings["min_quality"]))
+        
+        fallback = None
+        for index, (dpi, low_quality) in enumerate(passes):
+            if fallback is not None and report["iterations"] >= settings["max_iterations"]:
+                break
+            is_last_resort = index == len(passes) - 1
+            high_quality = settings["quality_floor"] if is_last_resort else settings["max_quality"]
+            
+            size, choices = estimate(dpi, high_quality)
+            if size <= budget:
+                return dpi, high_quality, choices
             
-            # Read compressed data
-            with open(temp_output, 'rb') as f:
-                compressed_data = f.read()
+            size, choices = estimate(dpi, low_quality)
+            fallback = (dpi, low_quality, choices)
+            if size > budget:
+                continue
             
-            return compressed_data
+            # low_quality fits and high_quality does not: narrow the gap
+            best = fallback
+            while high_quality - low_quality > settings["quality_tolerance"]:
+                if report["iterations"] >= settings["max_iterations"]:
+                    break
+                quality = (low_quality + high_quality) // 2
+                size, choices = estimate(dpi, quality)
+                if size <= budget:
+                    low_quality, best = quality, (dpi, quality, choices)
+                else:
+                    high_quality = quality
+            return best
         
-        finally:
-            self.cleanup_temp_file(temp_input)
-            self.cleanup_temp_file(temp_output)
+        return fallback
+    
+    def _collect_image_placements(self, doc):
+        """Map each unique image xref to its lowest effective DPI on any page
+        
+        The lowest DPI comes from the largest placement, which is the one that
+        needs the most pixels, so downsampling to it keeps every placement at
+        or above the target resolution.
+        """
+        placements = {}
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            for info in page.get_image_info(xrefs=True):
+                xref = info["xref"]
+                if xref <= 0:
+                    continue  # Inline images have no xref to rewrite
+                
+                a, b, c, d = info["transform"][:4]
+                shown_width = math.hypot(a, b) / 72
+                shown_height = math.hypot(c, d) / 72
+                if shown_width <= 0 or shown_height <= 0:
+                    placements.setdefault(xref, None)
+                    continue
+                
+                dpi = min(info["width"] / shown_width, info["height"] / shown_height)
+                current = placements.get(xref)
+                placements[xref] = dpi if current is None else min(current, dpi)
+        return placements
+    
+    def _recompress_images(self, doc, placements, quality, target_dpi, progress_callback=None):
+        """Yield (xref, image) for each image worth re-encoding, on a worker pool when worthwhile"""
+        candidates = self._eligible_images(doc, placements)
+        tasks = (
+            (xref, doc.extract_image(xref)["image"], quality, self._scale_for(dpi, target_dpi), length)
+            for xref, length, dpi in candidates
+        )
+        message = "Recompressed image {done} of {total}"
+        
+        if len(candidates) < self.settings["parallel_min_images"]:
+            results = (_recompress_image(*task) for task in tasks)
+            yield from self.track_progress(results, len(candidates), progress_callback, message)
+            return
+        
+        workers = min(WorkerPool.resolve_workers(self.settings["max_workers"]), len(candidates))
+        with WorkerPool.create(workers) as executor:
+            results = WorkerPool.imap_unordered(executor, _recompress_image, tasks, workers * 2)
+            yield from self.track_progress(results, len(candidates), progress_callback, message)
+    
+    def _eligible_images(self, doc, placements):
+        """List (xref, stream_length, effective_dpi) for images worth re-encoding"""
+        candidates = []
+        for xref, dpi in placements.items():
+            if self._is_stencil_mask(doc, xref) or self._has_decode_or_mask(doc, xref):
+                continue
+            length = self._stream_length(doc, xref)
+            if length >= self.settings["min_image_bytes"]:
+                candidates.append((xref, length, dpi))
+        return candidates
+    
+    @staticmethod
+    def _scale_for(effective_dpi, target_dpi):
+        """Get the resampling factor that brings an image down to the target DPI"""
+        if not effective_dpi or not target_dpi or effective_dpi <= target_dpi:
+            return 1.0
+        return target_dpi / effective_dpi
+    
+    @staticmethod
+    def _is_stencil_mask(doc, xref):
+        """Check whether an image is a 1-bit stencil mask"""
+        return doc.xref_get_key(xref, "ImageMask")[1] == "true"
+    
+    @staticmethod
+    def _has_decode_or_mask(doc, xref):
+        """Check whether an image has a /Decode array or a /Mask
+        
+        Re-encoding works on the stored samples, so it would drop an inverting
+        /Decode and leave a colour-key /Mask matching samples that changed.
+        """
+        return any(doc.xref_get_key(xref, key)[0] != "null" for key in ("Decode", "Mask"))
+    
+    @staticmethod
+    def _stream_length(doc, xref):
+        """Get the stored (encoded) length of a stream object
+        
+        The raw stream is measured rather than trusting /Length, which may be an
+        indirect reference.
+        """
+        return len(doc.xref_stream_raw(xref) or b"")
@@ -1,109 +1,170 @@
-import pdf2image
-from pdf2docx import Converter
-from pdfminer.high_level import extract_text
-import zipfile
 from io import BytesIO
+from functools import partial
 from services.base_service import BaseService
+from services.image_extractor import ImageExtractor
+from services.rasterizer import PageRasterizer
+from services.text_extractor import TextExtractor
+from services.word_converter import WordConverter
+from utils.input_file import InputFile
+from utils.page_ranges import PageRanges
+from utils.metrics import Metrics, instrumented
+from config.app_config import AppConfig
 
 class PDFConverterService(BaseService):
     """Service for PDF conversion operations"""
     
-    def convert(self, uploaded_file, conversion_type):
-        """Convert PDF based on conversion type"""
+    # Metric names per conversion type
+    OPERATION_NAMES = {
+        "PDF to Word (.docx)": "convert_word",
+        "PDF to Images": "convert_images",
+        "Extract Embedded Images": "convert_embedded",
+        "PDF to Text": "convert_text"
+    }
+    
+    # Older conversion type names that callers may still pass
+    CONVERSION_ALIASES = {
+        "PDF to PNG Images": "PDF to Images"
+    }
+    
+    @instrumented("convert")
+    def convert(self, uploaded_file, conversion_type, text_engine=None, page_ranges=None, image_options=None,
+                progress_callback=None):
+        """Convert PDF based on conversion type
+        
+        ``progress_callback(done, total, message)`` is called as pages finish;
+        text extraction also passes ``partial=`` (see TextExtractor.extract).
+        ``text_engine`` picks the text extraction engine (default from
+        TEXT_SETTINGS). ``page_ranges`` limits any conversion to a list of
+        1-based, inclusive (start, end) ranges, or an expression such as
+        ``"1-3,7"`` (see PageRanges); pages outside it are never processed.
+        ``image_options`` overrides RASTER_SETTINGS export options (dpi,
+        format, quality, effort, reduce_channels) for image conversion.
+        """
+        uploaded_file = self.as_input(uploaded_file)
+        conversion_type = self.CONVERSION_ALIASES.get(conversion_type, conversion_type)
+        text_engine = text_engine or AppConfig.TEXT_SETTINGS["engine"]
         conversion_map = {
             "PDF to Word (.docx)": self._convert_to_word,
-            "PDF to PNG Images": self._convert_to_images,
-            "PDF to Text": self._convert_to_text
+            "PDF to Images": partial(self._convert_to_images, image_options=image_options),
+            "Extract Embedded Images": self._extract_images,
+            "PDF to Text": partial(self._convert_to_text, engine=text_engine)
         }
         
         converter = conversion_map.get(conversion_type)
         if converter:
-            return converter(uploaded_file)
+            Metrics.annotate(operation=self.OPERATION_NAMES[conversion_type])
+            if isinstance(page_ranges, str):
+                page_ranges = PageRanges.parse(page_ranges, self.document_cache.get_page_count(uploaded_file))
+            params = {
+                "conversion_type": conversion_type,
+                "filename": uploaded_file.name
+            }
+            if conversion_type == "PDF to Images":
+                params["image_options"] = PageRasterizer(options=image_options).options
+            if conversion_type == "PDF to Text":
+                params["text_engine"] = text_engine
+            if page_ranges:
+                params["page_ranges"] = [[int(start), int(end)] for start, end in page_ranges]
+            return self.cached_result(
+                "convert", [uploaded_file], params,
+                lambda: converter(uploaded_file, progress_callback, page_ranges=page_ranges)
+            )
         else:
             raise ValueError(f"Unknown conversion type: {conversion_type}")
     
-    def _convert_to_word(self, uploaded_file):
-        """Convert PDF to Word document"""
-        temp_input = self.write_uploaded_file_to_temp(uploaded_file, '.pdf')
-        temp_output = self.create_temp_file('.docx')
+    def _select_pages(self, uploaded_file, page_ranges):
+        """Get (0-based page indexes, page count, output file stem) for a page selection
         
-        try:
-            cv = Converter(temp_input)
-            cv.convert(temp_output)
-            cv.close()
-            
-            with open(temp_output, 'rb') as f:
-                docx_data = f.read()
-            
+        The stem gains a label such as ``_pages_1-3,7`` unless every page is selected.
+        """
+        page_count = self.document_cache.get_page_count(uploaded_file)
+        ranges = page_ranges or [(1, page_count)]
+        label = PageRanges.describe_selection(ranges, page_count)
+        stem = InputFile.output_stem(uploaded_file.name)
+        return PageRanges.to_indexes(ranges, page_count), page_count, f"{stem}_{label}" if label else stem
+    
+    def _convert_to_word(self, uploaded_file, progress_callback=None, page_ranges=None):
+        """Convert PDF (or only the pages in ``page_ranges``) to a Word document"""
+        buffer = self.document_cache.get_buffer(uploaded_file)
+        page_indexes, page_count, stem = self._select_pages(uploaded_file, page_ranges)
+        
+        output_buffer = BytesIO()
+        WordConverter().convert(buffer, page_indexes, output_buffer, progress_callback)
+        
+        return {
+            "type": "single_file",
+            "message": f"PDF converted to Word successfully! ({len(page_indexes)} of {page_count} pages)",
+            "data": output_buffer.getvalue(),
+            "filename": f"{stem}.docx",
+            "mime_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            "button_label": "Download Word File"
+        }
+    
+    def _convert_to_images(self, uploaded_file, progress_callback=None, page_ranges=None, image_options=None):
+        """Convert PDF (or only the pages in ``page_ranges``) to PNG, JPEG or WebP images"""
+        buffer = self.document_cache.get_buffer(uploaded_file)
+        page_indexes, page_count, stem = self._select_pages(uploaded_file, page_ranges)
+        rasterizer = PageRasterizer(options=image_options)
+        image_format = rasterizer.image_format
+        format_name = rasterizer.settings["format"].upper()
+        
+        if len(page_indexes) == 1:
+            # Single image
             return {
                 "type": "single_file",
-                "message": "PDF converted to Word successfully!",
-                "data": docx_data,
-                "filename": f"{uploaded_file.name.replace('.pdf', '')}.docx",
-                "mime_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "button_label": "Download Word File"
+                "message": f"PDF converted to {format_name} successfully!",
+                "data": rasterizer.render_single(buffer, page_indexes[0]),
+                "filename": f"{stem}.{image_format['extension']}",
+                "mime_type": image_format["mime_type"],
+                "button_label": f"Download {format_name} Image"
+            }
+        else:
+            # Multiple images - stream pages into a ZIP as they are rendered
+            return {
+                "type": "multiple_files",
+                "message": f"PDF converted to {len(page_indexes)} {format_name} images successfully!",
+                "data": rasterizer.render_to_zip(buffer, page_indexes, progress_callback=progress_callback),
+                "filename": f"{stem}_images.zip",
+                "mime_type": "application/zip",
+                "button_label": "Download Images (ZIP)"
             }
-        finally:
-            self.cleanup_temp_file(temp_input)
-            self.cleanup_temp_file(temp_output)
     
-    def _convert_to_images(self, uploaded_file):
-        """Convert PDF to PNG images"""
-        temp_path = self.write_uploaded_file_to_temp(uploaded_file, '.pdf')
+    def _extract_images(self, uploaded_file, progress_callback=None, page_ranges=None):
+        """Copy the embedded images out of the PDF (or the pages in ``page_ranges``) without rendering"""
+        buffer = self.document_cache.get_buffer(uploaded_file)
+        page_indexes, page_count, stem = self._select_pages(uploaded_file, page_ranges)
+        data, image_count, skipped = ImageExtractor().extract_to_zip(buffer, page_indexes, progress_callback)
+        if image_count == 0:
+            if skipped:
+                raise ValueError(f"None of the {skipped} embedded images could be decoded")
+            raise ValueError("The PDF has no embedded images" if len(page_indexes) == page_count
+                             else "The selected pages have no embedded images")
         
-        try:
-            images = pdf2image.convert_from_path(temp_path)
-            
-            if len(images) == 1:
-                # Single image
-                img_buffer = BytesIO()
-                images[0].save(img_buffer, format='PNG')
-                
-                return {
-                    "type": "single_file",
-                    "message": "PDF converted to PNG successfully!",
-                    "data": img_buffer.getvalue(),
-                    "filename": f"{uploaded_file.name.replace('.pdf', '')}.png",
-                    "mime_type": "image/png",
-                    "button_label": "Download PNG Image"
-                }
-            else:
-                # Multiple images - create ZIP
-                zip_buffer = BytesIO()
-                with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-                    for i, image in enumerate(images):
-                        img_buffer = BytesIO()
-                        image.save(img_buffer, format='PNG')
-                        zip_file.writestr(f"page_{i+1}.png", img_buffer.getvalue())
-                
-                return {
-                    "type": "multiple_files",
-                    "message": f"PDF converted to {len(images)} PNG images successfully!",
-                    "data": zip_buffer.getvalue(),
-                    "filename": f"{uploaded_file.name.replace('.pdf', '')}_images.zip",
-                    "mime_type": "application/zip",
-                    "button_label": "Download Images (ZIP)"
-                }
-        finally:
-            self.cleanup_temp_file(temp_path)
+        message = f"Extracted {image_count} embedded images successfully! ({len(page_indexes)} of {page_count} pages)"
+        if skipped:
+            message += f" {skipped} could not be decoded and were skipped."
+        return {
+            "type": "multiple_files",
+            "message": message,
+            "data": data,
+            "filename": f"{stem}_embedded_images.zip",
+            "mime_type": "application/zip",
+            "button_label": "Download Images (ZIP)"
+        }
     
-    def _convert_to_text(self, uploaded_file):
-        """Convert PDF to text"""
-        temp_path = self.write_uploaded_file_to_temp(uploaded_file, '.pdf')
+    def _convert_to_text(self, uploaded_file, progress_callback=None, page_ranges=None, engine="pymupdf"):
+        """Convert PDF (or only the pages in ``page_ranges``) to text"""
+        buffer = self.document_cache.get_buffer(uploaded_file)
+        page_indexes, page_count, stem = self._select_pages(uploaded_file, page_ranges)
+        pages = TextExtractor().extract_pages(buffer, page_indexes, engine, progress_callback)
+        text = "".join(pages)
         
-        try:
-            text = extract_text(temp_path)
-            
-            return {
-                "type": "text_preview",
-                "message": "PDF converted to text successfully!",
-                "text": text,
-                "data": text.encode('utf-8'),
-                "filename": f"{uploaded_file.name.replace('.pdf', '')}.txt",
-                "mime_type": "text/plain",
-                "button_label": "Download Text File"
-            }
-        finally:
-            self.cleanup_temp_file(temp_path)
-            st.write(f"{i+1}. {file.name}")
-            st.write("**File Order:**")
\ No newline at end of file
+        return {
+            "type": "text_preview",
+            "message": f"PDF converted to text successfully! ({len(page_indexes)} of {page_count} pages)",
+            "text": text,
+            "data": text.encode('utf-8'),
+            "filename": f"{stem}.txt",
+            "mime_type": "text/plain",
+            "button_label": "Download Text File"
+        }
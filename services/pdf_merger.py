@@ -1,22 +1,48 @@
-import PyPDF2
-from io import BytesIO
+import tempfile
+from config.app_config import AppConfig
 from services.base_service import BaseService
+from services.merge_engine import MergeEngine
+from utils.metrics import Metrics, instrumented
 
 class PDFMergerService(BaseService):
     """Service for PDF merging operations"""
     
     def merge_pdfs(self, uploaded_files):
         """Merge multiple PDFs into one"""
-        pdf_merger = PyPDF2.PdfMerger()
+        return self.merge_pdfs_with_report(uploaded_files)["data"]
+    
+    @instrumented("merge")
+    def merge_pdfs_with_report(self, uploaded_files):
+        """Merge multiple PDFs into one and report the duplicate streams dropped"""
+        uploaded_files = [self.as_input(uploaded_file) for uploaded_file in uploaded_files]
+        params = {"count": len(uploaded_files), "settings": AppConfig.MERGE_SETTINGS}
+        return self.cached_result(
+            "merge", list(uploaded_files), params,
+            lambda: self._merge(uploaded_files)
+        )
+    
+    @instrumented("merge")
+    def merge_pdfs_to_file(self, uploaded_files, output):
+        """Merge PDFs straight into a binary file object, without holding the result in memory
+        
+        Returns the merge report (engine, page count, duplicates removed and
+        bytes saved).
+        """
+        uploaded_files = [self.as_input(uploaded_file) for uploaded_file in uploaded_files]
+        report = MergeEngine().merge(uploaded_files, output)
+        Metrics.annotate(output_bytes=output.tell(), pages=report["page_count"])
+        return report
+    
+    def _merge(self, uploaded_files):
+        """Append every input into a single PDF, returned as bytes
         
+        Use merge_pdfs_to_file when the result should not be held in memory.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=AppConfig.MERGE_SETTINGS["spool_max_bytes"])
         try:
-            for uploaded_file in uploaded_files:
-                pdf_merger.append(BytesIO(uploaded_file.getvalue()))
-            
-            output_buffer = BytesIO()
-            pdf_merger.write(output_buffer)
-            output_buffer.seek(0)
-            
-            return output_buffer.getvalue()
+            report = MergeEngine().merge(uploaded_files, spool)
+            Metrics.annotate(pages=report["page_count"])
+            spool.seek(0)
+            return {"data": spool.read(), "report": report}
         finally:
-            pdf_merger.close()
+            spool.close()
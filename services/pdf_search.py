@@ -0,0 +1,55 @@
+from services.base_service import BaseService
+from utils.search_index import SearchIndex
+from utils.metrics import instrumented
+from config.app_config import AppConfig
+
+class PDFSearchService(BaseService):
+    """Service for full-text search across indexed PDFs
+    
+    Without an explicit ``index`` each service instance opens its own
+    private index, so a session's registry never sees another session's
+    documents.
+    """
+    
+    def __init__(self, document_cache=None, index=None):
+        super().__init__(document_cache)
+        self.index = index or SearchIndex.from_settings()
+    
+    def is_indexed(self, uploaded_file):
+        """Check whether this upload's content is already in the index"""
+        uploaded_file = self.as_input(uploaded_file)
+        return self.index.has_document(self.document_cache.get_entry(uploaded_file).content_hash)
+    
+    @instrumented("search_index")
+    def index_document(self, uploaded_file, progress_callback=None):
+        """Extract an upload's text page by page and add it to the index
+        
+        Returns False if the same content was indexed before.
+        """
+        uploaded_file = self.as_input(uploaded_file)
+        entry = self.document_cache.get_entry(uploaded_file)
+        if self.index.has_document(entry.content_hash):
+            return False
+        
+        from services.text_extractor import TextExtractor  # Loads PyMuPDF and pdfminer; queries don't need them
+        pages = TextExtractor().extract_pages(
+            entry.buffer,
+            range(self.document_cache.get_page_count(uploaded_file)),
+            AppConfig.TEXT_SETTINGS["engine"],
+            progress_callback
+        )
+        return self.index.add_document(uploaded_file.name, entry.content_hash, pages)
+    
+    @instrumented("search_query")
+    def search(self, query, limit=None):
+        """Ranked page hits for a query (see SearchIndex.search)"""
+        return self.index.search(query, limit or AppConfig.SEARCH_SETTINGS["max_hits"])
+    
+    def list_documents(self):
+        return self.index.list_documents()
+    
+    def get_stats(self):
+        return self.index.get_stats()
+    
+    def clear_index(self):
+        self.index.clear()
@@ -1,25 +1,99 @@
-from PyPDF2 import PdfWriter, PdfReader
+from PyPDF2 import PdfWriter
 from io import BytesIO
 from services.base_service import BaseService
+from services.part_builder import PartBuilder
+from services.page_size_index import PageSizeIndex
+from utils.input_file import InputFile
+from utils.page_ranges import PageRanges
+from utils.metrics import Metrics, instrumented
 
 class PDFSplitterService(BaseService):
     """Service for PDF splitting operations"""
     
     def get_page_count(self, uploaded_file):
         """Get the total number of pages in PDF"""
-        pdf_reader = PdfReader(BytesIO(uploaded_file.getvalue()))
-        return len(pdf_reader.pages)
+        uploaded_file = self.as_input(uploaded_file)
+        return self.document_cache.get_page_count(uploaded_file)
     
+    @instrumented("split")
     def split_pdf(self, uploaded_file, start_page, end_page):
         """Split PDF and return the result"""
-        pdf_reader = PdfReader(BytesIO(uploaded_file.getvalue()))
+        uploaded_file = self.as_input(uploaded_file)
+        params = {"start_page": int(start_page), "end_page": int(end_page)}
+        return self.cached_result(
+            "split", [uploaded_file], params,
+            lambda: self._split_range(uploaded_file, start_page, end_page)
+        )
+    
+    @instrumented("split_parts")
+    def split_into_parts(self, uploaded_file, ranges, progress_callback=None):
+        """Split PDF into one file per (start, end) range and return them as a ZIP
+        
+        The source is parsed once and the parts are built in parallel; see
+        PartBuilder. Build ``ranges`` with PageRanges.
+        """
+        uploaded_file = self.as_input(uploaded_file)
+        ranges = [(int(start), int(end)) for start, end in ranges]
+        params = {"ranges": ranges, "filename": uploaded_file.name}
+        return self.cached_result(
+            "split_parts", [uploaded_file], params,
+            lambda: self._split_parts(uploaded_file, ranges, progress_callback)
+        )
+    
+    @instrumented("split_size")
+    def split_by_size(self, uploaded_file, max_part_bytes, progress_callback=None):
+        """Split PDF into consecutive parts that each stay under ``max_part_bytes``
+        
+        Part boundaries come from a per-page size estimate (see
+        PageSizeIndex), so every part is written exactly once. A single page
+        larger than the limit still becomes a part of its own.
+        """
+        uploaded_file = self.as_input(uploaded_file)
+        params = {"max_part_bytes": int(max_part_bytes), "filename": uploaded_file.name}
+        return self.cached_result(
+            "split_size", [uploaded_file], params,
+            lambda: self._split_by_size(uploaded_file, int(max_part_bytes), progress_callback)
+        )
+    
+    def _split_by_size(self, uploaded_file, max_part_bytes, progress_callback=None):
+        """Plan the parts from the cached parse, then build them"""
+        if max_part_bytes <= 0:
+            raise ValueError("Maximum part size must be positive")
+        doc = self.document_cache.get_fitz_document(uploaded_file)
+        ranges = PageSizeIndex(doc).plan_parts(max_part_bytes)
+        return self._split_parts(uploaded_file, ranges, progress_callback)
+    
+    def _split_parts(self, uploaded_file, ranges, progress_callback=None):
+        """Build every part from the cached parse and ZIP them"""
+        page_count = self.document_cache.get_page_count(uploaded_file)
+        seen = set()
+        for start, end in ranges:
+            if not 1 <= start <= end <= page_count:
+                raise ValueError(f"Page range {start}-{end} must lie within 1-{page_count}")
+            if (start, end) in seen:
+                # Parts are named after their ranges, so a repeat would duplicate a ZIP entry
+                raise ValueError(f"Page range {start}-{end} is listed more than once")
+            seen.add((start, end))
+        
+        stem = InputFile.output_stem(uploaded_file.name)
+        names = [f"{stem}_{PageRanges.describe(start, end)}.pdf" for start, end in ranges]
+        return PartBuilder().build_zip(
+            self.document_cache.get_fitz_document(uploaded_file),
+            self.document_cache.get_buffer(uploaded_file),
+            ranges, names, progress_callback
+        )
+    
+    def _split_range(self, uploaded_file, start_page, end_page):
+        """Copy a page range into a new PDF"""
+        pdf_reader = self.document_cache.get_pypdf_reader(uploaded_file)
         pdf_writer = PdfWriter()
         
         for page_num in range(start_page - 1, end_page):
             pdf_writer.add_page(pdf_reader.pages[page_num])
         
         output_buffer = BytesIO()
-        pdf_writer.write(output_buffer)
+        with Metrics.phase("serialize"):
+            pdf_writer.write(output_buffer)
         output_buffer.seek(0)
         
         return output_buffer.getvalue()
\ No newline at end of file
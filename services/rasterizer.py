@@ -0,0 +1,178 @@
+import io
+import fitz  # PyMuPDF
+import zipfile
+import tempfile
+from PIL import Image, ImageChops
+from config.app_config import AppConfig
+from utils.worker_pool import WorkerPool
+
+# Document handle opened once per worker process
+_worker_doc = None
+
+# PIL save arguments per format and effort
+_SAVE_ARGS = {
+    "png": {
+        "Fast": {"compress_level": 1},
+        "Balanced": {"compress_level": 4},
+        "Smallest": {"compress_level": 9}
+    },
+    "jpeg": {
+        "Fast": {},
+        "Balanced": {"optimize": True},
+        "Smallest": {"optimize": True, "progressive": True}
+    },
+    "webp": {
+        "Fast": {"method": 0},
+        "Balanced": {"method": 4},
+        "Smallest": {"method": 6}
+    }
+}
+
+def _init_worker(pdf_path):
+    """Open the source PDF once in each worker process"""
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+def _is_gray(image, band_rows=256):
+    """Check whether every pixel of an RGB image has equal channels
+    
+    Works a band of rows at a time, so the channel copies stay small and a
+    color page usually stops at its first band.
+    """
+    for top in range(0, image.height, band_rows):
+        band = image.crop((0, top, image.width, min(top + band_rows, image.height)))
+        red, green, blue = band.split()
+        if ImageChops.difference(red, green).getbbox() or ImageChops.difference(green, blue).getbbox():
+            return False
+    return True
+
+def _reduce_channels(image, allow_bilevel):
+    """Get the smallest mode that holds an RGB image exactly: "1", "L" or RGB"""
+    if not _is_gray(image):
+        return image
+    gray = image.getchannel("G")  # Every channel holds the same values
+    if allow_bilevel and not any(gray.histogram()[1:255]):
+        return gray.convert("1", dither=Image.Dither.NONE)
+    return gray
+
+def _render_page(doc, page_num, dpi, encoding):
+    """Render a single page and encode it straight from the pixmap's samples"""
+    pix = doc.load_page(page_num).get_pixmap(dpi=dpi)
+    image = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples_mv, "raw", "RGB", pix.stride, 1)
+    if encoding["reduce_channels"]:
+        image = _reduce_channels(image, encoding["allow_bilevel"])
+    output = io.BytesIO()
+    image.save(output, encoding["format"], **encoding["save_args"])
+    image = pix = None
+    return output.getvalue()
+
+def _render_batch(page_numbers, dpi, encoding):
+    """Render a batch of pages inside a worker process"""
+    return [(page_num, _render_page(_worker_doc, page_num, dpi, encoding)) for page_num in page_numbers]
+
+class PageRasterizer:
+    """Renders PDF pages to PNG, JPEG or WebP and streams them into a ZIP archive
+    
+    PyMuPDF renders each page to raw samples, which PIL wraps without copying
+    and encodes (its zlib, libjpeg-turbo and libwebp encoders are several
+    times faster than PyMuPDF's own). Pages whose pixels are all gray are
+    encoded with one channel, and pure black-and-white pages as 1-bit PNGs.
+    """
+    
+    OPTION_KEYS = ("dpi", "format", "quality", "effort", "reduce_channels")
+    
+    def __init__(self, settings=None, options=None):
+        """``options`` overrides any of OPTION_KEYS from the settings"""
+        self.settings = {**(settings or AppConfig.RASTER_SETTINGS), **(options or {})}
+        if self.settings["format"] not in AppConfig.IMAGE_FORMATS:
+            raise ValueError(f"Image format must be one of: {', '.join(AppConfig.IMAGE_FORMATS)}")
+        if self.settings["effort"] not in AppConfig.IMAGE_EFFORTS:
+            raise ValueError(f"Effort must be one of: {', '.join(AppConfig.IMAGE_EFFORTS)}")
+        if not 1 <= self.settings["dpi"] <= self.settings["max_dpi"]:
+            raise ValueError(f"DPI must lie within 1-{self.settings['max_dpi']}")
+        if not 1 <= self.settings["quality"] <= 100:
+            raise ValueError("Quality must lie within 1-100")
+    
+    @property
+    def options(self):
+        """The effective export options, e.g. for a cache key"""
+        return {key: self.settings[key] for key in self.OPTION_KEYS}
+    
+    @property
+    def image_format(self):
+        """The IMAGE_FORMATS entry being written"""
+        return AppConfig.IMAGE_FORMATS[self.settings["format"]]
+    
+    def _encoding(self):
+        """Picklable encoder arguments for _render_page"""
+        image_format = self.settings["format"]
+        save_args = dict(_SAVE_ARGS[image_format][self.settings["effort"]])
+        if self.image_format["lossy"]:
+            save_args["quality"] = self.settings["quality"]
+        return {
+            "format": image_format.upper(),
+            "save_args": save_args,
+            "reduce_channels": self.settings["reduce_channels"],
+            "allow_bilevel": not self.image_format["lossy"]
+        }
+    
+    def render_single(self, buffer, page_num=0):
+        """Render one page to image bytes in the current process"""
+        doc = fitz.open(stream=buffer.view, filetype="pdf")
+        try:
+            return _render_page(doc, page_num, self.settings["dpi"], self._encoding())
+        finally:
+            doc.close()
+    
+    def iter_pages(self, buffer, page_indexes):
+        """Yield (page_num, image_bytes) as the selected 0-based pages finish rendering
+        
+        Short selections are rendered inline; longer ones are spread over a
+        process pool in bounded batches so only a few encoded pages are held
+        in memory at once. Inline rendering reads the buffer in place; workers
+        open the buffer's file path, so the PDF is never pickled to them.
+        """
+        dpi = self.settings["dpi"]
+        encoding = self._encoding()
+        page_indexes = list(page_indexes)
+        
+        if len(page_indexes) < self.settings["parallel_min_pages"]:
+            doc = fitz.open(stream=buffer.view, filetype="pdf")
+            try:
+                for page_num in page_indexes:
+                    yield page_num, _render_page(doc, page_num, dpi, encoding)
+            finally:
+                doc.close()
+            return
+        
+        workers = WorkerPool.resolve_workers(self.settings["max_workers"])
+        batches = WorkerPool.chunk(page_indexes, self.settings["pages_per_task"])
+        tasks = ((batch, dpi, encoding) for batch in batches)
+        
+        with WorkerPool.create(workers, _init_worker, (buffer.path(),)) as executor:
+            for rendered in WorkerPool.imap_unordered(executor, _render_batch, tasks, workers * 2):
+                for page_num, image_bytes in rendered:
+                    yield page_num, image_bytes
+    
+    def render_to_zip(self, buffer, page_indexes, name_template=None, progress_callback=None):
+        """Render the selected pages and write each image into a ZIP as soon as it is ready
+        
+        Entries are stored, not deflated: the images are already compressed,
+        so deflating them again costs CPU and saves next to nothing. The ZIP
+        is assembled in a temp file that spills to disk past
+        ``spool_max_bytes`` and returned as bytes, so the finished archive is
+        held in memory once.
+        """
+        name_template = name_template or f"page_{{}}.{self.image_format['extension']}"
+        total = len(page_indexes)
+        spool = tempfile.SpooledTemporaryFile(max_size=self.settings["spool_max_bytes"])
+        try:
+            with zipfile.ZipFile(spool, 'w', zipfile.ZIP_STORED) as zip_file:
+                for done, (page_num, image_bytes) in enumerate(self.iter_pages(buffer, page_indexes), 1):
+                    zip_file.writestr(name_template.format(page_num + 1), image_bytes)
+                    if progress_callback is not None:
+                        progress_callback(done, total, f"Rendered page {done} of {total}")
+            spool.seek(0)
+            return spool.read()
+        finally:
+            spool.close()
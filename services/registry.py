@@ -0,0 +1,34 @@
+import importlib
+
+class ServiceRegistry:
+    """Creates services on first use, so their PDF backends load only when needed
+    
+    Importing a service module pulls in its libraries (pdf2docx alone takes
+    a few hundred milliseconds), so nothing is imported until an operation
+    asks for its service. Instances share one document cache and are reused.
+    """
+    
+    SERVICES = {
+        "converter": ("services.pdf_converter", "PDFConverterService"),
+        "splitter": ("services.pdf_splitter", "PDFSplitterService"),
+        "merger": ("services.pdf_merger", "PDFMergerService"),
+        "compressor": ("services.pdf_compressor", "PDFCompressorService"),
+        "search": ("services.pdf_search", "PDFSearchService")
+    }
+    
+    def __init__(self, document_cache=None):
+        self.document_cache = document_cache
+        self._instances = {}
+    
+    @classmethod
+    def load(cls, name):
+        """Import a service module and return its class"""
+        module_name, class_name = cls.SERVICES[name]
+        return getattr(importlib.import_module(module_name), class_name)
+    
+    def get(self, name):
+        """Get the shared instance of a service, creating it on first use"""
+        service = self._instances.get(name)
+        if service is None:
+            service = self._instances[name] = self.load(name)(self.document_cache)
+        return service
@@ -0,0 +1,149 @@
+import re
+import hashlib
+
+_REFERENCE = re.compile(r"\b(\d+) 0 R\b")
+_STRING_OR_COMMENT = re.compile(r"[(%]")
+_LITERAL_TOKEN = re.compile(r"\\.|[()]", re.DOTALL)
+_LINE_END = re.compile(r"[\r\n]")
+
+def _literal_end(text, start):
+    """Index just past the literal string opening at ``start`` (balanced parentheses, escapes)"""
+    depth = 0
+    for match in _LITERAL_TOKEN.finditer(text, start):
+        token = match.group()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return len(text)
+
+def _code_spans(text):
+    """Yield (start, end) spans of PDF object text outside literal strings and comments
+    
+    Hex strings cannot hold an ``R`` and names cannot hold a space, so
+    neither can fake a reference and both stay inside the spans.
+    """
+    position = 0
+    while (match := _STRING_OR_COMMENT.search(text, position)) is not None:
+        start = match.start()
+        yield position, start
+        if match.group() == "(":
+            position = _literal_end(text, start)
+        else:
+            line_end = _LINE_END.search(text, start)
+            position = line_end.start() if line_end else len(text)
+    yield position, len(text)
+
+def find_references(text):
+    """Get the object numbers of the ``N 0 R`` references in PDF object text, skipping strings and comments"""
+    return [
+        int(match.group(1))
+        for start, end in _code_spans(text)
+        for match in _REFERENCE.finditer(text[start:end])
+    ]
+
+class StreamDeduplicator:
+    """Stores identical stream objects once across the documents of a merge
+    
+    Documents built from the same template each carry their own copy of the
+    same fonts, images and ICC profiles. After each document is inserted,
+    its streams are keyed by a hash of their dictionary and raw (still
+    encoded) data. Any stream that matches one already seen has every
+    reference to it pointed at the earlier copy; the orphaned duplicates are
+    dropped when the merged file is saved with garbage collection.
+    """
+    
+    SKIPPED_TYPES = ("/ObjStm", "/XRef")
+    
+    def __init__(self):
+        self._canonical = {}
+        self.duplicates_removed = 0
+        self.bytes_saved = 0
+    
+    def deduplicate(self, doc, first_xref):
+        """Deduplicate the streams at ``first_xref`` and above against everything seen so far"""
+        new_xrefs = range(first_xref, doc.xref_length())
+        streams = {}
+        for xref in new_xrefs:
+            if doc.xref_is_stream(xref) and doc.xref_get_key(xref, "Type")[1] not in self.SKIPPED_TYPES:
+                data = doc.xref_stream_raw(xref)
+                streams[xref] = (hashlib.blake2b(data, digest_size=20).digest(), len(data))
+        
+        # Repeat until stable: replacing a stream (an SMask, say) can make the
+        # dictionaries of the streams that reference it identical as well
+        replaced = {}
+        while True:
+            seen = {}
+            found = False
+            for xref, (data_hash, _) in streams.items():
+                if xref in replaced:
+                    continue
+                key = (self._substitute(doc.xref_object(xref, compressed=True), replaced), data_hash)
+                canonical = self._canonical.get(key) or seen.get(key)
+                if canonical is None:
+                    seen[key] = xref
+                    continue
+                replaced[xref] = canonical
+                found = True
+            if not found:
+                break
+        self._canonical.update(seen)
+        
+        if not replaced:
+            return
+        replaced = {xref: self._resolve(replaced, xref) for xref in replaced}
+        for xref in replaced:
+            self.duplicates_removed += 1
+            self.bytes_saved += streams[xref][1]
+        for xref in new_xrefs:
+            if xref not in replaced:
+                self._rewrite_references(doc, xref, replaced)
+    
+    def get_report(self):
+        return {"duplicates_removed": self.duplicates_removed, "bytes_saved": self.bytes_saved}
+    
+    @staticmethod
+    def _resolve(replaced, xref):
+        """Follow replacements to the copy that is kept"""
+        while xref in replaced:
+            xref = replaced[xref]
+        return xref
+    
+    @staticmethod
+    def _substitute(text, replaced):
+        """Rewrite ``N 0 R`` references to duplicates in PDF object text
+        
+        Literal strings and comments are copied unchanged, so text such as
+        ``(see 12 0 R)`` is never mistaken for a reference.
+        """
+        def rewrite(match):
+            xref = int(match.group(1))
+            return f"{replaced.get(xref, xref)} 0 R"
+        
+        parts = []
+        position = 0
+        for start, end in _code_spans(text):
+            parts.append(text[position:start])
+            parts.append(_REFERENCE.sub(rewrite, text[start:end]))
+            position = end
+        return "".join(parts)
+    
+    def _rewrite_references(self, doc, xref, replaced):
+        """Point an object's references at the kept copies"""
+        if not doc.xref_is_stream(xref):
+            text = doc.xref_object(xref, compressed=True)
+            updated = self._substitute(text, replaced)
+            if updated != text:
+                doc.update_object(xref, updated)
+            return
+        
+        # Rewrite stream dictionaries key by key so the stream data is untouched
+        for key in doc.xref_get_keys(xref):
+            kind, value = doc.xref_get_key(xref, key)
+            if kind not in ("xref", "array", "dict"):
+                continue
+            updated = self._substitute(value, replaced)
+            if updated != value:
+                doc.xref_set_key(xref, key, updated)
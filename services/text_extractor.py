@@ -0,0 +1,119 @@
+import fitz  # PyMuPDF
+from io import StringIO
+from pdfminer.layout import LAParams
+from pdfminer.pdfpage import PDFPage
+from pdfminer.converter import TextConverter
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from config.app_config import AppConfig
+from utils.worker_pool import WorkerPool
+
+# Source opened once per worker process, for the engine the pool was started with
+_worker = {}
+
+def _init_worker(pdf_path, engine):
+    """Open the source PDF once in each worker process"""
+    _worker["engine"] = engine
+    if engine == "pymupdf":
+        _worker["doc"] = fitz.open(pdf_path)
+    else:
+        _worker["file"] = open(pdf_path, 'rb')
+        _worker["pages"] = list(PDFPage.get_pages(_worker["file"], caching=True))
+        _worker["resource_manager"] = PDFResourceManager(caching=True)
+
+def _extract_pymupdf(doc, page_num):
+    """Extract one page with PyMuPDF, ending it with a form feed like pdfminer"""
+    return doc.load_page(page_num).get_text() + "\f"
+
+def _extract_pdfminer(resource_manager, page):
+    """Extract one page with pdfminer's layout analysis"""
+    with StringIO() as output:
+        device = TextConverter(resource_manager, output, laparams=LAParams())
+        PDFPageInterpreter(resource_manager, device).process_page(page)
+        device.close()
+        return output.getvalue()
+
+def _extract_batch(page_numbers):
+    """Extract a batch of pages inside a worker process"""
+    if _worker["engine"] == "pymupdf":
+        return [(page_num, _extract_pymupdf(_worker["doc"], page_num)) for page_num in page_numbers]
+    resource_manager = _worker["resource_manager"]
+    return [(page_num, _extract_pdfminer(resource_manager, _worker["pages"][page_num])) for page_num in page_numbers]
+
+class TextExtractor:
+    """Extracts text page by page with PyMuPDF or pdfminer
+    
+    PyMuPDF is the fast default. pdfminer's layout analysis is much slower
+    but can order text better on hard layouts (multi-column pages, tables).
+    """
+    
+    ENGINES = {
+        "pymupdf": "Fast (PyMuPDF)",
+        "pdfminer": "Layout analysis (pdfminer)"
+    }
+    
+    def __init__(self, settings=None):
+        self.settings = settings or AppConfig.TEXT_SETTINGS
+    
+    def iter_pages(self, buffer, page_indexes, engine):
+        """Yield (page_num, text) in page order as the selected 0-based pages are extracted
+        
+        Short selections are extracted inline. Longer ones are spread over a
+        process pool in batches whose workers each open the buffer's file
+        path once; pages that finish early are held back until every page
+        before them is ready. Pages outside the selection are never parsed.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown text engine: {engine}")
+        page_indexes = sorted(page_indexes)
+        
+        if len(page_indexes) < self.settings["parallel_min_pages"][engine]:
+            yield from self._iter_inline(buffer, page_indexes, engine)
+            return
+        
+        workers = WorkerPool.resolve_workers(self.settings["max_workers"])
+        batches = WorkerPool.chunk(page_indexes, self.settings["pages_per_task"])
+        ready = {}
+        position = 0
+        
+        with WorkerPool.create(workers, _init_worker, (buffer.path(), engine)) as executor:
+            for extracted in WorkerPool.imap_unordered(executor, _extract_batch, ((batch,) for batch in batches), workers * 2):
+                ready.update(extracted)
+                while position < len(page_indexes) and page_indexes[position] in ready:
+                    yield page_indexes[position], ready.pop(page_indexes[position])
+                    position += 1
+    
+    def extract(self, buffer, page_indexes, engine, progress_callback=None):
+        """Extract the selected pages as one string"""
+        return "".join(self.extract_pages(buffer, page_indexes, engine, progress_callback))
+    
+    def extract_pages(self, buffer, page_indexes, engine, progress_callback=None):
+        """Extract the selected 0-based pages, publishing the pages done so far
+        
+        ``progress_callback(done, total, message, partial=pages)`` receives
+        the list of page texts extracted so far, so a preview can show the
+        first pages while the rest are still being extracted.
+        """
+        total = len(page_indexes)
+        pages = []
+        for _, text in self.iter_pages(buffer, page_indexes, engine):
+            pages.append(text)
+            if progress_callback is not None:
+                progress_callback(len(pages), total, f"Extracted page {len(pages)} of {total}", partial=pages)
+        return pages
+    
+    def _iter_inline(self, buffer, page_indexes, engine):
+        """Extract the selected pages (sorted) in the current process"""
+        if engine == "pymupdf":
+            doc = fitz.open(stream=buffer.view, filetype="pdf")
+            try:
+                for page_num in page_indexes:
+                    yield page_num, _extract_pymupdf(doc, page_num)
+            finally:
+                doc.close()
+            return
+        
+        resource_manager = PDFResourceManager(caching=True)
+        with buffer.open_stream() as stream:
+            pages = PDFPage.get_pages(stream, pagenos=set(page_indexes), caching=True)
+            for page_num, page in zip(page_indexes, pages):
+                yield page_num, _extract_pdfminer(resource_manager, page)
@@ -0,0 +1,93 @@
+import fitz  # PyMuPDF
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config.app_config import AppConfig
+from utils.pdf_buffer import PDFBuffer
+from utils.result_cache import ResultCache
+
+def _render_thumbnail(doc, page_num, dpi, max_side, quality):
+    """Render one page at low resolution to JPEG bytes, no longer than ``max_side`` pixels"""
+    page = doc.load_page(page_num)
+    zoom = min(dpi / 72, max_side / max(page.rect.width, page.rect.height, 1))
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    return pix.tobytes("jpeg", jpg_quality=quality)
+
+class ThumbnailRenderer:
+    """Renders low-DPI page thumbnails in the background into a shared tile cache
+    
+    Callers ask only for the pages they are showing. Tiles already in the
+    cache come back at once; missing ones are queued on a small thread pool
+    (one task per request, opening the PDF once) and appear in the cache as
+    they finish, so the page can poll instead of blocking. Tiles are keyed by
+    content hash, page and DPI in a size-bounded LRU shared by every session.
+    """
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, settings=None):
+        self.settings = settings or AppConfig.THUMBNAIL_SETTINGS
+        self.cache = ResultCache(self.settings["cache_max_bytes"], 0)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings["max_workers"], thread_name_prefix="pdf-thumb"
+        )
+        self._pending = set()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def get_shared(cls):
+        """Get the process-wide renderer configured from AppConfig"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
+    def get_tiles(self, uploaded_file, content_hash, page_numbers, dpi=None):
+        """Get {page_num: JPEG bytes, or None while rendering} for 0-based pages
+        
+        Missing pages are queued for rendering. A page that failed to render
+        comes back as empty bytes.
+        """
+        dpi = dpi or self.settings["dpi"]
+        tiles = {}
+        missing = []
+        for page_num in page_numbers:
+            found, data = self.cache.get(self._tile_key(content_hash, page_num, dpi))
+            tiles[page_num] = data if found else None
+            if not found:
+                missing.append(page_num)
+        
+        with self._lock:
+            missing = [page_num for page_num in missing if (content_hash, page_num, dpi) not in self._pending]
+            self._pending.update((content_hash, page_num, dpi) for page_num in missing)
+        if missing:
+            self._executor.submit(self._render, uploaded_file, content_hash, missing, dpi)
+        return tiles
+    
+    @staticmethod
+    def _tile_key(content_hash, page_num, dpi):
+        return f"{content_hash}:{page_num}:{dpi}"
+    
+    def _render(self, uploaded_file, content_hash, page_numbers, dpi):
+        """Render a batch of tiles into the cache (runs on the pool)"""
+        buffer = PDFBuffer(uploaded_file)
+        try:
+            doc = fitz.open(stream=buffer.view, filetype="pdf")
+            try:
+                for page_num in page_numbers:
+                    try:
+                        tile = _render_thumbnail(
+                            doc, page_num, dpi, self.settings["max_side_px"], self.settings["jpeg_quality"]
+                        )
+                    except Exception:
+                        tile = b""  # Cached as unavailable so the page stops waiting for it
+                    self.cache.put(self._tile_key(content_hash, page_num, dpi), tile)
+            finally:
+                doc.close()
+        except Exception:
+            for page_num in page_numbers:
+                self.cache.put(self._tile_key(content_hash, page_num, dpi), b"")
+        finally:
+            buffer.close()
+            with self._lock:
+                self._pending.difference_update((content_hash, page_num, dpi) for page_num in page_numbers)
@@ -0,0 +1,81 @@
+import logging
+from pdf2docx import Converter
+from config.app_config import AppConfig
+from utils.worker_pool import WorkerPool
+from utils.metrics import Metrics
+
+# Converter opened once per worker process
+_worker_converter = None
+
+def _init_worker(pdf_path):
+    """Open the source PDF once in each worker process"""
+    global _worker_converter
+    _worker_converter = Converter(pdf_path)
+
+def _parse_pages(cv, page_indexes, settings, progress_callback=None):
+    """Parse only ``page_indexes`` (0-based), returning the parsed pages
+    
+    Same steps as Converter.parse, with a progress report per parsed page.
+    """
+    cv.load_pages(pages=page_indexes).parse_document(**settings)
+    pages = [page for page in cv.pages if not page.skip_parsing]
+    for done, page in enumerate(pages, 1):
+        try:
+            page.parse(**settings)
+        except Exception as e:
+            if not settings["ignore_page_error"]:
+                raise
+            logging.error("Ignore page %d due to parsing page error: %s", page.id + 1, e)
+        if progress_callback is not None:
+            progress_callback(done, len(pages), f"Parsed page {done} of {len(pages)}")
+    return pages
+
+def _parse_batch(page_indexes, settings):
+    """Parse a batch of pages inside a worker process, returned in pdf2docx's stored form"""
+    pages = _parse_pages(_worker_converter, page_indexes, settings)
+    return len(page_indexes), [page.store() for page in pages if page.finalized]
+
+class WordConverter:
+    """Converts selected PDF pages to a Word document with pdf2docx
+    
+    Only the requested pages are parsed, so converting 5 pages of a long
+    document costs 5 pages. Larger selections are parsed in batches on a
+    process pool whose workers each open the source once; the parsed pages
+    come back in pdf2docx's stored form and are assembled into one .docx in
+    page order. Document-level analysis (repeated headers and footers) then
+    sees one batch at a time, as with pdf2docx's own multi-processing mode.
+    """
+    
+    def __init__(self, settings=None):
+        self.settings = settings or AppConfig.WORD_SETTINGS
+    
+    def convert(self, buffer, page_indexes, output, progress_callback=None):
+        """Convert ``page_indexes`` (0-based) of the PDF in ``buffer`` into ``output``"""
+        cv = Converter(stream=buffer.view)
+        try:
+            settings = cv.default_settings
+            workers = WorkerPool.resolve_workers(self.settings["max_workers"])
+            if workers == 1 or len(page_indexes) < self.settings["parallel_min_pages"]:
+                _parse_pages(cv, page_indexes, settings, progress_callback)
+            else:
+                self._parse_parallel(cv, buffer, page_indexes, settings, workers, progress_callback)
+            with Metrics.phase("serialize"):
+                cv.make_docx(output, **settings)
+        finally:
+            cv.close()
+    
+    def _parse_parallel(self, cv, buffer, page_indexes, settings, workers, progress_callback):
+        """Parse page batches on a process pool and restore them into ``cv``"""
+        batches = WorkerPool.chunk(page_indexes, self.settings["pages_per_task"])
+        tasks = ((batch, settings) for batch in batches)
+        parsed = []
+        done = 0
+        
+        with WorkerPool.create(workers, _init_worker, (buffer.path(),)) as executor:
+            for batch_size, stored_pages in WorkerPool.imap_unordered(executor, _parse_batch, tasks, workers * 2):
+                parsed.extend(stored_pages)
+                done += batch_size
+                if progress_callback is not None:
+                    progress_callback(done, len(page_indexes), f"Parsed page {done} of {len(page_indexes)}")
+        
+        cv.restore({"page_cnt": len(cv.fitz_doc), "pages": parsed})
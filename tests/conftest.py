@@ -0,0 +1,43 @@
+import os
+import sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.result_cache import ResultCache
+
+def build_pdf(objects):
+    """Write a PDF from raw object bodies; object 1 must be the catalog"""
+    out = bytearray(b"%PDF-1.7\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+def noise(size, seed=0):
+    """Incompressible bytes, so image streams stay above the compressor's size floor"""
+    rnd = random.Random(seed)
+    return bytes(rnd.randrange(256) for _ in range(size))
+
+def text_pdf(page_texts):
+    """Build a PDF with one page per string, using PyMuPDF"""
+    import fitz
+    doc = fitz.open()
+    for text in page_texts:
+        doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+@pytest.fixture(autouse=True)
+def memory_result_cache(monkeypatch):
+    """Give every test its own memory-only result cache"""
+    monkeypatch.setattr(ResultCache, "_shared", ResultCache(64 * 1024 * 1024, 0))
@@ -0,0 +1,37 @@
+import os
+import sys
+import copy
+import fitz
+import pytest
+from conftest import noise, text_pdf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import run_suite
+
+@pytest.fixture
+def tiny_corpus(tmp_path, monkeypatch):
+    from config.app_config import AppConfig
+    monkeypatch.setattr(AppConfig, "CACHE_SETTINGS", copy.deepcopy(AppConfig.CACHE_SETTINGS))
+    paths = {}
+    for name in ("first", "second"):
+        doc = fitz.open("pdf", text_pdf([f"{name} termination notice, page {number}" for number in range(1, 6)]))
+        image = fitz.Pixmap(fitz.csRGB, 64, 64, noise(64 * 64 * 3), 0)
+        doc[0].insert_image(fitz.Rect(72, 100, 136, 164), pixmap=image)
+        path = tmp_path / f"{name}.pdf"
+        doc.save(path)
+        paths[name] = str(path)
+    return paths
+
+@pytest.mark.parametrize("operation", list(run_suite.OPERATIONS))
+def test_every_benchmark_runs_on_a_tiny_document(tiny_corpus, operation):
+    metrics = run_suite._measure(operation, "first", tiny_corpus)
+    assert set(metrics) == set(run_suite.METRICS)
+    assert metrics["output_bytes"] > 0
+
+def test_only_regressions_beyond_the_threshold_and_noise_are_reported():
+    baseline = {"results": {"a/x": {"wall_s": 10.0, "cpu_s": 1.0, "peak_rss_mb": 100.0, "output_bytes": 1000}}}
+    results = {"results": {
+        "a/x": {"wall_s": 13.0, "cpu_s": 1.05, "peak_rss_mb": 120.0, "output_bytes": 1000},
+        "b/y": {"wall_s": 99.0, "cpu_s": 99.0, "peak_rss_mb": 999.0, "output_bytes": 9999}
+    }}
+    assert run_suite.compare(results, baseline, 0.25) == [("a/x", "wall_s", 10.0, 13.0)]
@@ -0,0 +1,77 @@
+import os
+import copy
+import pytest
+import cli
+from conftest import text_pdf
+from utils.worker_pool import WorkerPool
+
+@pytest.fixture
+def six_pages(tmp_path):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(text_pdf([f"page {number}" for number in range(1, 7)]))
+    return str(path)
+
+@pytest.mark.parametrize("pages, expected", [("3-", (3, 6)), ("-2", (1, 2)), ("4", (4, 4)), ("2-5", (2, 5))])
+def test_split_pages_resolve_against_the_document(six_pages, pages, expected):
+    assert cli._split_range({"input": six_pages, "pages": pages}) == expected
+
+def test_split_output_name_uses_the_resolved_range(six_pages, tmp_path):
+    args = cli.build_parser().parse_args(["split", six_pages, "-o", str(tmp_path / "out"), "--pages", "3-"])
+    job, = cli.build_jobs(args)
+    assert cli._expected_outputs(job) == [str(tmp_path / "out" / "a_pages_3-6.pdf")]
+
+@pytest.mark.parametrize("pages", ["a-b", "0", "1-2,4"])
+def test_bad_split_pages_are_usage_errors(six_pages, tmp_path, pages, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["split", six_pages, "-o", str(tmp_path), "--pages", pages])
+    assert exit_info.value.code == 2
+    assert "--pages" in capsys.readouterr().err
+
+@pytest.fixture
+def batch_worker(monkeypatch):
+    """Apply _init_batch_worker to copies of the settings, and fail if any service starts a pool"""
+    for name in ("RASTER_SETTINGS", "COMPRESSOR_SETTINGS", "WORD_SETTINGS", "TEXT_SETTINGS", "SPLIT_SETTINGS", "CACHE_SETTINGS"):
+        monkeypatch.setattr(cli.AppConfig, name, copy.deepcopy(getattr(cli.AppConfig, name)))
+    cli._init_batch_worker()
+    
+    def no_pool(*args, **kwargs):
+        raise AssertionError("batch workers must not start nested pools")
+    monkeypatch.setattr(WorkerPool, "create", no_pool)
+
+@pytest.mark.parametrize("options", [
+    ["convert", "--to", "text", "--engine", "pdfminer"],
+    ["convert", "--to", "text", "--engine", "pymupdf"],
+    ["convert", "--to", "images", "--dpi", "20"],
+    ["convert", "--to", "word"],
+    ["compress"],
+    ["split", "--pages", "2-"]
+])
+def test_batch_jobs_run_without_nested_pools(batch_worker, tmp_path, options):
+    path = tmp_path / "long.pdf"
+    path.write_bytes(text_pdf([f"page {number}" for number in range(1, 41)]))
+    args = cli.build_parser().parse_args([options[0], str(path), "-o", str(tmp_path / "out"), *options[1:]])
+    job, = cli.build_jobs(args)
+    assert os.path.getsize(cli._run_job(job)) > 0
+
+def test_upper_case_extensions_name_outputs_like_the_up_to_date_check(tmp_path):
+    path = tmp_path / "Scan.PDF"
+    path.write_bytes(text_pdf(["one"]))
+    args = cli.build_parser().parse_args(["convert", str(path), "-o", str(tmp_path / "out"), "--to", "text"])
+    job, = cli.build_jobs(args)
+    assert [cli._run_job(job)] == cli._expected_outputs(job) == [str(tmp_path / "out" / "Scan.txt")]
+
+def test_compress_outputs_are_only_up_to_date_for_the_same_settings(six_pages, tmp_path):
+    def job_for(*options):
+        args = cli.build_parser().parse_args(["compress", six_pages, "-o", str(tmp_path / "out"), *options])
+        return cli.build_jobs(args)[0]
+    
+    output = cli._run_job(job_for("--level", "High"))
+    manifests = {}
+    assert not cli._is_up_to_date(job_for("--level", "High"), manifests)  # Made before settings were recorded
+    
+    cli._load_manifest(manifests, os.path.dirname(output))[os.path.basename(output)] = cli._job_settings(job_for("--level", "High"))
+    cli._save_manifests(manifests, {os.path.dirname(output)})
+    manifests = {}
+    assert cli._is_up_to_date(job_for("--level", "High"), manifests)
+    assert not cli._is_up_to_date(job_for("--level", "Low"), manifests)
+    assert not cli._is_up_to_date(job_for("--level", "High", "--target-size", "1"), manifests)
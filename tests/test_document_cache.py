@@ -0,0 +1,42 @@
+import pytest
+from conftest import text_pdf
+from utils.document_cache import DocumentCache
+from utils.input_file import InputFile
+from utils.result_cache import ResultCache
+
+@pytest.fixture
+def hash_calls(monkeypatch):
+    calls = []
+    hash_bytes = ResultCache.hash_bytes
+    
+    def counting(data):
+        calls.append(1)
+        return hash_bytes(data)
+    monkeypatch.setattr(ResultCache, "hash_bytes", staticmethod(counting))
+    return calls
+
+def test_bytes_input_is_hashed_once(hash_calls):
+    cache = DocumentCache()
+    upload = InputFile.from_bytes(text_pdf(["one"]))
+    first = cache.get_entry(upload)
+    assert cache.get_entry(upload) is first
+    assert cache.get_page_count(upload) == 1
+    assert len(hash_calls) == 1
+
+def test_new_bytes_under_the_same_name_replace_the_entry():
+    cache = DocumentCache()
+    first = cache.get_entry(InputFile.from_bytes(text_pdf(["one"])))
+    second = cache.get_entry(InputFile.from_bytes(text_pdf(["one", "two"])))
+    assert second is not first
+    assert second.content_hash != first.content_hash
+
+def test_path_input_is_keyed_on_path_mtime_and_size(tmp_path, hash_calls):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(text_pdf(["one"]))
+    cache = DocumentCache()
+    first = cache.get_entry(str(path))
+    assert cache.get_entry(str(path)) is first
+    assert len(hash_calls) == 1
+    
+    path.write_bytes(text_pdf(["one", "two"]))
+    assert cache.get_page_count(str(path)) == 2
@@ -0,0 +1,57 @@
+import io
+import zipfile
+import fitz
+from PIL import Image
+from conftest import build_pdf, noise
+from services.image_extractor import ImageExtractor
+from utils.pdf_buffer import PDFBuffer
+
+def page_with_images(images):
+    """Build a one-page PDF drawing raw image objects; ``images`` are dictionary/data pairs"""
+    names = b"".join(b"/Im%d %d 0 R " % (index, 5 + index) for index in range(len(images)))
+    content = b"".join(b"q 50 0 0 50 %d 0 cm /Im%d Do Q " % (index * 60, index) for index in range(len(images)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 400 100] /Resources << /XObject << %s>> >> /Contents 4 0 R >>" % names,
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+    ]
+    for dictionary, data in images:
+        objects.append(b"<< /Type /XObject /Subtype /Image %s /Length %d >>\nstream\n" % (dictionary, len(data)) + data + b"\nendstream")
+    return build_pdf(objects)
+
+def extract(pdf_bytes):
+    data, count, skipped = ImageExtractor().extract_to_zip(PDFBuffer(pdf_bytes), [0])
+    return zipfile.ZipFile(io.BytesIO(data)), count, skipped
+
+def test_soft_mask_of_another_size_becomes_alpha():
+    smask_xref = 7
+    pdf = page_with_images([
+        (b"/Width 40 /Height 40 /ColorSpace /DeviceRGB /BitsPerComponent 8 /SMask %d 0 R" % smask_xref, noise(40 * 40 * 3)),
+        (b"/Width 20 /Height 20 /ColorSpace /DeviceGray /BitsPerComponent 8", noise(20 * 20, seed=1)),
+        (b"/Width 16 /Height 16 /ColorSpace /DeviceGray /BitsPerComponent 8", noise(16 * 16, seed=2))
+    ])
+    archive, count, skipped = extract(pdf)
+    assert skipped == 0
+    image = Image.open(io.BytesIO(archive.read("page_1_image_1.png")))
+    assert image.mode == "RGBA"
+    assert image.size == (40, 40)
+
+def test_jpeg_with_soft_mask_is_exported_with_alpha():
+    jpeg = fitz.Pixmap(fitz.csRGB, 32, 32, noise(32 * 32 * 3), 0).tobytes("jpeg")
+    pdf = page_with_images([
+        (b"/Width 32 /Height 32 /ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /SMask 6 0 R", jpeg),
+        (b"/Width 32 /Height 32 /ColorSpace /DeviceGray /BitsPerComponent 8", noise(32 * 32, seed=1))
+    ])
+    archive, count, skipped = extract(pdf)
+    image = Image.open(io.BytesIO(archive.read("page_1_image_1.png")))
+    assert image.mode == "RGBA"
+
+def test_undecodable_image_is_skipped():
+    pdf = page_with_images([
+        (b"/Width 16 /Height 16 /ColorSpace /DeviceGray /BitsPerComponent 3", noise(16 * 6)),
+        (b"/Width 16 /Height 16 /ColorSpace /DeviceGray /BitsPerComponent 8", noise(16 * 16))
+    ])
+    archive, count, skipped = extract(pdf)
+    assert (count, skipped) == (1, 1)
+    assert archive.namelist() == ["page_1_image_2.png"]
@@ -0,0 +1,44 @@
+import pytest
+from utils.page_ranges import PageRanges
+
+@pytest.mark.parametrize("expression, expected", [
+    ("1-3,7,10-", [(1, 3), (7, 7), (10, 12)]),
+    ("-3", [(1, 3)]),
+    ("5", [(5, 5)]),
+    (" 2 - 4 , ,12", [(2, 4), (12, 12)]),
+    ("1-12", [(1, 12)])
+])
+def test_parse(expression, expected):
+    assert PageRanges.parse(expression, 12) == expected
+
+@pytest.mark.parametrize("expression", ["", " , ", "-", "a-b", "1-2-3", "0", "4-2", "13", "10-13", "1.5", "1 3", "1 - 3 5", "1 -3 5"])
+def test_parse_rejects_bad_input(expression):
+    with pytest.raises(ValueError):
+        PageRanges.parse(expression, 12)
+
+def test_every_and_burst():
+    assert PageRanges.every(5, 12) == [(1, 5), (6, 10), (11, 12)]
+    assert PageRanges.burst(3) == [(1, 1), (2, 2), (3, 3)]
+    with pytest.raises(ValueError):
+        PageRanges.every(0, 12)
+
+def test_from_pages_and_to_expression():
+    ranges = PageRanges.from_pages([7, 1, 2, 3, 3, 9, 10])
+    assert ranges == [(1, 3), (7, 7), (9, 10)]
+    assert PageRanges.to_expression(ranges) == "1-3,7,9-10"
+
+def test_to_indexes_merges_overlaps():
+    assert PageRanges.to_indexes([(3, 4), (1, 3)], 5) == [0, 1, 2, 3]
+    with pytest.raises(ValueError):
+        PageRanges.to_indexes([(4, 6)], 5)
+
+@pytest.mark.parametrize("ranges, expected", [
+    ([(1, 12)], ""),
+    ([(1, 6), (7, 12)], ""),
+    ([(3, 3)], "page_3"),
+    ([(2, 5)], "pages_2-5"),
+    ([(2, 3), (4, 5)], "pages_2-5"),
+    ([(7, 7), (1, 3)], "pages_1-3,7")
+])
+def test_describe_selection(ranges, expected):
+    assert PageRanges.describe_selection(ranges, 12) == expected
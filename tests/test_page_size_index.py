@@ -0,0 +1,26 @@
+import io
+import zipfile
+import fitz
+from conftest import build_pdf
+from services.page_size_index import PageSizeIndex
+from services.pdf_splitter import PDFSplitterService
+from utils.input_file import InputFile
+
+def reference_in_string_pdf():
+    return build_pdf([
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] /Resources << >> /Title (see 12 0 R) >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] /Resources << >> /Contents 5 0 R >>",
+        b"<< /Length 0 >>\nstream\n\nendstream"
+    ])
+
+def test_references_inside_strings_are_not_followed():
+    doc = fitz.open("pdf", reference_in_string_pdf())
+    index = PageSizeIndex(doc)
+    assert index.page_objects(0) == {3}
+    assert index.page_objects(1) == {4, 5}
+
+def test_split_by_size_ignores_reference_like_strings():
+    data = PDFSplitterService().split_by_size(InputFile.from_bytes(reference_in_string_pdf()), 1)
+    assert zipfile.ZipFile(io.BytesIO(data)).namelist() == ["document_page_1.pdf", "document_page_2.pdf"]
@@ -0,0 +1,112 @@
+import fitz
+import pytest
+from conftest import build_pdf, noise
+from services.pdf_compressor import PDFCompressorService
+from utils.input_file import InputFile
+
+def image_pdf(width=100, height=100, indirect_length=False, extra=b""):
+    """One page showing an uncompressed RGB image at 2 x 2 inches; ``extra`` is added to its dictionary"""
+    data = noise(width * height * 3)
+    length = b"6 0 R" if indirect_length else str(len(data)).encode()
+    content = b"q 144 0 0 144 0 0 cm /Im0 Do Q"
+    return build_pdf([
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 144 144] "
+        b"/Resources << /XObject << /Im0 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+        b"/BitsPerComponent 8 /Length %s %s>>\nstream\n" % (width, height, length, extra) + data + b"\nendstream",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        str(len(data)).encode()
+    ])
+
+def eligible(pdf_bytes, settings=None):
+    service = PDFCompressorService(settings=settings)
+    doc = fitz.open("pdf", pdf_bytes)
+    try:
+        return service._eligible_images(doc, service._collect_image_placements(doc))
+    finally:
+        doc.close()
+
+def test_eligible_images_reports_stream_length_and_dpi():
+    assert eligible(image_pdf()) == [(4, 30000, 50.0)]
+
+def test_indirect_length_is_measured():
+    assert eligible(image_pdf(indirect_length=True)) == [(4, 30000, 50.0)]
+
+def test_small_images_are_skipped():
+    settings = {"max_workers": 1, "parallel_min_images": 4, "min_image_bytes": 30001}
+    assert eligible(image_pdf(), settings) == []
+
+@pytest.mark.parametrize("extra", [b"/Decode [1 0 1 0 1 0] ", b"/Mask [0 10 0 10 0 10] "])
+def test_images_with_decode_or_mask_are_skipped(extra):
+    assert eligible(image_pdf(extra=extra)) == []
+    result = PDFCompressorService().compress_pdf_with_report(InputFile.from_bytes(image_pdf(extra=extra)), "High")
+    assert result["report"]["images"] == 0
+
+def test_compress_rewrites_image_with_indirect_length():
+    report = PDFCompressorService().compress_pdf_with_report(
+        InputFile.from_bytes(image_pdf(indirect_length=True)), "High"
+    )["report"]
+    assert report["images"] == 1
+    assert report["image_bytes_after"] < report["image_bytes_before"]
+
+def test_kept_original_reports_no_savings(monkeypatch):
+    tobytes = fitz.Document.tobytes
+    monkeypatch.setattr(fitz.Document, "tobytes", lambda doc, **options: tobytes(doc, **options) + b" " * 100000)
+    source = image_pdf()
+    result = PDFCompressorService().compress_pdf_with_report(InputFile.from_bytes(source), "High")
+    
+    report = result["report"]
+    assert result["data"] == source
+    assert report["kept_original"]
+    assert report["images"] == 1
+    assert report["images_downsampled"] == report["bytes_saved"] == report["pixels_removed"] == 0
+    assert report["encodings"]["original"] == 1
+
+def test_soft_mask_is_resampled_with_its_image():
+    pix = fitz.Pixmap(fitz.csRGB, 400, 400, noise(400 * 400 * 3), 0)
+    pix = fitz.Pixmap(pix, 1)
+    pix.set_alpha(noise(400 * 400, seed=1))
+    doc = fitz.open()
+    doc.new_page().insert_image(fitz.Rect(0, 0, 144, 144), pixmap=pix)
+    source = doc.tobytes()
+    
+    result = PDFCompressorService().compress_pdf_with_report(InputFile.from_bytes(source), "High")
+    assert result["report"]["images_downsampled"] == 1
+    
+    compressed = fitz.open("pdf", result["data"])
+    xref, smask, width, height = compressed[0].get_images(full=True)[0][:4]
+    mask = fitz.Pixmap(compressed, smask)
+    assert (width, height) == (192, 192)
+    assert (mask.width, mask.height) == (width, height)
+
+def test_stencil_masks_are_not_recompressed():
+    data = noise(400 * 400 // 8)
+    content = b"q 144 0 0 144 0 0 cm /Im0 Do Q"
+    pdf = build_pdf([
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 144 144] "
+        b"/Resources << /XObject << /Im0 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /XObject /Subtype /Image /Width 400 /Height 400 /ImageMask true "
+        b"/BitsPerComponent 1 /Length %d >>\nstream\n" % len(data) + data + b"\nendstream",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+    ])
+    assert eligible(pdf) == []
+
+def test_placements_keep_the_lowest_dpi():
+    pix = fitz.Pixmap(fitz.csRGB, 300, 300, noise(300 * 300 * 3), 0)
+    doc = fitz.open()
+    first = doc.new_page()
+    xref = first.insert_image(fitz.Rect(0, 0, 72, 72), pixmap=pix)
+    doc.new_page().insert_image(fitz.Rect(0, 0, 216, 216), xref=xref)
+    
+    placements = PDFCompressorService()._collect_image_placements(doc)
+    assert placements == {xref: 100.0}
+
+@pytest.mark.parametrize("effective_dpi, target_dpi, scale", [
+    (300, 150, 0.5), (100, 150, 1.0), (None, 150, 1.0), (300, None, 1.0)
+])
+def test_scale_only_ever_shrinks(effective_dpi, target_dpi, scale):
+    assert PDFCompressorService._scale_for(effective_dpi, target_dpi) == scale
@@ -0,0 +1,11 @@
+import io
+import zipfile
+from conftest import text_pdf
+from services.pdf_converter import PDFConverterService
+from utils.input_file import InputFile
+
+def test_old_png_conversion_name_still_converts_to_images():
+    source = InputFile.from_bytes(text_pdf(["one", "two"]), "report.pdf")
+    result = PDFConverterService().convert(source, "PDF to PNG Images", image_options={"dpi": 20})
+    assert result["filename"] == "report_images.zip"
+    assert zipfile.ZipFile(io.BytesIO(result["data"])).namelist() == ["page_1.png", "page_2.png"]
@@ -0,0 +1,20 @@
+import io
+import zipfile
+import pytest
+from conftest import text_pdf
+from services.pdf_splitter import PDFSplitterService
+from utils.input_file import InputFile
+
+@pytest.fixture
+def six_pages():
+    return InputFile.from_bytes(text_pdf([f"page {number}" for number in range(1, 7)]), "report.pdf")
+
+def test_overlapping_ranges_get_their_own_parts(six_pages):
+    data = PDFSplitterService().split_into_parts(six_pages, [(1, 3), (2, 4), (6, 6)])
+    assert zipfile.ZipFile(io.BytesIO(data)).namelist() == [
+        "report_pages_1-3.pdf", "report_pages_2-4.pdf", "report_page_6.pdf"
+    ]
+
+def test_repeated_ranges_are_rejected(six_pages):
+    with pytest.raises(ValueError, match="1-3 is listed more than once"):
+        PDFSplitterService().split_into_parts(six_pages, [(1, 3), (4, 6), (1, 3)])
@@ -0,0 +1,92 @@
+import os
+import stat
+from utils.result_cache import ResultCache
+
+RESULT = {
+    "data": b"%PDF-1.7 result",
+    "report": {"images": 2, "ratio": 0.5, "kept_original": False, "ranges": [(1, 3), (4, 4)]},
+    "parts": [b"one", b"two"],
+    "text": None
+}
+
+def test_disk_tier_round_trips_results(tmp_path):
+    writer = ResultCache(0, 1024 * 1024, str(tmp_path))
+    writer.put("key", RESULT)
+    
+    reader = ResultCache(0, 1024 * 1024, str(tmp_path))
+    assert reader.get("key") == (True, RESULT)
+    assert reader.stats["disk_hits"] == 1
+
+def test_disk_entries_hold_raw_bytes_not_pickles(tmp_path):
+    cache = ResultCache(0, 1024 * 1024, str(tmp_path))
+    cache.put("key", RESULT)
+    with open(tmp_path / "key.res", "rb") as f:
+        stored = f.read()
+    assert stored.startswith(b"PHRC1\n")
+    assert stored.endswith(b"%PDF-1.7 resultonetwo")
+
+def test_corrupt_entries_are_misses(tmp_path):
+    (tmp_path / "key.res").write_bytes(b"PHRC1\n\xff\xff\xff\x7f{")
+    assert ResultCache(0, 1024 * 1024, str(tmp_path)).get("key") == (False, None)
+
+def test_unsupported_values_stay_in_memory(tmp_path):
+    cache = ResultCache(1024, 1024 * 1024, str(tmp_path))
+    cache.put("key", {"value": object()})
+    assert os.listdir(tmp_path) == []
+    assert cache.get("key")[0]
+
+def test_default_disk_directory_is_private():
+    cache = ResultCache(0, 1024 * 1024)
+    assert stat.S_IMODE(os.stat(cache.disk_dir).st_mode) == 0o700
+    disk_dir = cache.disk_dir
+    del cache
+    assert not os.path.exists(disk_dir)
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(30, 0)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+    cache.put("c", b"c" * 10)
+    assert cache.get("a")[0]  # Now the most recently used
+    cache.put("d", b"d" * 10)
+    
+    assert [key for key in "abcd" if cache.get(key)[0]] == ["a", "c", "d"]
+    assert cache.get_stats()["memory_bytes"] == 30
+
+def test_values_larger_than_the_memory_tier_are_not_kept():
+    cache = ResultCache(10, 0)
+    cache.put("small", b"12345")
+    cache.put("big", b"x" * 11)
+    assert cache.get("big") == (False, None)
+    assert cache.get("small") == (True, b"12345")
+
+def test_disk_tier_evicts_oldest_files(tmp_path):
+    cache = ResultCache(0, 500, str(tmp_path))  # Room for three 100-byte entries and their headers
+    for number, key in enumerate("abc"):
+        cache.put(key, b"x" * 100)
+        os.utime(tmp_path / f"{key}.res", (number, number))
+    cache.get("a")  # Refreshes its mtime
+    cache.put("d", b"x" * 100)
+    
+    assert sorted(os.listdir(tmp_path)) == ["a.res", "c.res", "d.res"]
+    assert cache.get_stats()["disk_bytes"] <= 500
+
+def test_stats_and_get_or_compute():
+    cache = ResultCache(1024, 0)
+    calls = []
+    compute = lambda: calls.append(1) or {"data": b"result"}
+    assert cache.get_or_compute("key", compute) == {"data": b"result"}
+    assert cache.get_or_compute("key", compute) == {"data": b"result"}
+    assert len(calls) == 1
+    
+    stats = cache.get_stats()
+    assert (stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    cache.clear()
+    assert cache.get("key") == (False, None)
+
+def test_keys_depend_on_content_operation_and_params():
+    key = ResultCache.make_key("split", [b"pdf"], {"start": 1, "end": 2})
+    assert key == ResultCache.make_key("split", [b"pdf"], {"end": 2, "start": 1})
+    assert key != ResultCache.make_key("split", [b"other"], {"start": 1, "end": 2})
+    assert key != ResultCache.make_key("split", [b"pdf"], {"start": 1, "end": 3})
+    assert key != ResultCache.make_key("merge", [b"pdf"], {"start": 1, "end": 2})
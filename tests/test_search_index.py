@@ -0,0 +1,81 @@
+import os
+import stat
+from utils.search_index import SearchIndex, Postings, _Segment, _encode_postings
+
+def test_default_indexes_are_private():
+    first, second = SearchIndex(), SearchIndex()
+    first.add_document("a.pdf", "hash-a", ["confidential merger terms"])
+    
+    assert stat.S_IMODE(os.stat(first.index_dir).st_mode) == 0o700
+    assert first.index_dir != second.index_dir
+    assert second.search("merger") == []
+    
+    second.add_document("b.pdf", "hash-b", ["merger"])
+    second.clear()
+    assert [hit["name"] for hit in first.search("merger")] == ["a.pdf"]
+
+def test_private_directory_is_removed_with_the_index():
+    index = SearchIndex()
+    index.add_document("a.pdf", "hash-a", ["text"])
+    index_dir = index.index_dir
+    del index
+    assert not os.path.exists(index_dir)
+
+def test_postings_round_trip_raw_and_compressed():
+    small = [(0, [4]), (3, [0, 9])]
+    large = [(page, list(range(0, 60, 6))) for page in range(0, 400, 7)]
+    
+    for entries, marker in ((small, b"r"), (large, b"z")):
+        block = _encode_postings(entries)
+        assert block[:1] == marker
+        postings = Postings(block)
+        assert postings.pages == [page for page, _ in entries]
+        assert list(postings.frequencies) == [len(offsets) for _, offsets in entries]
+        for page, offsets in entries:
+            assert postings.offsets(page) == offsets
+        assert postings.offsets(1) == []
+
+def test_segment_round_trip(tmp_path):
+    path = str(tmp_path / "one.seg")
+    _Segment.write(path, [("a.pdf", "hash-a", ["Alpha beta", "beta GAMMA"]), ("b.pdf", "hash-b", ["delta"])])
+    segment = _Segment(path)
+    try:
+        assert [document["name"] for document in segment.documents] == ["a.pdf", "b.pdf"]
+        assert segment.terms == ["alpha", "beta", "delta", "gamma"]
+        assert list(segment.page_lengths) == [2, 2, 1]
+        assert segment.page_text(1) == "beta GAMMA"
+        assert segment.postings("beta").pages == [0, 1]
+        assert segment.postings("missing") is None
+        assert segment.expand_prefix("be", 10) == ["beta"]
+        assert segment.locate(2) == (segment.documents[1], 1)
+    finally:
+        segment.close()
+
+def test_segments_merge_without_losing_documents_or_order(tmp_path):
+    index = SearchIndex(str(tmp_path), max_segments=2)
+    for number in range(4):
+        assert index.add_document(f"doc{number}.pdf", f"hash-{number}", [f"shared page of document{number}", "second page"])
+    assert not index.add_document("again.pdf", "hash-0", ["ignored"])
+    
+    stats = index.get_stats()
+    assert (stats["documents"], stats["pages"]) == (4, 8)
+    assert stats["segments"] <= 2
+    assert [document["name"] for document in index.list_documents()] == [f"doc{number}.pdf" for number in range(4)]
+    
+    hits = index.search("document2")
+    assert [(hit["name"], hit["page"]) for hit in hits] == [("doc2.pdf", 1)]
+    assert len(index.search("shared")) == 4
+    assert len(index.search("doc*")) == 4
+
+def test_search_highlights_the_matched_terms(tmp_path):
+    index = SearchIndex(str(tmp_path))
+    index.add_document("a.pdf", "hash-a", ["The termination clause ends the contract.\nTerminate with notice."])
+    hit = index.search("terminat*")[0]
+    assert [hit["snippet"][start:end] for start, end in hit["highlights"]] == ["termination", "Terminate"]
+    assert "\n" not in hit["snippet"]
+
+def test_other_processes_see_segments_in_a_shared_directory(tmp_path):
+    writer, reader = SearchIndex(str(tmp_path)), SearchIndex(str(tmp_path))
+    writer.add_document("a.pdf", "hash-a", ["invoice"])
+    assert reader.has_document("hash-a")
+    assert [hit["name"] for hit in reader.search("invoice")] == ["a.pdf"]
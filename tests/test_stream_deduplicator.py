@@ -0,0 +1,67 @@
+import fitz
+from services.stream_deduplicator import StreamDeduplicator
+
+def add_stream(doc, data, dictionary="<<>>"):
+    xref = doc.get_new_xref()
+    doc.update_object(xref, dictionary)
+    doc.update_stream(xref, data)
+    return xref
+
+def add_object(doc, text):
+    xref = doc.get_new_xref()
+    doc.update_object(xref, text)
+    return xref
+
+def test_duplicate_references_point_at_the_kept_copy():
+    doc = fitz.open()
+    doc.new_page()
+    first_xref = doc.xref_length()
+    kept = add_stream(doc, b"same font program")
+    duplicate = add_stream(doc, b"same font program")
+    other = add_stream(doc, b"different data")
+    holder = add_object(doc, f"<</A {kept} 0 R/B {duplicate} 0 R/C [{other} 0 R {duplicate} 0 R]>>")
+    
+    deduplicator = StreamDeduplicator()
+    deduplicator.deduplicate(doc, first_xref)
+    
+    assert doc.xref_object(holder, compressed=True) == f"<</A {kept} 0 R/B {kept} 0 R/C[{other} 0 R {kept} 0 R]>>"
+    assert deduplicator.get_report() == {"duplicates_removed": 1, "bytes_saved": len(b"same font program")}
+
+def test_streams_are_matched_across_documents():
+    deduplicator = StreamDeduplicator()
+    doc = fitz.open()
+    doc.new_page()
+    kept = add_stream(doc, b"logo")
+    deduplicator.deduplicate(doc, kept)
+    
+    first_xref = doc.xref_length()
+    duplicate = add_stream(doc, b"logo")
+    holder = add_object(doc, f"<</XObject <</Im0 {duplicate} 0 R>>>>")
+    deduplicator.deduplicate(doc, first_xref)
+    assert doc.xref_get_key(holder, "XObject/Im0") == ("xref", f"{kept} 0 R")
+
+def test_dictionaries_that_become_equal_are_merged():
+    doc = fitz.open()
+    doc.new_page()
+    first_xref = doc.xref_length()
+    masks = [add_stream(doc, b"mask"), add_stream(doc, b"mask")]
+    images = [add_stream(doc, b"pixels", f"<</SMask {mask} 0 R>>") for mask in masks]
+    holder = add_object(doc, f"<</Im0 {images[0]} 0 R/Im1 {images[1]} 0 R>>")
+    
+    deduplicator = StreamDeduplicator()
+    deduplicator.deduplicate(doc, first_xref)
+    assert deduplicator.duplicates_removed == 2
+    assert doc.xref_object(holder, compressed=True) == f"<</Im0 {images[0]} 0 R/Im1 {images[0]} 0 R>>"
+
+def test_references_inside_strings_are_left_alone():
+    doc = fitz.open()
+    doc.new_page()
+    first_xref = doc.xref_length()
+    kept = add_stream(doc, b"data")
+    duplicate = add_stream(doc, b"data")
+    holder = add_object(doc, f"<</Ref {duplicate} 0 R/Title ({duplicate} 0 R \\) ({duplicate} 0 R))>>")
+    
+    StreamDeduplicator().deduplicate(doc, first_xref)
+    assert doc.xref_get_key(holder, "Ref") == ("xref", f"{kept} 0 R")
+    assert f"({duplicate} 0 R" in doc.xref_object(holder, compressed=True)
+    assert StreamDeduplicator._substitute(f"[({duplicate} 0 R) {duplicate} 0 R]", {duplicate: kept}) == f"[({duplicate} 0 R) {kept} 0 R]"
@@ -1,3 +1,5 @@
+import html
+import functools
 import streamlit as st
 from config.app_config import AppConfig
 
@@ -13,9 +15,10 @@ class UILayout:
         if 'dark_mode' not in st.session_state:
             st.session_state.dark_mode = False
     
-    def _get_theme_colors(self):
+    @staticmethod
+    def _get_theme_colors(dark_mode):
         """Get theme-specific colors"""
-        if st.session_state.dark_mode:
+        if dark_mode:
             return {
                 'bg_primary': '#0e1117',
                 'bg_secondary': '#262730',
@@ -48,10 +51,16 @@ class UILayout:
     
     def _apply_theme_css(self):
         """Apply theme-specific CSS"""
-        colors = self._get_theme_colors()
-        theme_name = "dark" if st.session_state.dark_mode else "light"
-        
-        st.markdown(f"""
+        st.markdown(self._theme_css(st.session_state.dark_mode), unsafe_allow_html=True)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _theme_css(dark_mode):
+        """Build the stylesheet for a theme (once per theme, not on every rerun)"""
+        colors = UILayout._get_theme_colors(dark_mode)
+        theme_name = "dark" if dark_mode else "light"
+        
+        return f"""
         <style>
         /* Theme: {theme_name} */
         
@@ -227,7 +236,7 @@ class UILayout:
             background: linear-gradient(45deg, {colors['accent']}, {colors['success']});
         }}
         </style>
-        """, unsafe_allow_html=True)
+        """
     
     def render_theme_toggle(self):
         """Render theme toggle button in sidebar"""
@@ -277,7 +286,8 @@ class UILayout:
         with col1:
             self._render_feature_section("🔁 Convert PDF", [
                 "➡️ PDF to Word (.docx)",
-                "🖼️ PDF to PNG images", 
+                "🖼️ PDF to PNG, JPEG or WebP images", 
+                "📷 Extract embedded images as they are stored",
                 "🔤 PDF to Text"
             ])
             self._render_feature_section("➕ Merge PDFs", [
@@ -374,4 +384,166 @@ class UILayout:
         """Render themed progress bar"""
         progress_bar = st.progress(progress)
         st.text(text)
-        return progress_bar
\ No newline at end of file
+        return progress_bar
+    
+    def render_text_preview(self, pages, max_chars, expanded=False):
+        """Render the first ``max_chars`` characters of a list of page texts"""
+        preview = []
+        length = 0
+        for text in pages:
+            preview.append(text[:max_chars - length])
+            length += len(preview[-1])
+            if length >= max_chars:
+                break
+        
+        with st.expander("View Extracted Text", expanded=expanded):
+            st.text_area("Content:", value="".join(preview), height=300, disabled=True)
+            if length >= max_chars:
+                st.caption(f"Showing the first {max_chars:,} characters; download the file for the full text.")
+    
+    def render_thumbnail_grid(self, tiles, selection, columns, key_prefix):
+        """Render page thumbnails with a checkbox each, updating ``selection`` (1-based pages) in place
+        
+        ``tiles`` maps 0-based pages to JPEG bytes, None while still
+        rendering, or empty bytes when a page could not be rendered.
+        """
+        grid = st.columns(columns)
+        for position, (page_num, tile) in enumerate(tiles.items()):
+            page = page_num + 1
+            key = f"{key_prefix}_{page}"
+            with grid[position % columns]:
+                if tile:
+                    st.image(tile)
+                else:
+                    st.caption("Rendering..." if tile is None else "Preview unavailable")
+                if key not in st.session_state:
+                    st.session_state[key] = page in selection
+                if st.checkbox(f"Page {page}", key=key):
+                    selection.add(page)
+                else:
+                    selection.discard(page)
+    
+    def render_search_results(self, hits, elapsed_ms):
+        """Render ranked search hits with highlighted snippets"""
+        st.caption(f"{len(hits)} result(s) in {elapsed_ms:.1f} ms")
+        if not hits:
+            self.render_info_message("No matches in the indexed documents")
+            return
+        
+        for hit in hits:
+            snippet = []
+            position = 0
+            for start, end in hit["highlights"]:
+                snippet.append(html.escape(hit["snippet"][position:start]))
+                snippet.append(f"<mark>{html.escape(hit['snippet'][start:end])}</mark>")
+                position = end
+            snippet.append(html.escape(hit["snippet"][position:]))
+            st.markdown(f'''
+            <div class="step-card">
+                <strong>📄 {html.escape(hit["name"])}</strong> · page {hit["page"]}<br>
+                {"".join(snippet)}
+            </div>
+            ''', unsafe_allow_html=True)
+    
+    def render_search_index(self, stats, documents):
+        """Render what the search index holds"""
+        with st.expander(f"📚 Indexed documents ({stats['documents']} files, {stats['pages']} pages)"):
+            if not documents:
+                st.write('Nothing indexed yet. Upload PDFs above and click "Index new PDF(s)" to add them.')
+            for document in documents:
+                st.write(f"• {document['name']} ({document['page_count']} pages)")
+            st.caption(f"Index size on disk: {stats['disk_bytes'] / 1024:.2f} KB in {stats['segments']} segment(s)")
+    
+    def render_compression_report(self, report):
+        """Render the image downsampling report for a compression level"""
+        with st.expander(f"📉 {report['level']} level report (target {report['target_dpi']} DPI)"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Images Downsampled", f"{report['images_downsampled']} / {report['images']}")
+            with col2:
+                st.metric("Pixels Removed", f"{report['pixels_removed'] / 1_000_000:.1f} MP")
+            with col3:
+                st.metric("Image Bytes Saved", f"{report['bytes_saved'] / 1024:.2f} KB")
+    
+    def render_metrics(self, rows):
+        """Render per-operation latency percentiles, phase split and sizes"""
+        if not rows:
+            self.render_info_message("No operations have run in this process yet")
+            return
+        
+        st.subheader("Operations")
+        st.dataframe([
+            {
+                "Operation": row["operation"],
+                "Runs": row["count"],
+                "Errors": row["errors"],
+                "Cache hits": row["cache_hits"],
+                "p50 (s)": round(row["quantiles"].get(0.5, 0.0), 3),
+                "p90 (s)": round(row["quantiles"].get(0.9, 0.0), 3),
+                "p99 (s)": round(row["quantiles"].get(0.99, 0.0), 3),
+                "Pages": row["pages"],
+                "In (MB)": round(row["input_bytes"] / (1024 * 1024), 2),
+                "Out (MB)": round(row["output_bytes"] / (1024 * 1024), 2),
+                "Peak RSS (MB)": round(row["peak_rss_bytes"] / (1024 * 1024), 1)
+            }
+            for row in rows
+        ], hide_index=True)
+        
+        st.subheader("Where the time goes")
+        st.dataframe([
+            dict(
+                {"Operation": row["operation"]},
+                **{
+                    f"{phase.capitalize()} (%)": round(100 * seconds / max(sum(row["phase_seconds"].values()), 1e-9), 1)
+                    for phase, seconds in row["phase_seconds"].items()
+                }
+            )
+            for row in rows
+        ], hide_index=True)
+    
+    def render_history(self, history):
+        """Render this session's operations, newest first"""
+        st.subheader("Session history")
+        if not history:
+            self.render_info_message("Nothing processed in this session yet")
+            return
+        st.dataframe([
+            {
+                "Time": entry["timestamp"],
+                "Operation": entry["operation"],
+                "Details": entry["details"],
+                "Duration (s)": None if entry.get("duration") is None else round(entry["duration"], 2),
+                "In (KB)": None if entry.get("input_bytes") is None else round(entry["input_bytes"] / 1024, 1),
+                "Out (KB)": None if entry.get("output_bytes") is None else round(entry["output_bytes"] / 1024, 1)
+            }
+            for entry in reversed(history)
+        ], hide_index=True)
+    
+    def render_merge_report(self, report):
+        """Render what cross-document deduplication saved in a merge"""
+        if not report["duplicates_removed"]:
+            return
+        self.render_info_message(
+            f"{report['duplicates_removed']} shared fonts, images and profiles stored once, "
+            f"saving {report['bytes_saved'] / 1024:.2f} KB"
+        )
+    
+    def render_target_size_report(self, report):
+        """Render the outcome of a target-size compression search"""
+        target_kb = report["target_bytes"] / 1024
+        if report["reached_target"]:
+            self.render_success_message(f"Fits the {target_kb:.0f} KB target")
+        else:
+            self.render_warning_message(
+                f"Could not reach {target_kb:.0f} KB; this is the smallest result without dropping content"
+            )
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Search Iterations", report["iterations"])
+        with col2:
+            st.metric("Search Time", f"{report.get('elapsed', 0):.2f} s")
+        with col3:
+            dpi = report["dpi"] or "original"
+            quality = report["quality"] or "original"
+            st.metric("Settings Used", f"{dpi} DPI / Q{quality}")
\ No newline at end of file
@@ -0,0 +1,149 @@
+import os
+from utils.pdf_buffer import PDFBuffer
+from utils.input_file import InputFile
+from utils.result_cache import ResultCache
+from utils.metrics import Metrics
+
+class DocumentEntry:
+    """Parsed handles and index data for a single upload"""
+    
+    def __init__(self, file_key, content_hash, buffer):
+        self.file_key = file_key
+        self.content_hash = content_hash
+        self.buffer = buffer
+        self.fitz_doc = None
+        self.pypdf_reader = None
+        self.index = None
+    
+    def close(self):
+        """Release the parsed handles"""
+        if self.fitz_doc is not None:
+            self.fitz_doc.close()
+        self.fitz_doc = None
+        self.pypdf_reader = None
+        self.buffer.close()
+
+class DocumentCache:
+    """Session-scoped cache holding one parsed handle per upload
+    
+    Entries are keyed by the upload's file id and content hash, so a new
+    upload under the same widget replaces the old entry instead of reusing a
+    stale parse. Read-only handles are shared; callers that modify a document
+    check out their own handle with ``checkout_fitz_document``.
+    """
+    
+    def __init__(self):
+        self._entries = {}
+    
+    @staticmethod
+    def _file_key(uploaded_file):
+        """Key an upload by its widget file id, falling back to its name"""
+        return getattr(uploaded_file, "file_id", None) or getattr(uploaded_file, "name", None)
+    
+    def get_entry(self, uploaded_file):
+        """Get (or create) the cache entry for an upload, a path or an InputFile"""
+        if isinstance(uploaded_file, (str, os.PathLike)):
+            uploaded_file = InputFile.from_path(uploaded_file)  # Keyed by path, mtime and size
+        file_key = self._file_key(uploaded_file)
+        entry = self._entries.get(file_key)
+        
+        if entry is not None and getattr(uploaded_file, "file_id", None):
+            return entry  # Streamlit issues a new file id for every new upload
+        memoized_hash = getattr(uploaded_file, "content_hash", None)
+        if entry is not None and memoized_hash == entry.content_hash:
+            return entry  # Bytes input hashed on an earlier lookup
+        
+        with Metrics.phase("read"):
+            buffer = PDFBuffer(uploaded_file)
+            content_hash = memoized_hash or ResultCache.hash_bytes(buffer.view)
+        if isinstance(uploaded_file, InputFile) and uploaded_file.path is None:
+            uploaded_file.content_hash = content_hash
+        if entry is not None and entry.content_hash == content_hash:
+            buffer.close()
+            return entry
+        
+        # The upload changed under this key; drop the stale parse
+        self.evict(file_key)
+        entry = DocumentEntry(file_key, content_hash, buffer)
+        if file_key is not None:
+            self._entries[file_key] = entry
+        return entry
+    
+    def get_buffer(self, uploaded_file):
+        """Get the zero-copy PDFBuffer over an upload"""
+        return self.get_entry(uploaded_file).buffer
+    
+    def get_fitz_document(self, uploaded_file):
+        """Get the shared, read-only PyMuPDF handle for an upload"""
+        entry = self.get_entry(uploaded_file)
+        if entry.fitz_doc is None:
+            entry.fitz_doc = self._open_fitz(entry)
+        return entry.fitz_doc
+    
+    def checkout_fitz_document(self, uploaded_file):
+        """Take ownership of a PyMuPDF handle that the caller may modify and must close"""
+        entry = self.get_entry(uploaded_file)
+        doc = entry.fitz_doc
+        entry.fitz_doc = None
+        if doc is None:
+            doc = self._open_fitz(entry)
+        return doc
+    
+    def get_pypdf_reader(self, uploaded_file):
+        """Get the shared PyPDF2 reader for an upload"""
+        entry = self.get_entry(uploaded_file)
+        if entry.pypdf_reader is None:
+            from PyPDF2 import PdfReader  # Imported on first use, like PyMuPDF in _open_fitz
+            with Metrics.phase("parse"):
+                entry.pypdf_reader = PdfReader(entry.buffer.open_stream())
+            Metrics.add_document(entry.content_hash, len(entry.pypdf_reader.pages))
+        return entry.pypdf_reader
+    
+    @staticmethod
+    def _open_fitz(entry):
+        """Parse an entry's buffer with PyMuPDF"""
+        import fitz  # PyMuPDF; imported on first parse so pages that never open a PDF don't load it
+        with Metrics.phase("parse"):
+            doc = fitz.open(stream=entry.buffer.view, filetype="pdf")
+        Metrics.add_document(entry.content_hash, len(doc))
+        return doc
+    
+    def get_index(self, uploaded_file):
+        """Get the page-count and metadata index for an upload"""
+        entry = self.get_entry(uploaded_file)
+        if entry.index is None:
+            doc = self.get_fitz_document(uploaded_file)
+            entry.index = {
+                "page_count": len(doc),
+                "metadata": dict(doc.metadata or {}),
+                "is_encrypted": doc.is_encrypted,
+                "content_hash": entry.content_hash
+            }
+        return entry.index
+    
+    def get_page_count(self, uploaded_file):
+        """Get the number of pages without re-parsing the upload"""
+        return self.get_index(uploaded_file)["page_count"]
+    
+    def retain(self, uploaded_files):
+        """Evict every entry whose upload is no longer present"""
+        if uploaded_files is None:
+            uploaded_files = []
+        elif not isinstance(uploaded_files, (list, tuple)):
+            uploaded_files = [uploaded_files]
+        
+        active_keys = {self._file_key(uploaded_file) for uploaded_file in uploaded_files}
+        for file_key in list(self._entries):
+            if file_key not in active_keys:
+                self.evict(file_key)
+    
+    def evict(self, file_key):
+        """Drop a single entry and close its handles"""
+        entry = self._entries.pop(file_key, None)
+        if entry is not None:
+            entry.close()
+    
+    def clear(self):
+        """Drop every entry"""
+        for file_key in list(self._entries):
+            self.evict(file_key)
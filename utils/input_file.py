@@ -0,0 +1,92 @@
+import os
+import mmap
+from io import BytesIO
+
+class InputFile:
+    """File-like input that lets services take paths and bytes as well as uploads
+    
+    It exposes the parts of Streamlit's ``UploadedFile`` interface the
+    services rely on (``name``, ``size``, ``file_id``, ``getvalue`` and
+    ``getbuffer``). Path inputs are memory-mapped rather than read.
+    
+    Path inputs get a ``file_id`` from their path, mtime and size. Byte
+    inputs cannot change, so DocumentCache memoizes their ``content_hash``
+    on the object instead of hashing them on every lookup.
+    """
+    
+    def __init__(self, name, data=None, path=None):
+        self.name = name
+        self.path = path
+        self._data = data
+        self._file = None
+        self._mmap = None
+        self.content_hash = None
+        
+        if path is not None:
+            stat = os.stat(path)
+            self.size = stat.st_size
+            self.file_id = f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+        else:
+            self.size = len(data)
+            self.file_id = None
+    
+    @classmethod
+    def from_path(cls, path):
+        """Wrap a PDF on disk"""
+        return cls(os.path.basename(path), path=os.fspath(path))
+    
+    @classmethod
+    def from_bytes(cls, data, name="document.pdf"):
+        """Wrap PDF bytes held in memory"""
+        return cls(name, data=data)
+    
+    @classmethod
+    def wrap(cls, source, name=None):
+        """Wrap a path or bytes; uploads and other file objects pass through unchanged"""
+        if isinstance(source, (str, os.PathLike)):
+            return cls.from_path(source)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return cls.from_bytes(bytes(source), name or "document.pdf")
+        return source
+    
+    @staticmethod
+    def output_stem(name):
+        """Get the stem output files are named after: the name without its .pdf extension, in any case"""
+        root, extension = os.path.splitext(name)
+        return root if extension.lower() == ".pdf" else name
+    
+    def getbuffer(self):
+        """Get a memoryview of the contents without copying them"""
+        if self._data is not None:
+            return memoryview(self._data)
+        if self.size == 0:
+            return memoryview(b"")
+        if self._mmap is None:
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+    
+    def getvalue(self):
+        """Get the contents as bytes"""
+        if self._data is not None:
+            return self._data
+        with open(self.path, 'rb') as f:
+            return f.read()
+    
+    def open(self):
+        """Open the contents as a binary file object"""
+        if self._data is not None:
+            return BytesIO(self._data)
+        return open(self.path, 'rb')
+    
+    def close(self):
+        """Release the memory mapping, if any"""
+        try:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+        except BufferError:
+            pass  # A view is still exported; GC frees the mapping later
+        if self._file is not None and self._mmap is None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,147 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config.app_config import AppConfig
+
+class Job:
+    """A unit of background work with its state, progress and result"""
+    
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    
+    def __init__(self, label, metadata=None):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.metadata = metadata or {}
+        self.state = Job.QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a free worker..."
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+    
+    @property
+    def is_active(self):
+        return self.state in (Job.QUEUED, Job.RUNNING)
+    
+    def report_progress(self, done, total, message=None, partial=None):
+        """Progress callback handed to services as ``progress_callback``
+        
+        Services that produce output incrementally pass what they have so
+        far as ``partial``, which the page can preview while the job runs.
+        """
+        if total:
+            self.progress = min(1.0, max(0.0, done / total))
+        if message:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+    
+    def elapsed(self):
+        """Seconds spent running so far (or in total, once finished)"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+class JobQueue:
+    """Process-wide queue that runs service calls on background threads
+    
+    Jobs outlive the Streamlit script run that submitted them, so reruns and
+    navigation do not interrupt the work. Threads are enough here: services
+    already move CPU-heavy work onto process pools. Finished jobs are kept
+    for ``retention_seconds`` (at most ``max_finished_jobs``) so the
+    controller can pick their results up on a later run.
+    """
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, max_workers, max_finished_jobs, retention_seconds):
+        self.max_finished_jobs = max_finished_jobs
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def get_shared(cls):
+        """Get the process-wide job queue configured from AppConfig"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                settings = AppConfig.JOB_SETTINGS
+                cls._shared = cls(
+                    settings["max_workers"],
+                    settings["max_finished_jobs"],
+                    settings["retention_seconds"]
+                )
+            return cls._shared
+    
+    def submit(self, label, func, *args, metadata=None, **kwargs):
+        """Queue ``func(*args, progress_callback=..., **kwargs)`` and return its Job"""
+        job = Job(label, metadata)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+    
+    def get(self, job_id):
+        """Look up a job by id (None once it has been pruned)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def list_jobs(self):
+        """Get every tracked job, oldest first"""
+        with self._lock:
+            return list(self._jobs.values())
+    
+    def discard(self, job_id):
+        """Forget a finished job and release its result"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.is_active:
+                del self._jobs[job_id]
+    
+    def _run(self, job, func, args, kwargs):
+        """Run a job on a worker thread, recording its outcome"""
+        job.state = Job.RUNNING
+        job.started = time.time()
+        job.message = "Starting..."
+        try:
+            job.result = func(*args, progress_callback=job.report_progress, **kwargs)
+            job.progress = 1.0
+            job.partial = None
+            job.message = "Done"
+            state = Job.DONE
+        except Exception as e:
+            job.error = str(e)
+            job.message = "Failed"
+            state = Job.FAILED
+        # Set the finish time first; pruning reads it as soon as the job looks finished
+        job.finished = time.time()
+        job.state = state
+    
+    def _prune(self):
+        """Drop finished jobs past their retention time or over the count limit"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if not job.is_active]
+        expired = {
+            job.id for job in finished
+            if now - job.finished > self.retention_seconds
+        }
+        surplus = len(finished) - len(expired) - self.max_finished_jobs
+        for job in finished:
+            if surplus <= 0:
+                break
+            if job.id not in expired:
+                expired.add(job.id)
+                surplus -= 1
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,325 @@
+import os
+import sys
+import time
+import resource
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from config.app_config import AppConfig
+
+PHASES = ("read", "parse", "process", "serialize")
+QUANTILES = (0.5, 0.9, 0.99)
+
+def peak_rss_bytes():
+    """Peak resident memory of this process and its finished worker processes"""
+    own = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    own = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    unit = 1 if sys.platform == "darwin" else 1024
+    if own is None:
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    return max(own, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit)
+
+def size_of(value):
+    """Byte size of an upload, path, bytes or service result (0 if unknown)"""
+    if isinstance(value, (list, tuple)):
+        return sum(size_of(item) for item in value)
+    if isinstance(value, dict):
+        return size_of(value.get("data", b""))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, (str, os.PathLike)):
+        try:
+            return os.path.getsize(value)
+        except OSError:
+            return 0
+    return getattr(value, "size", None) or 0
+
+class OperationTimer:
+    """Measurements for one run of an operation"""
+    
+    def __init__(self, operation, kind):
+        self.operation = operation
+        self.kind = kind
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.pages = 0
+        self.cache_hit = False
+        self.idle = 0.0
+        self.started = time.perf_counter()
+        self.duration = None
+        self._documents = set()
+        self._phase_depth = 0
+    
+    def add_document(self, content_hash, page_count):
+        """Count a parsed document's pages once, however often it is opened"""
+        if content_hash not in self._documents:
+            self._documents.add(content_hash)
+            self.pages += page_count
+    
+    def finish(self):
+        """Stop the clock; time not spent in a named phase counts as processing"""
+        self.duration = max(0.0, time.perf_counter() - self.started - self.idle)
+        named = sum(seconds for phase, seconds in self.phases.items() if phase != "process")
+        self.phases["process"] = max(0.0, self.duration - named)
+
+class OperationStats:
+    """Running totals and a latency window for one operation"""
+    
+    def __init__(self, window_size):
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=window_size)
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.pages = 0
+        self.peak_rss_bytes = 0
+        self.last_run = None
+    
+    def add(self, timer, failed, rss_bytes):
+        self.count += 1
+        self.errors += int(failed)
+        self.cache_hits += int(timer.cache_hit)
+        self.total_seconds += timer.duration
+        self.latencies.append(timer.duration)
+        for phase, seconds in timer.phases.items():
+            self.phase_seconds[phase] += seconds
+        self.input_bytes += timer.input_bytes
+        self.output_bytes += timer.output_bytes
+        self.pages += timer.pages
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss_bytes)
+        self.last_run = time.time()
+    
+    def quantiles(self):
+        """Latency quantiles over the window, by nearest rank"""
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+class Metrics:
+    """Process-wide latency, phase, size and memory statistics per operation
+    
+    ``track(operation)`` times one run. While it is open, code on the same
+    thread marks phases with ``Metrics.phase("parse")`` and reports sizes
+    with ``Metrics.annotate(...)``; both are no-ops when nothing is being
+    tracked, so services and caches can call them unconditionally. Time
+    outside the read, parse and serialize phases counts as processing.
+    Latency percentiles cover the last ``window_size`` runs; totals cover
+    the life of the process. Peak memory is the process high-water mark
+    when a run finished, so with concurrent runs it is an upper bound.
+    """
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    _local = threading.local()
+    
+    def __init__(self, window_size, export_path=None):
+        self.window_size = window_size
+        self.export_path = export_path
+        self.started = time.time()
+        self._operations = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def get_shared(cls):
+        """Get the process-wide metrics registry configured from AppConfig"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                settings = AppConfig.METRICS_SETTINGS
+                cls._shared = cls(settings["window_size"], settings["export_path"])
+            return cls._shared
+    
+    @classmethod
+    def current(cls):
+        """The innermost timer open on this thread, or None"""
+        stack = getattr(cls._local, "stack", None)
+        return stack[-1] if stack else None
+    
+    @contextmanager
+    def track(self, operation, kind="service"):
+        """Time one run of ``operation``, yielding its OperationTimer
+        
+        Only ``Exception`` counts as a failure; Streamlit's rerun and stop
+        signals pass through as normal exits.
+        """
+        timer = OperationTimer(operation, kind)
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        self._local.stack.append(timer)
+        failed = False
+        try:
+            yield timer
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._local.stack.pop()
+            timer.finish()
+            self.record(timer, failed)
+    
+    def record(self, timer, failed=False):
+        """Add a finished run to its operation's statistics"""
+        rss_bytes = peak_rss_bytes()
+        with self._lock:
+            stats = self._operations.get(timer.operation)
+            if stats is None:
+                stats = self._operations[timer.operation] = OperationStats(self.window_size)
+            stats.add(timer, failed, rss_bytes)
+        if self.export_path:
+            self.write_prometheus(self.export_path)
+    
+    @classmethod
+    @contextmanager
+    def phase(cls, name):
+        """Attribute the time spent in this block to a phase of the current run"""
+        timer = cls.current()
+        if timer is None or timer._phase_depth:
+            # Nested phases are already covered by the outer one
+            yield
+            return
+        timer._phase_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timer._phase_depth -= 1
+            timer.phases[name] = timer.phases.get(name, 0.0) + time.perf_counter() - started
+    
+    @classmethod
+    @contextmanager
+    def idle(cls):
+        """Leave deliberate waiting (such as poll sleeps) out of the current run's latency"""
+        timer = cls.current()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if timer is not None:
+                timer.idle += time.perf_counter() - started
+    
+    @classmethod
+    def annotate(cls, **values):
+        """Set measurements (operation, input_bytes, output_bytes, pages, cache_hit) on the current run"""
+        timer = cls.current()
+        if timer is not None:
+            for name, value in values.items():
+                setattr(timer, name, value)
+    
+    @classmethod
+    def add_document(cls, content_hash, page_count):
+        """Count a parsed document's pages towards the current run"""
+        timer = cls.current()
+        if timer is not None:
+            timer.add_document(content_hash, page_count)
+    
+    def snapshot(self):
+        """Per-operation statistics as plain dicts, sorted by operation"""
+        with self._lock:
+            return [
+                {
+                    "operation": operation,
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "cache_hits": stats.cache_hits,
+                    "mean_seconds": stats.total_seconds / stats.count,
+                    "quantiles": stats.quantiles(),
+                    "phase_seconds": dict(stats.phase_seconds),
+                    "input_bytes": stats.input_bytes,
+                    "output_bytes": stats.output_bytes,
+                    "pages": stats.pages,
+                    "peak_rss_bytes": stats.peak_rss_bytes,
+                    "last_run": stats.last_run
+                }
+                for operation, stats in sorted(self._operations.items())
+            ]
+    
+    def reset(self):
+        """Drop every statistic"""
+        with self._lock:
+            self._operations.clear()
+    
+    def to_prometheus(self):
+        """Render the statistics in the Prometheus text exposition format"""
+        prefix = "pdf_powerhub"
+        lines = []
+        
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{prefix}_{name}{suffix}{label_text} {value!r}")
+        
+        snapshot = self.snapshot()
+        latency = []
+        for row in snapshot:
+            labels = {"operation": row["operation"]}
+            for q, seconds in row["quantiles"].items():
+                latency.append(("", dict(labels, quantile=f"{q:g}"), seconds))
+            latency.append(("_sum", labels, row["mean_seconds"] * row["count"]))
+            latency.append(("_count", labels, row["count"]))
+        metric("operation_duration_seconds", "summary", f"Operation latency (quantiles over the last {self.window_size} runs)", latency)
+        metric("operation_phase_seconds_total", "counter", "Time spent per phase of each operation", [
+            ("", {"operation": row["operation"], "phase": phase}, seconds)
+            for row in snapshot for phase, seconds in row["phase_seconds"].items()
+        ])
+        for name, key, help_text in (
+            ("operation_errors_total", "errors", "Failed runs"),
+            ("operation_cache_hits_total", "cache_hits", "Runs answered from the result cache"),
+            ("operation_input_bytes_total", "input_bytes", "Input bytes processed"),
+            ("operation_output_bytes_total", "output_bytes", "Output bytes produced"),
+            ("operation_pages_total", "pages", "Pages parsed")
+        ):
+            metric(name, "counter", help_text, [("", {"operation": row["operation"]}, row[key]) for row in snapshot])
+        metric("operation_peak_rss_bytes", "gauge", "Highest process peak RSS seen when a run finished", [
+            ("", {"operation": row["operation"]}, row["peak_rss_bytes"]) for row in snapshot
+        ])
+        metric("process_peak_rss_bytes", "gauge", "Peak RSS of this process and its finished workers", [("", {}, peak_rss_bytes())])
+        metric("process_start_time_seconds", "gauge", "When metrics collection started", [("", {}, self.started)])
+        return "\n".join(lines) + "\n"
+    
+    def write_prometheus(self, path):
+        """Write the Prometheus text to ``path`` atomically (for node_exporter's textfile collector)"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def instrumented(operation):
+    """Decorator that tracks a service method as ``operation``
+    
+    The first argument's size is recorded as input and the result's as
+    output. A call made while another service method of the same thread is
+    being tracked (``merge_pdfs`` calling ``merge_pdfs_with_report``) is
+    part of that run rather than a run of its own.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            current = Metrics.current()
+            if current is not None and current.kind == "service":
+                return method(self, *args, **kwargs)
+            with Metrics.get_shared().track(operation) as timer:
+                timer.input_bytes = size_of(args[0]) if args else 0
+                result = method(self, *args, **kwargs)
+                timer.output_bytes = timer.output_bytes or size_of(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,92 @@
+import re
+
+_RANGE = re.compile(r"^(?:(\d+)|(\d*)\s*(-)\s*(\d*))$")
+
+class PageRanges:
+    """Builds lists of 1-based, inclusive (start, end) page ranges"""
+    
+    @staticmethod
+    def parse(expression, page_count):
+        """Parse a range expression such as ``1-3,7,10-``
+        
+        ``10-`` runs to the last page and ``-3`` starts at the first. Raises
+        ValueError for malformed or out-of-range parts.
+        """
+        ranges = []
+        for part in expression.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            
+            match = _RANGE.match(part)
+            if match is None or part == "-":
+                raise ValueError(f"Invalid page range: '{part}'")
+            page, first, dash, last = match.groups()
+            first = page or first
+            start = int(first) if first else 1
+            end = (int(last) if last else page_count) if dash else start
+            
+            if not 1 <= start <= end <= page_count:
+                raise ValueError(f"Page range '{part}' must lie within 1-{page_count}")
+            ranges.append((start, end))
+        
+        if not ranges:
+            raise ValueError("Enter at least one page range")
+        return ranges
+    
+    @staticmethod
+    def every(pages_per_part, page_count):
+        """Split into consecutive parts of ``pages_per_part`` pages"""
+        if pages_per_part < 1:
+            raise ValueError("Pages per part must be at least 1")
+        return [
+            (start, min(start + pages_per_part - 1, page_count))
+            for start in range(1, page_count + 1, pages_per_part)
+        ]
+    
+    @staticmethod
+    def burst(page_count):
+        """One part per page"""
+        return PageRanges.every(1, page_count)
+    
+    @staticmethod
+    def from_pages(pages):
+        """Collapse 1-based page numbers into sorted ranges of consecutive pages"""
+        ranges = []
+        for page in sorted(set(pages)):
+            if ranges and page == ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], page)
+            else:
+                ranges.append((page, page))
+        return ranges
+    
+    @staticmethod
+    def to_expression(ranges):
+        """Format ranges back into an expression such as ``1-3,7``"""
+        return ",".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+    
+    @staticmethod
+    def to_indexes(ranges, page_count):
+        """Sorted, de-duplicated 0-based page indexes covered by ``ranges``"""
+        indexes = set()
+        for start, end in ranges:
+            start, end = int(start), int(end)
+            if not 1 <= start <= end <= page_count:
+                raise ValueError(f"Page range {start}-{end} must lie within 1-{page_count}")
+            indexes.update(range(start - 1, end))
+        return sorted(indexes)
+    
+    @staticmethod
+    def describe(start, end):
+        """Short label for a range, used in output file names"""
+        return f"page_{start}" if start == end else f"pages_{start}-{end}"
+    
+    @staticmethod
+    def describe_selection(ranges, page_count):
+        """Short label for a page selection, or "" if it covers every page"""
+        ranges = PageRanges.from_pages(index + 1 for index in PageRanges.to_indexes(ranges, page_count))
+        if ranges == [(1, page_count)]:
+            return ""
+        if len(ranges) == 1:
+            return PageRanges.describe(*ranges[0])
+        return f"pages_{PageRanges.to_expression(ranges)}"
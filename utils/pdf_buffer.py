@@ -0,0 +1,142 @@
+import io
+import os
+import mmap
+import shutil
+import tempfile
+from config.app_config import AppConfig
+
+class _MemoryViewReader(io.RawIOBase):
+    """Seekable file object that reads from a memoryview without copying it"""
+    
+    def __init__(self, view):
+        self._view = view
+        self._position = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self._view) - self._position)
+        if size <= 0:
+            return 0
+        buffer[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+    
+    def tell(self):
+        return self._position
+
+class PDFBuffer:
+    """Read-only, zero-copy view of a PDF input
+    
+    Uploads and byte strings are exposed as a ``memoryview`` of the memory
+    they already occupy. Paths are memory-mapped. Other streams are read into
+    memory when small, and spilled to a memory-mapped temp file when they are
+    larger than ``IO_SETTINGS["spill_threshold_bytes"]``.
+    """
+    
+    def __init__(self, source, spill_threshold=None):
+        if spill_threshold is None:
+            spill_threshold = AppConfig.IO_SETTINGS["spill_threshold_bytes"]
+        
+        self._path = None
+        self._owns_path = False
+        self._file = None
+        self._mmap = None
+        
+        if isinstance(source, (str, os.PathLike)):
+            self._path = os.fspath(source)
+            self.view = self._map_file(self._path)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self.view = memoryview(source)
+        elif getattr(source, "path", None):
+            # File-backed inputs get a mapping of their own, released by close()
+            self._path = os.fspath(source.path)
+            self.view = self._map_file(self._path)
+        elif hasattr(source, "getbuffer"):
+            self.view = source.getbuffer()
+        else:
+            self.view = self._read_stream(source, spill_threshold)
+        
+        self.view = self.view.cast("B") if self.view.format != "B" else self.view
+    
+    @property
+    def size(self):
+        return len(self.view)
+    
+    def open_stream(self):
+        """Get a seekable file object over the buffer, for stream-based readers"""
+        return io.BufferedReader(_MemoryViewReader(self.view), buffer_size=256 * 1024)
+    
+    def path(self):
+        """Get a filesystem path for the PDF, spilling it to disk once if needed
+        
+        Only for consumers that cannot take a stream, such as worker processes
+        that each open the document themselves.
+        """
+        if self._path is None:
+            fd, self._path = tempfile.mkstemp(suffix='.pdf')
+            self._owns_path = True
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.view)
+        return self._path
+    
+    def tobytes(self):
+        """Copy the buffer into a bytes object (for APIs that insist on bytes)"""
+        return self.view.tobytes()
+    
+    def close(self):
+        """Release the mapping and any spill file"""
+        try:
+            self.view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            pass  # A document still references the memory; GC frees it later
+        if self._file is not None:
+            self._file.close()
+        if self._owns_path:
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass  # Ignore cleanup errors
+            self._path = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _map_file(self, path):
+        """Memory-map a file read-only"""
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            return memoryview(b"")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+    
+    def _read_stream(self, stream, spill_threshold):
+        """Read a file-like source, spilling large ones to a mapped temp file"""
+        head = stream.read(spill_threshold + 1)
+        if len(head) <= spill_threshold:
+            return memoryview(head)
+        
+        fd, self._path = tempfile.mkstemp(suffix='.pdf')
+        self._owns_path = True
+        with os.fdopen(fd, 'wb') as f:
+            f.write(head)
+            del head
+            shutil.copyfileobj(stream, f, 1024 * 1024)
+        return self._map_file(self._path)
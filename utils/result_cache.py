@@ -0,0 +1,288 @@
+import os
+import json
+import shutil
+import struct
+import hashlib
+import weakref
+import tempfile
+import threading
+from collections import OrderedDict
+from config.app_config import AppConfig
+
+_MAGIC = b"PHRC1\n"
+_HEADER = struct.Struct("<I")
+
+class ResultCache:
+    """Content-addressed cache for service results
+    
+    Results are keyed by a hash of the input bytes plus the operation name and
+    its parameters. Lookups go through an in-memory LRU tier first and then a
+    size-bounded on-disk tier; both tiers evict least recently used entries.
+    
+    Disk entries are a JSON header followed by the result's raw byte
+    strings, so reading one never executes anything. Results that hold
+    anything but JSON values, bytes and tuples stay in memory only. Without
+    a ``disk_dir`` the tier lives in a private temp directory (mode 0o700)
+    that is removed when the process exits.
+    """
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, memory_max_bytes, disk_max_bytes, disk_dir=None):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_dir = disk_dir
+        
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        
+        if not self.disk_max_bytes:
+            return
+        if self.disk_dir is None:
+            self.disk_dir = tempfile.mkdtemp(prefix="pdf_powerhub_cache_")
+            weakref.finalize(self, shutil.rmtree, self.disk_dir, True)
+        else:
+            os.makedirs(self.disk_dir, mode=0o700, exist_ok=True)
+    
+    @classmethod
+    def get_shared(cls):
+        """Get the process-wide cache configured from AppConfig"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                settings = AppConfig.CACHE_SETTINGS
+                cls._shared = cls(
+                    settings["memory_max_bytes"],
+                    settings["disk_max_bytes"],
+                    settings["disk_dir"]
+                )
+            return cls._shared
+    
+    @staticmethod
+    def hash_bytes(data):
+        """Hash raw bytes, or an uploaded file's contents, without copying"""
+        if getattr(data, "path", None):
+            # File-backed inputs are hashed in chunks so none stays mapped or loaded
+            digest = hashlib.blake2b(digest_size=20)
+            with open(data.path, 'rb') as f:
+                while chunk := f.read(1024 * 1024):
+                    digest.update(chunk)
+            return digest.hexdigest()
+        if hasattr(data, "getbuffer"):
+            data = data.getbuffer()
+        elif hasattr(data, "getvalue"):
+            data = data.getvalue()
+        return hashlib.blake2b(data, digest_size=20).hexdigest()
+    
+    @classmethod
+    def make_key(cls, operation, inputs, params=None):
+        """Build a cache key from an operation, its inputs and its parameters"""
+        key = hashlib.blake2b(digest_size=20)
+        key.update(operation.encode("utf-8"))
+        for item in inputs:
+            key.update(cls.hash_bytes(item).encode("ascii"))
+        key.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+        return key.hexdigest()
+    
+    def get_or_compute(self, key, compute):
+        """Return the cached result for ``key`` or compute and store it"""
+        found, value = self.get(key)
+        if found:
+            return value
+        
+        value = compute()
+        self.put(key, value)
+        return value
+    
+    def get(self, key):
+        """Look up a key; returns (found, value)"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return True, self._memory[key][0]
+        
+        value = self._read_disk(key)
+        if value is not None:
+            with self._lock:
+                self.stats["disk_hits"] += 1
+            self._put_memory(key, value)
+            return True, value
+        
+        with self._lock:
+            self.stats["misses"] += 1
+        return False, None
+    
+    def put(self, key, value):
+        """Store a result in both tiers"""
+        self._put_memory(key, value)
+        self._write_disk(key, value)
+    
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        for path, _, _ in self._disk_entries():
+            self._remove(path)
+    
+    def get_stats(self):
+        """Get hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+        stats["disk_bytes"] = sum(size for _, size, _ in self._disk_entries())
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        return stats
+    
+    def _put_memory(self, key, value):
+        """Insert into the LRU tier, evicting old entries to stay in budget"""
+        size = self._sizeof(value)
+        if size > self.memory_max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[1]
+            self._memory[key] = (value, size)
+            self._memory_bytes += size
+            
+            while self._memory_bytes > self.memory_max_bytes:
+                _, (_, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+    
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.res")
+    
+    def _read_disk(self, key):
+        """Load a result from the disk tier, refreshing its recency"""
+        if not self.disk_max_bytes:
+            return None
+        
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    return None
+                (header_length,) = _HEADER.unpack(f.read(_HEADER.size))
+                header = json.loads(f.read(header_length))
+                blobs = [f.read(length) for length in header["blobs"]]
+            if any(len(blob) != length for blob, length in zip(blobs, header["blobs"])):
+                return None  # Truncated
+            os.utime(path)
+            return self._restore(header["value"], blobs)
+        except (OSError, ValueError, KeyError, IndexError, TypeError, struct.error):
+            return None
+    
+    def _write_disk(self, key, value):
+        """Write a result to the disk tier and evict until under budget"""
+        if not self.disk_max_bytes:
+            return
+        
+        blobs = []
+        try:
+            header = json.dumps({
+                "value": self._flatten(value, blobs),
+                "blobs": [len(blob) for blob in blobs]
+            }).encode("utf-8")
+        except (TypeError, ValueError):
+            return  # Not representable without pickle; keep it in memory only
+        if len(_MAGIC) + _HEADER.size + len(header) + sum(len(blob) for blob in blobs) > self.disk_max_bytes:
+            return
+        
+        # Blobs are written one by one, so the result is never copied into a single payload
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_MAGIC)
+                f.write(_HEADER.pack(len(header)))
+                f.write(header)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(temp_path, self._disk_path(key))
+        except OSError:
+            return  # The disk tier is best effort
+        
+        self._evict_disk()
+    
+    @classmethod
+    def _flatten(cls, value, blobs):
+        """Turn a result into JSON values, moving byte strings into ``blobs``"""
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            blobs.append(value)
+            return {"$bytes": len(blobs) - 1}
+        if isinstance(value, tuple):
+            return {"$tuple": [cls._flatten(item, blobs) for item in value]}
+        if isinstance(value, list):
+            return [cls._flatten(item, blobs) for item in value]
+        if isinstance(value, dict):
+            if not all(isinstance(key, str) and not key.startswith("$") for key in value):
+                raise TypeError("Result keys must be strings not starting with $")
+            return {key: cls._flatten(item, blobs) for key, item in value.items()}
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        raise TypeError(f"Cannot store {type(value).__name__} on disk")
+    
+    @classmethod
+    def _restore(cls, value, blobs):
+        """Inverse of _flatten"""
+        if isinstance(value, list):
+            return [cls._restore(item, blobs) for item in value]
+        if isinstance(value, dict):
+            if "$bytes" in value:
+                return blobs[value["$bytes"]]
+            if "$tuple" in value:
+                return tuple(cls._restore(item, blobs) for item in value["$tuple"])
+            return {key: cls._restore(item, blobs) for key, item in value.items()}
+        return value
+    
+    def _evict_disk(self):
+        """Remove least recently used files until the tier fits its budget"""
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.disk_max_bytes:
+                break
+            self._remove(path)
+            total -= size
+    
+    def _disk_entries(self):
+        """List (path, size, mtime) for every file in the disk tier"""
+        entries = []
+        try:
+            names = os.listdir(self.disk_dir)
+        except OSError:
+            return entries
+        
+        for name in names:
+            if not name.endswith('.res'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass  # Already evicted by another session
+    
+    @classmethod
+    def _sizeof(cls, value):
+        """Approximate the memory held by a result"""
+        if isinstance(value, (bytes, bytearray, str)):
+            return len(value)
+        if isinstance(value, dict):
+            return sum(cls._sizeof(item) for item in value.values())
+        if isinstance(value, (list, tuple)):
+            return sum(cls._sizeof(item) for item in value)
+        return 64
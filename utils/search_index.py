@@ -0,0 +1,460 @@
+import os
+import re
+import sys
+import math
+import time
+import mmap
+import json
+import uuid
+import zlib
+import shutil
+import weakref
+import bisect
+import struct
+import tempfile
+import threading
+from array import array
+from itertools import accumulate
+from config.app_config import AppConfig
+
+_TOKEN = re.compile(r"\w+")
+_QUERY_TERM = re.compile(r"(\w+)(\*?)")
+_MAGIC = b"PHSEG1\n"
+_HEADER = struct.Struct("<I")
+MAX_TERM_LENGTH = 64
+
+def tokenize(text):
+    """Yield (term, offset) for every word in ``text``, case-folded"""
+    for match in _TOKEN.finditer(text):
+        term = match.group().casefold()
+        if len(term) <= MAX_TERM_LENGTH:
+            yield term, match.start()
+
+def _pack(typecode, values):
+    """Serialize integers as little-endian machine words"""
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+def _unpack(typecode, data):
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked
+
+def _encode_postings(entries):
+    """Encode [(page, [offsets...]), ...] sorted by page into one block
+    
+    Pages and offsets are delta-encoded, so the words are small and
+    compress well; blocks over 64 bytes are zlib-compressed. The first byte
+    says which.
+    """
+    pages = [page for page, _ in entries]
+    words = [len(entries)]
+    words.extend(page - previous for page, previous in zip(pages, [0] + pages))
+    words.extend(len(offsets) for _, offsets in entries)
+    for _, offsets in entries:
+        words.extend(offset - previous for offset, previous in zip(offsets, [0] + offsets))
+    raw = _pack("I", words)
+    if len(raw) > 64:
+        return b"z" + zlib.compress(raw, 6)
+    return b"r" + raw
+
+class Postings:
+    """Decoded postings of one term in one segment"""
+    
+    def __init__(self, block):
+        words = _unpack("I", zlib.decompress(block[1:]) if block[:1] == b"z" else block[1:])
+        count = words[0]
+        self.pages = list(accumulate(words[1:count + 1]))
+        self.frequencies = words[count + 1:2 * count + 1]
+        self._offset_words = words[2 * count + 1:]
+        self._offset_starts = None
+    
+    def offsets(self, page):
+        """Character offsets of the term on ``page`` (empty if it is absent)"""
+        index = bisect.bisect_left(self.pages, page)
+        if index == len(self.pages) or self.pages[index] != page:
+            return []
+        if self._offset_starts is None:
+            self._offset_starts = [0] + list(accumulate(self.frequencies))
+        start, end = self._offset_starts[index], self._offset_starts[index + 1]
+        return list(accumulate(self._offset_words[start:end]))
+
+class _Segment:
+    """One immutable index file: its documents, term dictionary, postings and page texts
+    
+    Layout: magic, a length-prefixed JSON header (documents and section
+    positions), then the sections. Terms are stored sorted, one per line,
+    with an offset table into the postings; page texts are zlib-compressed
+    one page at a time so a snippet only inflates the page it needs.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(_MAGIC)] != _MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a search index segment: {path}")
+        
+        start = len(_MAGIC) + _HEADER.size
+        (header_length,) = _HEADER.unpack_from(self._map, len(_MAGIC))
+        header = json.loads(self._map[start:start + header_length])
+        self._base = start + header_length
+        self._sections = header["sections"]
+        
+        self.documents = header["documents"]
+        self._first_pages = [document["first_page"] for document in self.documents]
+        self.terms = self._section("terms").decode("utf-8").split("\n") if header["term_count"] else []
+        self._term_ids = {term: index for index, term in enumerate(self.terms)}
+        self._term_offsets = _unpack("Q", self._section("term_offsets"))
+        self.page_lengths = _unpack("I", self._section("page_lengths"))
+        self._text_offsets = _unpack("Q", self._section("text_offsets"))
+    
+    @property
+    def page_count(self):
+        return len(self.page_lengths)
+    
+    def postings(self, term):
+        """Decoded postings for ``term``, or None if the segment lacks it"""
+        index = self._term_ids.get(term)
+        if index is None:
+            return None
+        postings_start = self._sections["postings"][0]
+        start = self._base + postings_start + self._term_offsets[index]
+        end = self._base + postings_start + self._term_offsets[index + 1]
+        return Postings(self._map[start:end])
+    
+    def expand_prefix(self, prefix, limit):
+        """Up to ``limit`` terms starting with ``prefix``"""
+        index = bisect.bisect_left(self.terms, prefix)
+        expanded = []
+        while index < len(self.terms) and self.terms[index].startswith(prefix) and len(expanded) < limit:
+            expanded.append(self.terms[index])
+            index += 1
+        return expanded
+    
+    def page_text(self, page):
+        """Text of a segment page"""
+        texts_start = self._base + self._sections["texts"][0]
+        start, end = self._text_offsets[page], self._text_offsets[page + 1]
+        return zlib.decompress(self._map[texts_start + start:texts_start + end]).decode("utf-8")
+    
+    def locate(self, page):
+        """Map a segment page to (document, 1-based page number)"""
+        document = self.documents[bisect.bisect_right(self._first_pages, page) - 1]
+        return document, page - document["first_page"] + 1
+    
+    def iter_documents(self):
+        """Yield (document, page texts) for every document, for merging"""
+        for document in self.documents:
+            first = document["first_page"]
+            yield document, [self.page_text(page) for page in range(first, first + document["page_count"])]
+    
+    def close(self):
+        self._map.close()
+    
+    def _section(self, name):
+        start, length = self._sections[name]
+        return self._map[self._base + start:self._base + start + length]
+    
+    @staticmethod
+    def write(path, documents):
+        """Write ``documents`` — (name, content_hash, page texts) — as a new segment"""
+        postings = {}
+        page_lengths = []
+        texts = []
+        header_documents = []
+        page = 0
+        
+        for name, content_hash, pages in documents:
+            header_documents.append({
+                "name": name,
+                "content_hash": content_hash,
+                "page_count": len(pages),
+                "first_page": page
+            })
+            for text in pages:
+                length = 0
+                for term, offset in tokenize(text):
+                    entries = postings.setdefault(term, [])
+                    if not entries or entries[-1][0] != page:
+                        entries.append((page, []))
+                    entries[-1][1].append(offset)
+                    length += 1
+                page_lengths.append(length)
+                texts.append(zlib.compress(text.encode("utf-8"), 6))
+                page += 1
+        
+        terms = sorted(postings)
+        blocks = [_encode_postings(postings[term]) for term in terms]
+        sections = [
+            ("terms", "\n".join(terms).encode("utf-8")),
+            ("term_offsets", _pack("Q", accumulate([0] + [len(block) for block in blocks]))),
+            ("page_lengths", _pack("I", page_lengths)),
+            ("text_offsets", _pack("Q", accumulate([0] + [len(text) for text in texts]))),
+            ("postings", b"".join(blocks)),
+            ("texts", b"".join(texts))
+        ]
+        
+        positions = {}
+        position = 0
+        for name, data in sections:
+            positions[name] = [position, len(data)]
+            position += len(data)
+        header = json.dumps({
+            "documents": header_documents,
+            "term_count": len(terms),
+            "sections": positions
+        }).encode("utf-8")
+        
+        # Write under a temporary name so readers never see a partial segment
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(_HEADER.pack(len(header)))
+            f.write(header)
+            for _, data in sections:
+                f.write(data)
+        os.replace(temp_path, path)
+
+class SearchIndex:
+    """Full-text inverted index over the pages of processed PDFs
+    
+    Each batch of added documents is written as a new immutable segment
+    file, so adds are incremental and never rewrite what is already
+    indexed. Once there are more than ``max_segments`` segments they are
+    merged into one. Queries rank pages with BM25 and support trailing
+    ``*`` prefix terms; hits carry the document, page number and a snippet
+    around the first match.
+    
+    Without an ``index_dir`` the index lives in a private temp directory
+    (mode 0o700) that is removed when the index is garbage collected, so
+    each owner — one per Streamlit session — sees only its own documents.
+    An explicit ``index_dir`` is shared with every index opened on it, and
+    segments written there by other processes are picked up on the next
+    query.
+    """
+    
+    # BM25 parameters
+    K1 = 1.2
+    B = 0.75
+    MAX_PREFIX_TERMS = 50
+    
+    def __init__(self, index_dir=None, max_segments=8, snippet_chars=160):
+        if index_dir is None:
+            index_dir = tempfile.mkdtemp(prefix="pdf_powerhub_search_")
+            weakref.finalize(self, shutil.rmtree, index_dir, True)
+        else:
+            os.makedirs(index_dir, mode=0o700, exist_ok=True)
+        self.index_dir = index_dir
+        self.max_segments = max_segments
+        self.snippet_chars = snippet_chars
+        self._segments = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls):
+        """Open an index configured from AppConfig (private unless ``index_dir`` is set)"""
+        settings = AppConfig.SEARCH_SETTINGS
+        return cls(settings["index_dir"], settings["max_segments"], settings["snippet_chars"])
+    
+    def add_document(self, name, content_hash, pages):
+        """Index a document's page texts; returns False if it is already indexed"""
+        with self._lock:
+            self._refresh()
+            if self._find(content_hash) is not None:
+                return False
+            _Segment.write(self._new_segment_path(), [(name, content_hash, list(pages))])
+            self._refresh()
+            if len(self._segments) > self.max_segments:
+                self._merge_segments()
+            return True
+    
+    def has_document(self, content_hash):
+        with self._lock:
+            self._refresh()
+            return self._find(content_hash) is not None
+    
+    def list_documents(self):
+        """List indexed documents (name, content_hash, page_count), oldest first"""
+        with self._lock:
+            self._refresh()
+            return [
+                {key: document[key] for key in ("name", "content_hash", "page_count")}
+                for segment in self._ordered_segments()
+                for document in segment.documents
+            ]
+    
+    def search(self, query, limit=20):
+        """Return up to ``limit`` ranked page hits for ``query``
+        
+        Each hit is a dict with the document ``name`` and ``content_hash``,
+        the 1-based ``page``, its ``score``, a ``snippet`` of the page text
+        and the ``highlights`` — (start, end) spans of matches in the snippet.
+        """
+        with self._lock:
+            self._refresh()
+            segments = self._ordered_segments()
+            total_pages = sum(segment.page_count for segment in segments)
+            if not total_pages:
+                return []
+            average_length = sum(sum(segment.page_lengths) for segment in segments) / total_pages or 1.0
+            
+            # Decode each query term's postings once per segment
+            matched = []
+            for term, is_prefix in self._parse_query(query):
+                for segment in segments:
+                    terms = segment.expand_prefix(term, self.MAX_PREFIX_TERMS) if is_prefix else [term]
+                    for expanded in terms:
+                        postings = segment.postings(expanded)
+                        if postings is not None:
+                            matched.append((expanded, segment, postings))
+            
+            document_frequency = {}
+            for term, _, postings in matched:
+                document_frequency[term] = document_frequency.get(term, 0) + len(postings.pages)
+            
+            scores = {}
+            for term, segment, postings in matched:
+                frequency = document_frequency[term]
+                idf = math.log(1 + (total_pages - frequency + 0.5) / (frequency + 0.5))
+                lengths = segment.page_lengths
+                for page, tf in zip(postings.pages, postings.frequencies):
+                    norm = self.K1 * (1 - self.B + self.B * lengths[page] / average_length)
+                    key = (segment.name, page)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+            
+            top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            by_name = {segment.name: segment for segment in segments}
+            hits = []
+            for (segment_name, page), score in top:
+                segment = by_name[segment_name]
+                offsets = sorted(
+                    offset
+                    for _, matched_segment, postings in matched if matched_segment is segment
+                    for offset in postings.offsets(page)
+                )
+                document, page_number = segment.locate(page)
+                snippet, highlights = self._snippet(segment.page_text(page), offsets)
+                hits.append({
+                    "name": document["name"],
+                    "content_hash": document["content_hash"],
+                    "page": page_number,
+                    "score": score,
+                    "snippet": snippet,
+                    "highlights": highlights
+                })
+            return hits
+    
+    def clear(self):
+        """Remove every document in this index's directory"""
+        with self._lock:
+            self._refresh()
+            for segment in list(self._segments.values()):
+                segment.close()
+                self._remove(segment.path)
+            self._segments.clear()
+    
+    def get_stats(self):
+        """Get document, page and segment counts and the on-disk size"""
+        with self._lock:
+            self._refresh()
+            segments = list(self._segments.values())
+            return {
+                "documents": sum(len(segment.documents) for segment in segments),
+                "pages": sum(segment.page_count for segment in segments),
+                "segments": len(segments),
+                "disk_bytes": sum(os.path.getsize(segment.path) for segment in segments)
+            }
+    
+    @staticmethod
+    def _parse_query(query):
+        """Split a query into (term, is_prefix) pairs, dropping repeats"""
+        seen = set()
+        parsed = []
+        for word, star in _QUERY_TERM.findall(query):
+            key = (word.casefold(), bool(star))
+            if key not in seen:
+                seen.add(key)
+                parsed.append(key)
+        return parsed
+    
+    def _snippet(self, text, offsets):
+        """Cut a window of page text around the first match"""
+        center = offsets[0] if offsets else 0
+        start = max(0, center - self.snippet_chars // 3)
+        end = min(len(text), start + self.snippet_chars)
+        window = text[start:end]
+        
+        highlights = []
+        for offset in offsets:
+            if start <= offset < end:
+                match = _TOKEN.match(text, offset)
+                highlights.append((offset - start, min(match.end(), end) - start))
+        
+        # Flatten line breaks in place so the highlight spans stay valid
+        snippet = window.replace("\n", " ").replace("\f", " ")
+        if start > 0:
+            snippet = "…" + snippet
+            highlights = [(a + 1, b + 1) for a, b in highlights]
+        if end < len(text):
+            snippet += "…"
+        return snippet, highlights
+    
+    def _refresh(self):
+        """Load new segment files and forget removed ones"""
+        try:
+            names = {name for name in os.listdir(self.index_dir) if name.endswith(".seg")}
+        except OSError:
+            names = set()
+        for name in list(self._segments):
+            if name not in names:
+                self._segments.pop(name).close()
+        for name in sorted(names - set(self._segments)):
+            try:
+                self._segments[name] = _Segment(os.path.join(self.index_dir, name))
+            except (OSError, ValueError):
+                continue  # Removed by a concurrent merge, or not a segment
+    
+    def _ordered_segments(self):
+        return [self._segments[name] for name in sorted(self._segments)]
+    
+    def _find(self, content_hash):
+        for segment in self._segments.values():
+            for document in segment.documents:
+                if document["content_hash"] == content_hash:
+                    return document
+        return None
+    
+    def _new_segment_path(self, timestamp=None):
+        # Names sort in creation order, which keeps documents listed oldest first
+        timestamp = timestamp or f"{time.time_ns():020d}"
+        return os.path.join(self.index_dir, f"{timestamp}-{uuid.uuid4().hex[:8]}.seg")
+    
+    def _merge_segments(self):
+        """Rewrite every segment into a single one"""
+        segments = self._ordered_segments()
+        documents = [
+            (document["name"], document["content_hash"], pages)
+            for segment in segments
+            for document, pages in segment.iter_documents()
+        ]
+        # Reuse the oldest timestamp so the merged segment keeps its place in the order
+        _Segment.write(self._new_segment_path(segments[0].name.split("-")[0]), documents)
+        for segment in segments:
+            segment.close()
+            self._remove(segment.path)
+        self._segments.clear()
+        self._refresh()
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Already removed
@@ -1,4 +1,7 @@
+import time
 import streamlit as st
+from config.app_config import AppConfig
+from utils.document_cache import DocumentCache
 
 class SessionManager:
     """Manages Streamlit session state"""
@@ -11,16 +14,63 @@ class SessionManager:
             st.session_state.operation_history = []
     
     @staticmethod
-    def add_to_history(operation, details):
-        """Add operation to history"""
+    def get_controller(factory):
+        """Get this session's controller, building it with ``factory`` on the first run
+        
+        Reruns reuse it, so the UI and services are not rebuilt every time.
+        """
+        if 'controller' not in st.session_state:
+            st.session_state.controller = factory()
+        return st.session_state.controller
+    
+    @staticmethod
+    def get_document_cache():
+        """Get the parsed-document cache for this session"""
+        if 'document_cache' not in st.session_state:
+            st.session_state.document_cache = DocumentCache()
+        return st.session_state.document_cache
+    
+    @staticmethod
+    def track_job(job_key, job_id, content_hash):
+        """Remember the background job a page submitted, and for which upload"""
+        if 'jobs' not in st.session_state:
+            st.session_state.jobs = {}
+        st.session_state.jobs[job_key] = {'job_id': job_id, 'content_hash': content_hash}
+    
+    @staticmethod
+    def get_tracked_job(job_key):
+        """Get the job a page submitted, as a dict with job_id and content_hash"""
+        return st.session_state.get('jobs', {}).get(job_key)
+    
+    @staticmethod
+    def forget_job(job_key):
+        """Stop tracking a page's job"""
+        st.session_state.get('jobs', {}).pop(job_key, None)
+    
+    @staticmethod
+    def get_page_selection(content_hash):
+        """Get the set of 1-based pages picked for an upload (only the latest upload is kept)"""
+        selection = st.session_state.get('page_selection')
+        if selection is None or selection['content_hash'] != content_hash:
+            selection = st.session_state.page_selection = {'content_hash': content_hash, 'pages': set()}
+        return selection['pages']
+    
+    @staticmethod
+    def add_to_history(operation, details, duration=None, input_bytes=None, output_bytes=None):
+        """Add operation to history, keeping the latest ``max_history`` entries"""
         if 'operation_history' not in st.session_state:
             st.session_state.operation_history = []
         
-        st.session_state.operation_history.append({
+        history = st.session_state.operation_history
+        history.append({
             'operation': operation,
             'details': details,
-            'timestamp': st.session_state.get('timestamp', 'N/A')
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'duration': duration,
+            'input_bytes': input_bytes,
+            'output_bytes': output_bytes
         })
+        del history[:-AppConfig.METRICS_SETTINGS["max_history"]]
     
     @staticmethod
     def get_history():
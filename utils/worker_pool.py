@@ -0,0 +1,54 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+class WorkerPool:
+    """Helpers for running CPU-bound service work on a process pool"""
+    
+    @staticmethod
+    def resolve_workers(max_workers=None):
+        """Resolve a configured worker count (None means one per CPU core)"""
+        if max_workers:
+            return max(1, int(max_workers))
+        return max(1, os.cpu_count() or 1)
+    
+    @staticmethod
+    def create(max_workers=None, initializer=None, initargs=()):
+        """Create a process pool that is safe to start from Streamlit's threads"""
+        # Forking a multi-threaded process can deadlock, so always spawn
+        context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(
+            max_workers=WorkerPool.resolve_workers(max_workers),
+            mp_context=context,
+            initializer=initializer,
+            initargs=initargs
+        )
+    
+    @staticmethod
+    def imap_unordered(executor, func, tasks, max_in_flight):
+        """Submit tasks lazily and yield results as they complete
+        
+        At most ``max_in_flight`` tasks are pending at any time, so results
+        that have not been consumed yet never pile up in memory.
+        """
+        tasks = iter(tasks)
+        pending = set()
+        
+        for task in tasks:
+            pending.add(executor.submit(func, *task))
+            if len(pending) >= max_in_flight:
+                break
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                for task in tasks:
+                    pending.add(executor.submit(func, *task))
+                    break
+    
+    @staticmethod
+    def chunk(items, size):
+        """Split a sequence into consecutive batches of ``size`` items"""
+        items = list(items)
+        return [items[i:i + size] for i in range(0, len(items), size)]